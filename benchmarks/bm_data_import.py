@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Import time of bm_data.bm_data, against the eager imports of its dependencies.
+
+Each statement is run ``repeat`` times in a new interpreter with
+``python -X importtime``, and the median of the cumulative import time of the
+top-level modules is reported.  No timing is asserted; run it by hand, e.g.
+
+    python benchmarks/bm_data_import.py --repeat 5
+
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parents[1]
+STATEMENTS = {
+    "lazy (import bm_data.bm_data)": "import bm_data.bm_data",
+    "eager (+ matplotlib, lmfit, xarray, pandas)": (
+        "import bm_data.bm_data, matplotlib.pyplot, lmfit, xarray, pandas"
+    ),
+}
+
+
+def import_time(statement: str) -> float:
+    """Return the cumulative import time (s) of the top-level modules."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total_us = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        # top-level entries are not indented
+        if not name.startswith("  "):
+            total_us += int(cumulative)
+    return total_us * 1e-6
+
+
+def main() -> None:
+    """Print the median import time of each statement."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="number of runs")
+    args = parser.parse_args()
+    for label, statement in STATEMENTS.items():
+        times = [import_time(statement) for _ in range(args.repeat)]
+        print(f"{label:45s} {statistics.median(times):.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -33,21 +33,25 @@ Requirements:
     - Python 3.12+
     - h5py
     - numpy
+    - xarray (readhdf5), pandas (frame_index), matplotlib and lmfit (plotting and
+      fitting).  They are imported on first use, so that importing this module for
+      the frame decoding alone does not pay for them.
 
 """
 
 from __future__ import annotations
 
 from datetime import datetime
+from functools import cache
 from typing import TYPE_CHECKING
 
 import h5py
-import matplotlib.pyplot as plt
 import numpy as np
-import xarray as xr
-from lmfit import Model
 
 if TYPE_CHECKING:
+    import pandas as pd
+    import xarray as xr
+    from lmfit import Model
     from lmfit.model import ModelResult
     from matplotlib.colors import Colormap
     from matplotlib.figure import Figure
@@ -115,7 +119,20 @@ def rotated_gaussian(
     return g.ravel()
 
 
-gmodel = Model(rotated_gaussian)
+@cache
+def _gmodel() -> Model:
+    """Return the lmfit Model of :func:`rotated_gaussian`, built on first use."""
+    from lmfit import Model
+
+    return Model(rotated_gaussian)
+
+
+def __getattr__(name: str) -> Model:
+    """Build `gmodel` lazily, so that lmfit is imported only when fitting."""
+    if name == "gmodel":
+        return _gmodel()
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
 
 
 def bm_plot(
@@ -139,17 +156,16 @@ def bm_plot(
         Figure, ModelResult: Matplotlib figure with the plot, and the fitting result.
 
     """
+    import matplotlib.pyplot as plt
+
     fig: Figure = plt.figure(figsize=figsize)
     ax0 = fig.add_subplot(1, 3, 1)
     ax1 = fig.add_subplot(1, 3, 2)
     ax2 = fig.add_subplot(1, 3, 3)
-    y_idx, x_idx = np.unravel_index(data.values.argmax(), data.shape)
-    x0, y0 = float(data.x.values[x_idx]), float(data.y.values[y_idx])
-    cropped = data.isel(
-        {
-            "x": slice(x_idx - pixel_radius, x_idx + pixel_radius),
-            "y": slice(y_idx - pixel_radius, y_idx + pixel_radius),
-        },
+    cropped, result = fit_beam(
+        data,
+        pixel_radius=pixel_radius,
+        rotation_gaussian=rotation_gaussian,
     )
     cropped.plot(
         ax=ax0,
@@ -167,9 +183,51 @@ def bm_plot(
         color="white",
     )
 
+    z = cropped.values
+    fit_z = result.best_fit.reshape(z.shape)
+
+    ax1.plot(cropped.x, z[pixel_radius, :], "o", label="Data")
+    ax1.plot(cropped.x, fit_z[pixel_radius, :], "-", label="Fit")
+
+    ax2.plot(cropped.y, z[:, pixel_radius], "o", label="Data")
+    ax2.plot(cropped.y, fit_z[:, pixel_radius], "-", label="Fit")
+
+    ax1.set_ylim((0.0, None))
+    ax2.set_ylim((0.0, None))
+    return fig, result
+
+
+def fit_beam(
+    data: xr.DataArray,
+    pixel_radius: int = 30,
+    *,
+    rotation_gaussian: bool = True,
+) -> tuple[xr.DataArray, ModelResult]:
+    """Fit the 2D gaussian around the peak of the beam monitor data.
+
+    Args:
+        data (xr.DataArray): 2D beam monitor data.
+        pixel_radius (int): Radius around the peak for fitting.
+        rotation_gaussian (bool): Whether to fit with rotation.
+
+    Returns:
+        xr.DataArray, ModelResult: The cropped data used for fitting, and the
+            fitting result.
+
+    """
+    y_idx, x_idx = np.unravel_index(data.values.argmax(), data.shape)
+    x0, y0 = float(data.x.values[x_idx]), float(data.y.values[y_idx])
+    cropped = data.isel(
+        {
+            "x": slice(x_idx - pixel_radius, x_idx + pixel_radius),
+            "y": slice(y_idx - pixel_radius, y_idx + pixel_radius),
+        },
+    )
+
     x, y = np.meshgrid(cropped.x.values, cropped.y.values)
     z = cropped.values
 
+    gmodel = _gmodel()
     params = gmodel.make_params(
         amplitude=z.max() - z.min(),
         sigma_x=5.0,
@@ -183,18 +241,7 @@ def bm_plot(
     params["y0"].vary = True
     params["theta"].vary = rotation_gaussian
 
-    result = gmodel.fit(z.ravel(), params, xy=(x.ravel(), y.ravel()))
-    fit_z = result.best_fit.reshape(z.shape)
-
-    ax1.plot(cropped.x, z[pixel_radius, :], "o", label="Data")
-    ax1.plot(cropped.x, fit_z[pixel_radius, :], "-", label="Fit")
-
-    ax2.plot(cropped.y, z[:, pixel_radius], "o", label="Data")
-    ax2.plot(cropped.y, fit_z[:, pixel_radius], "-", label="Fit")
-
-    ax1.set_ylim((0.0, None))
-    ax2.set_ylim((0.0, None))
-    return fig, result
+    return cropped, gmodel.fit(z.ravel(), params, xy=(x.ravel(), y.ravel()))
 
 
 def modelresult_plot(
@@ -222,6 +269,8 @@ def modelresult_plot(
         sigma_y.append(modelresult.params["sigma_y"].value)
         intensities.append(modelresult.params["amplitude"].value)
 
+    import matplotlib.pyplot as plt
+
     fig = plt.figure(figsize=figsize)
     ax0 = fig.add_subplot(1, 3, 1)
     ax0.plot(z_values, np.array(sigma_x) * 2.35482, label=r"$FWHM_x$")
@@ -286,41 +335,77 @@ def readhdf5(filename: str, frame: int = 1) -> xr.DataArray:
         (2048, 2048)
 
     """
+    import xarray as xr
+
     with h5py.File(filename, "r") as f:
-        group = f[f"/BG_DATA/{frame}"]
-
-        numcols: int = group["RAWFRAME/WIDTH"][()].item()
-        numrows: int = group["RAWFRAME/HEIGHT"][()].item()
-        assert isinstance(numcols, int)
-        assert isinstance(numrows, int)
-        pixelscalexum: float = group["RAWFRAME/PIXELSCALEXUM"][()].item()
-        pixelscaleyum: float = group["RAWFRAME/PIXELSCALEYUM"][()].item()
-        assert isinstance(pixelscalexum, float)
-        assert isinstance(pixelscaleyum, float)
-        y_axis: NDArray[np.float64] = np.linspace(
-            0,
-            numrows * (pixelscalexum - 1),
-            numrows,
-        )
-        x_axis: NDArray[np.float64] = np.linspace(
-            0,
-            numcols * (pixelscaleyum - 1),
-            numcols,
-        )
-        timestamp: datetime = _parse_iso8601(
-            group["RAWFRAME/TIMESTAMP"][()].astype(str).item(),
-        )
-        exposurestamp: float = group["RAWFRAME/EXPOSURESTAMP"][()].item()
+        matrix, x_axis, y_axis, attrs = _read_frame(f, frame)
 
-        data: np.ndarray = group["DATA"][()]  # 1D array
-        power_calibration_multiplier: float = group[
-            "RAWFRAME/ENERGY/POWER_CALIBRATION_MULTIPLIER"
-        ][()].item()
+    return xr.DataArray(
+        matrix,
+        dims=("y", "x"),
+        coords={"x": x_axis, "y": y_axis},
+        name="normalized intensity",
+        attrs=attrs,
+    )
 
-        encoding: str = group["RAWFRAME/BITENCODING"][()].astype(str).item()
-        setting = f["/BG_SETUP/DATA_SOURCE_MANAGER"]
-        average_count: int = setting["PROCESSOR/AVERAGING_COUNT"][()].item()
-        summing_count: int = setting["PROCESSOR/SUMMING_COUNT"][()].item()
+
+def _read_frame(
+    f: h5py.File,
+    frame: int | str,
+) -> tuple[
+    NDArray[np.float64],
+    NDArray[np.float64],
+    NDArray[np.float64],
+    dict[str, int | float | datetime],
+]:
+    """Decode a single frame from an already opened HDF5 file.
+
+    This is the decode path shared by :func:`readhdf5` and the streaming readers,
+    which keep the file open across many frames.
+
+    Args:
+        f (h5py.File): Opened beam monitor HDF5 file.
+        frame (int | str): Frame index under `/BG_DATA/<frame>/`.
+
+    Returns:
+        tuple: The normalized 2D image (height x width), x axis, y axis, and the
+            attributes dict used for `xr.DataArray.attrs`.
+
+    """
+    group = f[f"/BG_DATA/{frame}"]
+
+    numcols: int = group["RAWFRAME/WIDTH"][()].item()
+    numrows: int = group["RAWFRAME/HEIGHT"][()].item()
+    assert isinstance(numcols, int)
+    assert isinstance(numrows, int)
+    pixelscalexum: float = group["RAWFRAME/PIXELSCALEXUM"][()].item()
+    pixelscaleyum: float = group["RAWFRAME/PIXELSCALEYUM"][()].item()
+    assert isinstance(pixelscalexum, float)
+    assert isinstance(pixelscaleyum, float)
+    y_axis: NDArray[np.float64] = np.linspace(
+        0,
+        numrows * (pixelscalexum - 1),
+        numrows,
+    )
+    x_axis: NDArray[np.float64] = np.linspace(
+        0,
+        numcols * (pixelscaleyum - 1),
+        numcols,
+    )
+    timestamp: datetime = _parse_iso8601(
+        group["RAWFRAME/TIMESTAMP"][()].astype(str).item(),
+    )
+    exposurestamp: float = group["RAWFRAME/EXPOSURESTAMP"][()].item()
+
+    data: np.ndarray = group["DATA"][()]  # 1D array
+    power_calibration_multiplier: float = group[
+        "RAWFRAME/ENERGY/POWER_CALIBRATION_MULTIPLIER"
+    ][()].item()
+
+    encoding: str = group["RAWFRAME/BITENCODING"][()].astype(str).item()
+    setting = f["/BG_SETUP/DATA_SOURCE_MANAGER"]
+    average_count: int = setting["PROCESSOR/AVERAGING_COUNT"][()].item()
+    summing_count: int = setting["PROCESSOR/SUMMING_COUNT"][()].item()
 
     assert isinstance(encoding, str)
     bits_per_pixel = 32
@@ -365,18 +450,81 @@ def readhdf5(filename: str, frame: int = 1) -> xr.DataArray:
         raise ValueError(msg)
     matrix = _hdf5data_to_matrix(data, numcols, numrows) * power_calibration_multiplier
 
-    return xr.DataArray(
-        matrix / summing_count / exposurestamp,
-        dims=("y", "x"),
-        coords={"x": x_axis, "y": y_axis},
-        name="normalized intensity",
-        attrs={
-            "average_count": average_count,
-            "summing_count": summing_count,
-            "timestamp": timestamp,
-            "exposure_stamp": exposurestamp,
-        },
+    attrs: dict[str, int | float | datetime] = {
+        "average_count": average_count,
+        "summing_count": summing_count,
+        "timestamp": timestamp,
+        "exposure_stamp": exposurestamp,
+    }
+    return matrix / summing_count / exposurestamp, x_axis, y_axis, attrs
+
+
+def frame_keys(f: h5py.File) -> list[str]:
+    """Return the frame names under `/BG_DATA` in numerical order.
+
+    Args:
+        f (h5py.File): Opened beam monitor HDF5 file.
+
+    Returns:
+        list[str]: Frame names, sorted as integers when possible.
+
+    """
+    keys = list(f["/BG_DATA"].keys())
+    return sorted(keys, key=lambda k: (0, int(k)) if k.isdigit() else (1, k))
+
+
+_FRAME_METADATA: dict[str, str] = {
+    "width": "RAWFRAME/WIDTH",
+    "height": "RAWFRAME/HEIGHT",
+    "pixel_scale_x_um": "RAWFRAME/PIXELSCALEXUM",
+    "pixel_scale_y_um": "RAWFRAME/PIXELSCALEYUM",
+    "timestamp": "RAWFRAME/TIMESTAMP",
+    "exposure_stamp": "RAWFRAME/EXPOSURESTAMP",
+    "bit_encoding": "RAWFRAME/BITENCODING",
+    "power_calibration_multiplier": "RAWFRAME/ENERGY/POWER_CALIBRATION_MULTIPLIER",
+}
+
+
+def frame_index(filename: str) -> pd.DataFrame:
+    """Collect the metadata of every frame without reading the pixel data.
+
+    Only the scalar datasets under `/BG_DATA/<frame>/RAWFRAME` are read, `DATA` is
+    never touched.  Thus, the frames can be selected by time or exposure before
+    decoding the images, even in files of several GB.
+
+    Args:
+        filename (str): Path to the HDF5 file.
+
+    Returns:
+        pd.DataFrame: One row per frame (index: frame name).  The columns are
+            width, height, pixel_scale_x_um, pixel_scale_y_um, timestamp (UTC),
+            exposure_stamp, bit_encoding, power_calibration_multiplier (dB, as
+            stored), and power_calibration (the linear factor used in
+            :func:`readhdf5`).  A missing item is filled with None.
+
+    """
+    import pandas as pd
+
+    columns: dict[str, list] = {name: [] for name in _FRAME_METADATA}
+    with h5py.File(filename, "r") as f:
+        frames = frame_keys(f)
+        for frame in frames:
+            group = f[f"/BG_DATA/{frame}"]
+            for name, path in _FRAME_METADATA.items():
+                columns[name].append(group[path][()] if path in group else None)
+    for name in ("timestamp", "bit_encoding"):
+        columns[name] = [
+            np.asarray(v).astype(str).item() if v is not None else None
+            for v in columns[name]
+        ]
+    for name in _FRAME_METADATA.keys() - {"timestamp", "bit_encoding"}:
+        columns[name] = [v.item() if v is not None else None for v in columns[name]]
+    index = pd.DataFrame(columns, index=pd.Index(frames, name="frame"))
+    index["timestamp"] = _parse_iso8601_array(index["timestamp"].to_numpy())
+    index["power_calibration"] = 10 ** (
+        index["power_calibration_multiplier"].astype(float) / 10
     )
+    return index
 
 
 def _hdf5data_to_matrix(data: np.ndarray, width: int, height: int) -> np.ndarray:
@@ -417,3 +565,15 @@ def _parse_iso8601(s: str) -> datetime:
     else:
         s_fixed = s
     return datetime.fromisoformat(s_fixed)
+
+
+def _parse_iso8601_array(strings: NDArray[np.str_]) -> pd.DatetimeIndex:
+    """Vectorized version of :func:`_parse_iso8601`.
+
+    Fractional seconds are truncated to µs as in :func:`_parse_iso8601`, and every
+    timestamp is converted to UTC so that the frames with different offsets can
+    share one column.
+    """
+    import pandas as pd
+
+    return pd.to_datetime(strings, format="ISO8601", utc=True).floor("us")
@@ -0,0 +1,207 @@
+r"""M² caustic analysis of the beam monitor z-series.
+
+The frames in the beam monitor HDF5 file are decoded one by one, and only the beam
+widths of each frame are kept.  Thus, the whole caustic never has to sit in memory.
+
+The beam width is evaluated by the second moment (D4σ) method (ISO 11146), which
+requires only the projections of the image, and the hyperbolic beam propagation
+
+:math:`w(z)^2 = w_0^2 + \theta^2 (z - z_0)^2`
+
+is fitted to the widths to get the waist, the Rayleigh range and M².
+
+Example:
+    >>> from bm_data.caustic import caustic
+    >>> widths, fits = caustic("zscan.h5", z_values=np.arange(0, 20, 0.5),
+    ...                        wavelength_um=0.8)
+    >>> fits["x"].m_squared
+    1.08
+
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import h5py
+import numpy as np
+
+from .bm_data import _read_frame, frame_keys
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Sequence
+
+    from numpy.typing import NDArray
+
+
+@dataclass(frozen=True)
+class CausticFit:
+    """Result of the hyperbolic fit of the beam caustic along one axis.
+
+    Attributes:
+        waist_um (float): Beam waist radius (1/e², µm).
+        waist_position_mm (float): z position of the waist (mm).
+        rayleigh_range_mm (float): Rayleigh range (mm).
+        m_squared (float): Beam quality factor M².
+
+    """
+
+    waist_um: float
+    waist_position_mm: float
+    rayleigh_range_mm: float
+    m_squared: float
+
+
+def second_moment_widths(
+    image: NDArray[np.float64],
+    x: NDArray[np.float64],
+    y: NDArray[np.float64],
+    roi_factor: float = 3.0,
+    n_iteration: int = 3,
+) -> tuple[float, float, float, float]:
+    """Return the centroid and the second moment beam radii of the image.
+
+    The background is estimated from the pixels on the border of the image.  The
+    moments are computed from the x and y projections only, and are iteratively
+    restricted to the window of `roi_factor` times the beam radius around the
+    centroid, as recommended by ISO 11146.
+
+    Args:
+        image (NDArray[np.float64]): 2D image (height x width).
+        x (NDArray[np.float64]): x axis (µm).
+        y (NDArray[np.float64]): y axis (µm).
+        roi_factor (float): Size of the integration window in unit of the radius.
+        n_iteration (int): Number of the window refinement.
+
+    Returns:
+        tuple[float, float, float, float]: x0, y0, wx, wy.  wx and wy are the 1/e²
+            radii (2σ).
+
+    """
+    border = np.concatenate((image[0], image[-1], image[1:-1, 0], image[1:-1, -1]))
+    signal = np.clip(image - np.median(border), 0, None)
+    x_lo, x_hi, y_lo, y_hi = 0, len(x), 0, len(y)
+    x0 = y0 = wx = wy = np.nan
+    for _ in range(n_iteration):
+        roi = signal[y_lo:y_hi, x_lo:x_hi]
+        px = roi.sum(axis=0)
+        py = roi.sum(axis=1)
+        total = px.sum()
+        if total <= 0:
+            break
+        xs, ys = x[x_lo:x_hi], y[y_lo:y_hi]
+        x0 = float(np.dot(xs, px) / total)
+        y0 = float(np.dot(ys, py) / total)
+        wx = 2 * float(np.sqrt(np.dot((xs - x0) ** 2, px) / total))
+        wy = 2 * float(np.sqrt(np.dot((ys - y0) ** 2, py) / total))
+        x_lo, x_hi = np.searchsorted(x, (x0 - roi_factor * wx, x0 + roi_factor * wx))
+        y_lo, y_hi = np.searchsorted(y, (y0 - roi_factor * wy, y0 + roi_factor * wy))
+    return x0, y0, wx, wy
+
+
+def iter_frame_widths(
+    filename: str,
+    frames: Iterable[int | str] | None = None,
+) -> Iterator[tuple[str, float, float, float, float]]:
+    """Yield the beam widths frame by frame.
+
+    The file is opened only once, and each frame is discarded as soon as its width
+    is evaluated.
+
+    Args:
+        filename (str): Path to the HDF5 file.
+        frames (Iterable[int | str] | None): Frames to be analyzed.  If None, all
+            frames under `/BG_DATA` are used in numerical order.
+
+    Yields:
+        tuple[str, float, float, float, float]: frame name, x0, y0, wx, wy.
+
+    """
+    with h5py.File(filename, "r") as f:
+        if frames is None:
+            frames = frame_keys(f)
+        for frame in frames:
+            matrix, x_axis, y_axis, _ = _read_frame(f, frame)
+            yield (str(frame), *second_moment_widths(matrix, x_axis, y_axis))
+
+
+def fit_caustic(
+    z_mm: NDArray[np.float64] | Sequence[float],
+    w_um: NDArray[np.float64] | Sequence[float],
+    wavelength_um: float,
+) -> CausticFit:
+    r"""Fit the hyperbolic beam propagation to the beam radii.
+
+    :math:`w^2 = a + bz + cz^2` is fitted by the linear least squares, then
+
+    :math:`z_0 = -b/2c`, :math:`w_0^2 = a - b^2/4c`, :math:`\theta = \sqrt{c}`,
+    :math:`z_R = w_0 / \theta`, and :math:`M^2 = \pi w_0 \theta / \lambda`.
+
+    Args:
+        z_mm (NDArray[np.float64]): z positions (mm).
+        w_um (NDArray[np.float64]): Beam radii (1/e², µm).
+        wavelength_um (float): Wavelength of the light (µm).
+
+    Returns:
+        CausticFit: The fitting result.
+
+    """
+    z = np.asarray(z_mm, dtype=np.float64)
+    w = np.asarray(w_um, dtype=np.float64)
+    valid = np.isfinite(z) & np.isfinite(w)
+    if np.count_nonzero(valid) < 3:  # noqa: PLR2004
+        msg = "At least three frames are required for the caustic fit."
+        raise ValueError(msg)
+    c, b, a = np.polyfit(z[valid], w[valid] ** 2, 2)
+    if c <= 0:
+        msg = "The beam widths do not show the hyperbolic caustic."
+        raise ValueError(msg)
+    z0 = -b / (2 * c)
+    w0 = np.sqrt(max(a - b**2 / (4 * c), 0.0))
+    theta = np.sqrt(c)  # µm / mm = mrad
+    return CausticFit(
+        waist_um=float(w0),
+        waist_position_mm=float(z0),
+        rayleigh_range_mm=float(w0 / theta),
+        m_squared=float(np.pi * w0 * theta * 1e-3 / wavelength_um),
+    )
+
+
+def caustic(
+    filename: str,
+    z_values: Sequence[float],
+    wavelength_um: float,
+    frames: Sequence[int | str] | None = None,
+) -> tuple[NDArray[np.float64], dict[str, CausticFit]]:
+    """Return the beam widths and M² fits of the z-series in the HDF5 file.
+
+    Args:
+        filename (str): Path to the HDF5 file.
+        z_values (Sequence[float]): z positions (mm) corresponding to the frames.
+        wavelength_um (float): Wavelength of the light (µm).
+        frames (Sequence[int | str] | None): Frames to be analyzed.  If None, all
+            frames under `/BG_DATA` are used in numerical order.
+
+    Returns:
+        tuple[NDArray[np.float64], dict[str, CausticFit]]: Array of (z, wx, wy)
+            with shape (n_frames, 3), and the fitting results for "x" and "y".
+
+    """
+    widths = np.full((len(z_values), 3), np.nan)
+    widths[:, 0] = z_values
+    n_frames = 0
+    for i, (_, _, _, wx, wy) in enumerate(iter_frame_widths(filename, frames)):
+        if i >= len(z_values):
+            msg = "The number of frames exceeds the number of z values."
+            raise ValueError(msg)
+        widths[i, 1:] = wx, wy
+        n_frames = i + 1
+    if n_frames != len(z_values):
+        msg = f"{len(z_values)} z values are given, but {n_frames} frames are read."
+        raise ValueError(msg)
+    fits = {
+        "x": fit_caustic(widths[:, 0], widths[:, 1], wavelength_um),
+        "y": fit_caustic(widths[:, 0], widths[:, 2], wavelength_um),
+    }
+    return widths, fits
@@ -0,0 +1,225 @@
+"""Headless batch rendering of the beam monitor fits.
+
+:func:`bm_data.bm_data.bm_plot` builds a new figure for every frame, which is
+slower than the analysis itself for hundreds of frames.  :class:`BatchRenderer`
+keeps one Agg figure with the same three panels, and only updates the data of the
+artists frame by frame.
+
+Example:
+    >>> from bm_data.report import render_report
+    >>> params = render_report("zscan.h5", "zscan.pdf", z_values=z)
+    >>> params = render_report("zscan.h5", "png_dir", z_values=z, n_workers=4)
+
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import h5py
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
+
+from .bm_data import fit_beam, frame_keys, readhdf5
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+    import xarray as xr
+    from lmfit.model import ModelResult
+    from matplotlib.colors import Colormap
+
+
+class BatchRenderer:
+    """Reusable three-panel figure (image, x profile, y profile) for the fits.
+
+    Attributes:
+        fig (Figure): The Agg figure, shared by all frames.
+        pixel_radius (int): Radius around the peak for fitting.
+        rotation_gaussian (bool): Whether to fit with rotation.
+
+    """
+
+    def __init__(
+        self,
+        pixel_radius: int = 30,
+        figsize: tuple[float, float] = (15, 5),
+        cmap: Colormap | str = "viridis",
+        *,
+        rotation_gaussian: bool = True,
+    ) -> None:
+        """Initialization.
+
+        Args:
+            pixel_radius (int): Radius around the peak for fitting.
+            figsize (tuple): Figure size.
+            cmap (Colormap | str): Colormap for the image.
+            rotation_gaussian (bool): Whether to fit with rotation.
+
+        """
+        self.pixel_radius = pixel_radius
+        self.rotation_gaussian = rotation_gaussian
+        self.fig = Figure(figsize=figsize)
+        FigureCanvasAgg(self.fig)
+        self.ax0 = self.fig.add_subplot(1, 3, 1)
+        self.ax1 = self.fig.add_subplot(1, 3, 2)
+        self.ax2 = self.fig.add_subplot(1, 3, 3)
+        empty = np.zeros((2 * pixel_radius, 2 * pixel_radius))
+        self.image = self.ax0.imshow(empty, cmap=cmap, origin="lower", aspect="auto")
+        self.ax0.set_xlabel("x")
+        self.ax0.set_ylabel("y")
+        self.label = self.ax0.text(
+            0.95,
+            0.95,
+            "",
+            transform=self.ax0.transAxes,
+            ha="right",
+            va="top",
+            fontsize=12,
+            color="white",
+        )
+        (self.x_data,) = self.ax1.plot([], [], "o", label="Data")
+        (self.x_fit,) = self.ax1.plot([], [], "-", label="Fit")
+        (self.y_data,) = self.ax2.plot([], [], "o", label="Data")
+        (self.y_fit,) = self.ax2.plot([], [], "-", label="Fit")
+
+    def update(self, data: xr.DataArray) -> ModelResult:
+        """Fit the frame and update the artists in place.
+
+        Args:
+            data (xr.DataArray): 2D beam monitor data.  If `attrs["z"]` exists, it
+                is shown on the image.
+
+        Returns:
+            ModelResult: The fitting result.
+
+        """
+        cropped, result = fit_beam(
+            data,
+            pixel_radius=self.pixel_radius,
+            rotation_gaussian=self.rotation_gaussian,
+        )
+        z = cropped.values
+        fit_z = result.best_fit.reshape(z.shape)
+        x, y = cropped.x.values, cropped.y.values
+        row = min(self.pixel_radius, z.shape[0] - 1)
+        col = min(self.pixel_radius, z.shape[1] - 1)
+
+        self.image.set_data(z)
+        self.image.set_extent((x[0], x[-1], y[0], y[-1]))
+        self.image.set_clim(z.min(), z.max())
+        self.label.set_text(f"z={data.attrs.get('z', '')}")
+        self.x_data.set_data(x, z[row, :])
+        self.x_fit.set_data(x, fit_z[row, :])
+        self.y_data.set_data(y, z[:, col])
+        self.y_fit.set_data(y, fit_z[:, col])
+        for ax in (self.ax1, self.ax2):
+            ax.relim()
+            ax.autoscale_view()
+            ax.set_ylim((0.0, None))
+        return result
+
+    def savefig(self, output: str | Path | PdfPages, dpi: float = 100) -> None:
+        """Save the current state of the figure (PNG file or a page of PdfPages)."""
+        if isinstance(output, PdfPages):
+            output.savefig(self.fig, dpi=dpi)
+        else:
+            self.fig.savefig(output, dpi=dpi)
+
+
+def _iter_frames(
+    filename: str,
+    frames: Sequence[int | str],
+    z_values: Sequence[float] | None,
+) -> Iterable[tuple[str, xr.DataArray]]:
+    for i, frame in enumerate(frames):
+        data = readhdf5(filename, frame=frame)  # type: ignore[arg-type]
+        if z_values is not None:
+            data.attrs["z"] = z_values[i]
+        yield str(frame), data
+
+
+def _render_png_chunk(
+    filename: str,
+    frames: Sequence[int | str],
+    z_values: Sequence[float] | None,
+    output_dir: Path,
+    dpi: float,
+    options: dict[str, Any],
+) -> list[dict[str, float]]:
+    renderer = BatchRenderer(**options)
+    params: list[dict[str, float]] = []
+    for frame, data in _iter_frames(filename, frames, z_values):
+        result = renderer.update(data)
+        renderer.savefig(output_dir / f"frame_{frame}.png", dpi=dpi)
+        params.append(result.params.valuesdict())
+    return params
+
+
+def render_report(  # noqa: PLR0913
+    filename: str,
+    output: str | Path,
+    frames: Sequence[int | str] | None = None,
+    z_values: Sequence[float] | None = None,
+    n_workers: int = 1,
+    dpi: float = 100,
+    **options: Any,  # noqa: ANN401
+) -> list[dict[str, float]]:
+    """Render the fits of all frames into a multi-page PDF or a PNG sequence.
+
+    Args:
+        filename (str): Path to the HDF5 file.
+        output (str | Path): Output PDF file (suffix ".pdf"), or the directory for
+            the PNG sequence (`frame_<frame>.png`).
+        frames (Sequence[int | str] | None): Frames to be rendered.  If None, all
+            frames under `/BG_DATA` are used in numerical order.
+        z_values (Sequence[float] | None): z positions shown in the image.
+        n_workers (int): Number of worker processes for the PNG sequence.  Each
+            worker reads its own frames and keeps its own figure.  The PDF is
+            always written by a single process.
+        dpi (float): Resolution of the output.
+        **options: Passed to :class:`BatchRenderer`.
+
+    Returns:
+        list[dict[str, float]]: Best fit parameters of each frame.
+
+    """
+    if frames is None:
+        with h5py.File(filename, "r") as f:
+            frames = frame_keys(f)
+    if z_values is not None:
+        assert len(z_values) == len(frames)
+    output = Path(output)
+    if output.suffix.lower() == ".pdf":
+        renderer = BatchRenderer(**options)
+        params: list[dict[str, float]] = []
+        with PdfPages(output) as pdf:
+            for _, data in _iter_frames(filename, frames, z_values):
+                result = renderer.update(data)
+                renderer.savefig(pdf, dpi=dpi)
+                params.append(result.params.valuesdict())
+        return params
+
+    output.mkdir(parents=True, exist_ok=True)
+    if n_workers <= 1:
+        return _render_png_chunk(filename, frames, z_values, output, dpi, options)
+    chunks = np.array_split(np.arange(len(frames)), n_workers)
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        futures = [
+            executor.submit(
+                _render_png_chunk,
+                filename,
+                [frames[i] for i in chunk],
+                None if z_values is None else [z_values[i] for i in chunk],
+                output,
+                dpi,
+                options,
+            )
+            for chunk in chunks
+            if len(chunk)
+        ]
+        return [p for future in futures for p in future.result()]
@@ -0,0 +1,157 @@
+"""Watch the beam monitor HDF5 file while the acquisition software is writing it.
+
+Only the frames appended under `/BG_DATA` since the last refresh are decoded and
+analyzed, thus the cost of each refresh does not grow with the file.
+
+Example:
+    >>> from bm_data.watch import FrameWatcher
+    >>> watcher = FrameWatcher("alignment.h5")
+    >>> watcher.watch(lambda frame, widths: print(frame, widths), timeout=60)
+
+or in the asyncio event loop (e.g. in Jupyter)
+
+    >>> async for frame, widths in FrameWatcher("alignment.h5").stream():
+    ...     print(frame, widths)
+
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import TYPE_CHECKING, Any
+
+import h5py
+
+from .bm_data import _read_frame, frame_keys
+from .caustic import second_moment_widths
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Callable
+    from datetime import datetime
+    from pathlib import Path
+
+    import numpy as np
+    from numpy.typing import NDArray
+
+    Analyzer = Callable[
+        [
+            NDArray[np.float64],
+            NDArray[np.float64],
+            NDArray[np.float64],
+            dict[str, int | float | datetime],
+        ],
+        Any,
+    ]
+
+
+def beam_widths(
+    matrix: NDArray[np.float64],
+    x_axis: NDArray[np.float64],
+    y_axis: NDArray[np.float64],
+    attrs: dict[str, int | float | datetime],  # noqa: ARG001
+) -> tuple[float, float, float, float]:
+    """Default analyzer: centroid and 1/e² radii (x0, y0, wx, wy) of the frame."""
+    return second_moment_widths(matrix, x_axis, y_axis)
+
+
+class FrameWatcher:
+    """Incremental reader of the beam monitor file being written.
+
+    The file is opened read-only on each refresh, in SWMR mode when the writer
+    supports it, otherwise without file locking.  The frame names already analyzed
+    are remembered, so only the new frames are decoded.  A frame whose datasets are
+    not complete yet is retried at the next refresh.
+
+    Attributes:
+        filename (str | Path): Path to the HDF5 file.
+        analyze (Analyzer): Function applied to each decoded frame.  It receives the
+            image, x axis, y axis and attrs (the same as :func:`readhdf5`).
+        interval (float): Polling interval in seconds.
+
+    """
+
+    def __init__(
+        self,
+        filename: str | Path,
+        analyze: Analyzer = beam_widths,
+        interval: float = 0.5,
+    ) -> None:
+        """Initialization.
+
+        Args:
+            filename (str | Path): Path to the HDF5 file.
+            analyze (Analyzer): Function applied to each new frame.
+            interval (float): Polling interval in seconds.
+
+        """
+        self.filename = filename
+        self.analyze = analyze
+        self.interval = interval
+        self.seen: set[str] = set()
+
+    def _open(self) -> h5py.File:
+        try:
+            return h5py.File(self.filename, "r", libver="latest", swmr=True)
+        except (OSError, ValueError):
+            return h5py.File(self.filename, "r", locking=False)
+
+    def poll(self) -> list[tuple[str, Any]]:
+        """Decode and analyze the frames appended since the last call.
+
+        Returns:
+            list[tuple[str, Any]]: Pairs of the frame name and the analyzed result.
+
+        """
+        results: list[tuple[str, Any]] = []
+        try:
+            f = self._open()
+        except OSError:  # The file is not created yet, or is being restructured.
+            return results
+        with f:
+            if "/BG_DATA" not in f:
+                return results
+            for frame in frame_keys(f):
+                if frame in self.seen:
+                    continue
+                try:
+                    decoded = _read_frame(f, frame)
+                except (KeyError, ValueError, OSError):  # being written
+                    continue
+                self.seen.add(frame)
+                results.append((frame, self.analyze(*decoded)))
+        return results
+
+    def watch(
+        self,
+        callback: Callable[[str, Any], None],
+        timeout: float | None = None,
+    ) -> None:
+        """Poll the file and publish the results of new frames through callback.
+
+        Args:
+            callback (Callable[[str, Any], None]): Called with the frame name and
+                the analyzed result.
+            timeout (float | None): Stop watching after this seconds.  If None,
+                watch until KeyboardInterrupt.
+
+        """
+        start = time.monotonic()
+        try:
+            while timeout is None or time.monotonic() - start < timeout:
+                for frame, result in self.poll():
+                    callback(frame, result)
+                time.sleep(self.interval)
+        except KeyboardInterrupt:
+            return
+
+    async def stream(self) -> AsyncIterator[tuple[str, Any]]:
+        """Yield the frame name and the analyzed result of new frames.
+
+        The HDF5 access runs in a worker thread so that the event loop is not
+        blocked.
+        """
+        while True:
+            for item in await asyncio.to_thread(self.poll):
+                yield item
+            await asyncio.sleep(self.interval)
@@ -0,0 +1,303 @@
+r"""Fermi-edge calibration of the detector channels from a gold reference map.
+
+The EDC of every channel (or angle) of the polycrystalline gold map is fitted at
+once (:func:`pes.peak_fit.fit_curves`) by the Fermi-Dirac edge with the
+linear density of states, convolved with the Gaussian resolution,
+
+:math:`I(E) = \int [A + B(E' - \mu)] f(E'; \mu, T) G(E - E'; \sigma) dE' + C`.
+
+The convolution is evaluated by a fixed quadrature (Gauss-Hermite over the
+Gaussian, or Gauss-Legendre over the Fermi function when the edge is sharper than
+the resolution, see :func:`fermi_edge`), so that the model and its analytic
+Jacobian are plain array operations over (channels, energies, nodes).  The
+temperature is fixed.
+
+The fitted edge positions :math:`\mu_c` give the energy shift of the channels in
+the unit of the pass energy, :math:`s_c = s_c^{0} + (\mu_\mathrm{ref} -
+\mu_c) / E_p`, as the position/shift table of :class:`pes.calib1d.Calib1d`.
+
+Example
+-------
+>>> edges = fit_fermi_edge(gold, temperature=30)
+>>> calib = edges_to_calib1d(edges, pass_energy=10, base=Calib1d("old.calib1d"))
+>>> calib.save("new.calib1d")
+
+"""
+
+from __future__ import annotations
+
+from functools import partial
+from typing import TYPE_CHECKING
+
+import numpy as np
+import xarray as xr
+from scipy.special import expit, logit, ndtr
+
+from .calib1d import Calib1d
+from .peak_fit import fit_curves
+
+if TYPE_CHECKING:
+    from numpy.typing import ArrayLike, NDArray
+
+BOLTZMANN_EV = 8.617333262e-5  # eV/K
+PARAM_NAMES = ("amplitude", "edge", "sigma", "slope", "offset")
+N_QUADRATURE = 24
+#: Header of the calib1d file made from scratch (see Calib1d._read_header)
+CALIB1D_HEADER: tuple[tuple[str, str | None], ...] = (
+    ("# [SPECS Phoibos 1D Calibration Dataset Version 100]\n", None),
+    ("# Creation Date ", ' ""\n'),
+    ("# SL Version    ", f' "{Calib1d.SL_Version} "\n'),
+    ("# SL Build Date ", f' "{Calib1d.SL_Build_Date}"\n'),
+    ("# Source        ", ' "pes.fermi_edge"\n'),
+    ("# Comment       ", ' ""\n'),
+    ("#\n## Position[mm] Energy[eV/Ep] Gain[]\n", None),
+)
+
+
+def _hermite_terms(
+    x: NDArray[np.float64],
+    sigma: NDArray[np.float64],
+    kt: float,
+    n_quadrature: int,
+) -> tuple[NDArray[np.float64], ...]:
+    """Return F0, F1 and their derivatives by x and sigma, over the Gaussian."""
+    nodes, weights = np.polynomial.hermite.hermgauss(n_quadrature)
+    weights = weights / np.sqrt(np.pi)
+    displacement = -np.sqrt(2) * nodes
+    energy = x[..., np.newaxis] + sigma[..., np.newaxis] * displacement
+    occupation = expit(-energy / kt)
+    d_occupation = -occupation * (1 - occupation) / kt
+    d_first = occupation + energy * d_occupation
+    return (
+        occupation @ weights,
+        (energy * occupation) @ weights,
+        d_occupation @ weights,
+        (d_occupation * displacement) @ weights,
+        d_first @ weights,
+        (d_first * displacement) @ weights,
+    )
+
+
+def _logistic_terms(
+    x: NDArray[np.float64],
+    sigma: NDArray[np.float64],
+    kt: float,
+    n_quadrature: int,
+) -> tuple[NDArray[np.float64], ...]:
+    """Return F0, F1 and their derivatives by x and sigma, over -f'."""
+    nodes, weights = np.polynomial.legendre.leggauss(n_quadrature)
+    weights = weights / 2
+    # nodes of the logistic distribution by its cumulative probability
+    position = kt * logit((nodes + 1) / 2)
+    sigma = sigma[..., np.newaxis]
+    z = (position - x[..., np.newaxis]) / sigma
+    density = np.exp(-(z**2) / 2) / np.sqrt(2 * np.pi)
+    zeroth = ndtr(z) @ weights
+    d_zeroth_x = -(density @ weights) / sigma[..., 0]
+    d_zeroth_sigma = -((density * z) @ weights) / sigma[..., 0]
+    return (
+        zeroth,
+        x * zeroth - sigma[..., 0] * (density @ weights),
+        d_zeroth_x,
+        d_zeroth_sigma,
+        zeroth + x * d_zeroth_x - (density * z) @ weights,
+        x * d_zeroth_sigma - (density * (1 + z**2)) @ weights,
+    )
+
+
+def fermi_edge(
+    x: NDArray[np.float64],
+    params: NDArray[np.float64],
+    *,
+    kt: float,
+    n_quadrature: int = N_QUADRATURE,
+) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """Return the Gaussian-broadened Fermi edge and its Jacobian.
+
+    With :math:`u = E' - \\mu`, the model is :math:`A F_0 + B F_1 + C`, where
+    :math:`F_n(E) = \\int u^n f(u) G(E - \\mu - u) du`.  For
+    :math:`\\sigma < 3 k_B T`, the integral is the Gauss-Hermite quadrature over
+    the Gaussian.  For the sharper edge, the Fermi function would be a step
+    between the nodes, and the integral by parts,
+    :math:`F_0 = \\langle\\Phi((t - E + \\mu) / \\sigma)\\rangle`,
+    :math:`F_1 = (E - \\mu) F_0 - \\sigma\\langle\\phi((t - E + \\mu) /
+    \\sigma)\\rangle` averaged over the logistic distribution :math:`-f'(t)`,
+    is the Gauss-Legendre quadrature over its cumulative probability.
+
+    Parameters
+    ----------
+    x: NDArray[np.float64]
+        Energy (m,)
+    params: NDArray[np.float64]
+        amplitude, edge, sigma, slope and offset of each curve (n, 5)
+    kt: float
+        :math:`k_B T` (eV)
+    n_quadrature: int
+        Number of the quadrature nodes
+
+    Returns
+    -------
+    tuple[NDArray[np.float64], NDArray[np.float64]]
+        Values (n, m) and the Jacobian (n, m, 5)
+
+    """
+    amplitude, edge, sigma, slope, offset = (
+        params[:, i, np.newaxis] for i in range(5)
+    )
+    relative = x - edge
+    sigma = np.broadcast_to(sigma, relative.shape)
+    terms = np.empty((6, *relative.shape))
+    sharp = params[:, 2] >= 3 * kt
+    for selected, integrate in ((~sharp, _hermite_terms), (sharp, _logistic_terms)):
+        if np.any(selected):
+            terms[:, selected] = integrate(
+                relative[selected],
+                sigma[selected],
+                kt,
+                n_quadrature,
+            )
+    zeroth, first, d_zeroth_x, d_zeroth_sigma, d_first_x, d_first_sigma = terms
+    jacobian = np.stack(
+        [
+            zeroth,
+            -(amplitude * d_zeroth_x + slope * d_first_x),
+            amplitude * d_zeroth_sigma + slope * d_first_sigma,
+            first,
+            np.ones_like(zeroth),
+        ],
+        axis=-1,
+    )
+    return amplitude * zeroth + slope * first + offset, jacobian
+
+
+def _initial_values(
+    x: NDArray[np.float64],
+    curves: NDArray[np.float64],
+) -> NDArray[np.float64]:
+    """Rough initial values from the levels below and above the edge."""
+    order = np.argsort(x)
+    x, curves = x[order], curves[:, order]
+    n_tail = max(len(x) // 10, 1)
+    offset = np.nanmean(curves[:, -n_tail:], axis=-1)
+    amplitude = np.nanmean(curves[:, :n_tail], axis=-1) - offset
+    step = float(np.mean(np.diff(x)))
+    above = np.sum(
+        (curves - offset[:, np.newaxis]) * np.sign(amplitude[:, np.newaxis])
+        > np.abs(amplitude[:, np.newaxis]) / 2,
+        axis=-1,
+    )
+    edge = x[0] + above * step
+    sigma = np.full(len(curves), 3 * step)
+    return np.stack([amplitude, edge, sigma, np.zeros(len(curves)), offset], axis=-1)
+
+
+def fit_fermi_edge(  # noqa: PLR0913
+    data: xr.DataArray,
+    *,
+    temperature: float = 300.0,
+    energy_axis: str = "eV",
+    n_workers: int = 1,
+    max_iter: int = 200,
+    tol: float = 1e-10,
+) -> xr.Dataset:
+    """Fit the Fermi edge of every EDC of the gold reference map.
+
+    Parameters
+    ----------
+    data: xr.DataArray
+        Gold map, e.g. (eV, phi) or (eV, channel).  The energy range should be
+        around the Fermi edge.
+    temperature: float
+        Temperature of the gold (K), fixed in the fit
+    energy_axis: str
+        Energy axis of the EDCs
+    n_workers: int
+        Number of the worker processes.  1 means fitting in this process.
+    max_iter: int
+        Maximum number of the iterations
+    tol: float
+        Relative decrease of the chi-square regarded as the convergence
+
+    Returns
+    -------
+    xr.Dataset
+        "amplitude", "edge", "sigma" (Gaussian, eV), "slope", "offset", their
+        standard errors ("<name>_stderr") and "redchi" over the other dimensions.
+
+    """
+    return fit_curves(
+        partial(fermi_edge, kt=BOLTZMANN_EV * temperature),
+        _initial_values,
+        data,
+        energy_axis,
+        PARAM_NAMES,
+        positive=[PARAM_NAMES.index("sigma")],
+        n_workers=n_workers,
+        max_iter=max_iter,
+        tol=tol,
+    ).assign_attrs(temperature=temperature)
+
+
+def edges_to_calib1d(
+    edges: xr.Dataset | xr.DataArray,
+    pass_energy: float,
+    *,
+    positions: ArrayLike | None = None,
+    reference: float | None = None,
+    base: Calib1d | None = None,
+) -> Calib1d:
+    """Return the Calib1d whose shifts align the fitted edges.
+
+    Parameters
+    ----------
+    edges: xr.Dataset | xr.DataArray
+        Result of :func:`fit_fermi_edge` (1D along the channels), or the edge
+        positions
+    pass_energy: float
+        Pass energy of the gold map (eV)
+    positions: ArrayLike | None
+        Position on the detector (mm) of each channel.  By default, the
+        coordinate of the channel axis.
+    reference: float | None
+        Edge energy which all the channels are aligned to.  By default, the
+        median of the edges.
+    base: Calib1d | None
+        Calibration with which the gold map was measured.  If given, the
+        corrections are interpolated onto its positions and added to its shifts,
+        and its header is kept.
+
+    Returns
+    -------
+    Calib1d
+        Position/shift table.  The channels failed in the fit are dropped.
+
+    """
+    edge = edges["edge"] if isinstance(edges, xr.Dataset) else edges
+    if edge.ndim != 1:
+        msg = f"The edges should be 1D along the channels, not {edge.dims}."
+        raise ValueError(msg)
+    edge_values = np.asarray(edge.values, dtype=np.float64)
+    channel_positions = np.asarray(
+        edge.coords[edge.dims[0]].values if positions is None else positions,
+        dtype=np.float64,
+    )
+    valid = np.isfinite(edge_values)
+    if reference is None:
+        reference = float(np.median(edge_values[valid]))
+    corrections = (reference - edge_values[valid]) / pass_energy
+    channel_positions = channel_positions[valid]
+    order = np.argsort(channel_positions)
+    calib = Calib1d()
+    if base is None:
+        calib.header.update(CALIB1D_HEADER)
+        calib.positions = channel_positions[order]
+        calib.shifts = corrections[order]
+    else:
+        calib.header.update(base.header)
+        calib.positions = np.array(base.positions)
+        calib.shifts = base.shifts + np.interp(
+            base.positions,
+            channel_positions[order],
+            corrections[order],
+        )
+    return calib
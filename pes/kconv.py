@@ -0,0 +1,349 @@
+r"""Conversion of the angle resolved maps to the momentum space.
+
+.. math::
+
+    k_\parallel = 0.5124 \sqrt{E_\mathrm{kin}} \sin(\phi - \phi_0)
+
+For the Fermi surface scan with the perpendicular angle :math:`\theta`,
+
+.. math::
+
+    k_x = k_0 \sin\phi, \quad k_y = k_0 \cos\phi \sin\theta, \quad
+    k_0 = 0.5124 \sqrt{E_\mathrm{kin}}
+
+The maps are converted by the inverse mapping: the (:math:`\phi`,
+:math:`\theta`) index of each point on the output (E, k) grid is computed once
+per (energy axis, angle axes, work function, photon energy, k grid), cached, and
+used by ``scipy.ndimage.map_coordinates`` for all the maps of a stack.
+
+The energy coordinate "eV" is the kinetic energy, if photon_energy is None.
+Otherwise it is :math:`E - E_F`, and the kinetic energy is
+:math:`E - E_F + h\nu - W`.
+
+Example
+-------
+>>> spectrum = load_itx("PES_16_Spectrum_3.itx")  # dims: ("phi", "eV")
+>>> kmap = convert_to_k(spectrum)  # dims: ("kp", "eV")
+
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+import numpy as np
+import xarray as xr
+from scipy.ndimage import map_coordinates
+
+if TYPE_CHECKING:
+    from numpy.typing import ArrayLike, NDArray
+
+K_PREFACTOR = 0.512410908328  # same as parabolic_band_dispersion_k
+KCONV_CACHE_SIZE = 8
+OUTSIDE = -1.0e6  # index out of the map, for the points beyond the horizon
+
+
+def _kinetic_energy(
+    energy: NDArray[np.float64],
+    work_function: float,
+    photon_energy: float | None,
+) -> NDArray[np.float64]:
+    if photon_energy is None:
+        return energy
+    return energy + photon_energy - work_function
+
+
+def _index(axis: NDArray[np.float64], value: NDArray[np.float64]) -> NDArray:
+    """Return the fractional index of the value on the uniform axis."""
+    return (value - axis[0]) / (axis[1] - axis[0])
+
+
+@lru_cache(maxsize=KCONV_CACHE_SIZE)
+def _coordinates_2d(  # noqa: PLR0913
+    energy: bytes,
+    phi: bytes,
+    k: bytes,
+    work_function: float,
+    photon_energy: float | None,
+    phi0: float,
+) -> NDArray[np.float64]:
+    """Return the (energy, phi) index of the (E, k) grid with the shape (2, n_E, n_k).
+
+    The arrays are given as bytes for the cache key.  The points beyond the
+    photoemission horizon get ``OUTSIDE``.
+    """
+    energy_axis = np.frombuffer(energy)
+    phi_axis = np.frombuffer(phi)
+    k_axis = np.frombuffer(k)
+    k0 = K_PREFACTOR * np.sqrt(
+        np.clip(_kinetic_energy(energy_axis, work_function, photon_energy), 0, None),
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sin_phi = k_axis[np.newaxis, :] / k0[:, np.newaxis]
+    phi_deg = np.rad2deg(np.arcsin(np.where(np.abs(sin_phi) <= 1, sin_phi, np.nan)))
+    coordinates = np.empty((2, len(energy_axis), len(k_axis)))
+    coordinates[0] = np.arange(len(energy_axis))[:, np.newaxis]
+    coordinates[1] = _index(phi_axis, phi_deg + phi0)
+    coordinates[np.isnan(coordinates)] = OUTSIDE
+    coordinates.flags.writeable = False
+    return coordinates
+
+
+@lru_cache(maxsize=KCONV_CACHE_SIZE)
+def _coordinates_3d(  # noqa: PLR0913
+    energy: bytes,
+    phi: bytes,
+    theta: bytes,
+    kx: bytes,
+    ky: bytes,
+    work_function: float,
+    photon_energy: float | None,
+    angle0: tuple[float, float],
+) -> NDArray[np.float64]:
+    """Return the (phi, theta) index of the (kx, ky) grid, (n_E, 2, n_kx, n_ky)."""
+    energy_axis = np.frombuffer(energy)
+    kx_axis = np.frombuffer(kx)[:, np.newaxis]
+    ky_axis = np.frombuffer(ky)[np.newaxis, :]
+    k0 = K_PREFACTOR * np.sqrt(
+        np.clip(_kinetic_energy(energy_axis, work_function, photon_energy), 0, None),
+    )[:, np.newaxis, np.newaxis]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        k_perp = np.sqrt(k0**2 - kx_axis**2)  # k0 cos(phi), NaN beyond the horizon
+        sin_theta = ky_axis / k_perp
+        phi_deg = np.rad2deg(np.arcsin(kx_axis / k0))
+    theta_deg = np.rad2deg(
+        np.arcsin(np.where(np.abs(sin_theta) <= 1, sin_theta, np.nan)),
+    )
+    coordinates = np.empty((len(energy_axis), 2, kx_axis.size, ky_axis.size))
+    coordinates[:, 0] = _index(np.frombuffer(phi), phi_deg + angle0[0])
+    coordinates[:, 1] = _index(np.frombuffer(theta), theta_deg + angle0[1])
+    coordinates[np.isnan(coordinates)] = OUTSIDE
+    coordinates.flags.writeable = False
+    return coordinates
+
+
+def clear_kconv_cache() -> None:
+    """Clear the cached interpolation coordinates."""
+    _coordinates_2d.cache_clear()
+    _coordinates_3d.cache_clear()
+
+
+def _axis(values: ArrayLike) -> NDArray[np.float64]:
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+def _k_range(
+    energy: NDArray[np.float64],
+    angle: NDArray[np.float64],
+    work_function: float,
+    photon_energy: float | None,
+    angle0: float,
+) -> NDArray[np.float64]:
+    """Default k axis covering the map with the same number of points as angle."""
+    kinetic_energy = _kinetic_energy(energy, work_function, photon_energy)
+    k0 = K_PREFACTOR * np.sqrt(np.max(kinetic_energy))
+    sin_angle = np.sin(np.deg2rad(angle - angle0))
+    return np.linspace(k0 * sin_angle.min(), k0 * sin_angle.max(), len(angle))
+
+
+def _map_slices(
+    images: NDArray[np.float64],
+    coordinates: NDArray[np.float64],
+    coordinate_index: NDArray[np.int_],
+    n_workers: int,
+    order: int,
+) -> NDArray[np.float64]:
+    """Apply map_coordinates to each image with coordinates[coordinate_index[i]].
+
+    The images are processed in the thread pool if n_workers > 1.
+    """
+
+    def _convert(i: int) -> NDArray[np.float64]:
+        return map_coordinates(
+            images[i],
+            coordinates[coordinate_index[i]],
+            order=order,
+            cval=np.nan,
+        )
+
+    if n_workers == 1:
+        return np.array([_convert(i) for i in range(len(images))])
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        return np.array(list(executor.map(_convert, range(len(images)))))
+
+
+def convert_to_k(  # noqa: PLR0913
+    data: xr.DataArray,
+    k: ArrayLike | None = None,
+    *,
+    work_function: float = 0.0,
+    photon_energy: float | None = None,
+    phi0: float = 0.0,
+    n_workers: int = 1,
+    order: int = 1,
+) -> xr.DataArray:
+    """Convert the (eV, phi) map(s) to (eV, kp).
+
+    Other dimensions (e.g. cycle, delay, or the perpendicular angle) are treated
+    as a stack of the maps, and converted with the same cached coordinates.
+
+    Parameters
+    ----------
+    data: xr.DataArray
+        Map(s) with the uniform "eV" and "phi" (degree) coordinates
+    k: ArrayLike | None
+        Output k axis (Å^-1).  By default, the range covered by the map with the
+        same number of points as phi.
+    work_function: float
+        Work function (eV), used with photon_energy
+    photon_energy: float | None
+        Photon energy (eV).  If None, "eV" is the kinetic energy.  Otherwise, it
+        is :math:`E - E_F`.
+    phi0: float
+        Normal emission angle (degree)
+    n_workers: int
+        Number of the threads converting the stack
+    order: int
+        Order of the spline interpolation (map_coordinates)
+
+    Returns
+    -------
+    xr.DataArray
+        The "phi" dimension is replaced by "kp".  NaN outside of the map.
+
+    """
+    energy = _axis(data.coords["eV"].values)
+    phi = _axis(data.coords["phi"].values)
+    k_axis = (
+        _k_range(energy, phi, work_function, photon_energy, phi0)
+        if k is None
+        else _axis(k)
+    )
+    coordinates = _coordinates_2d(
+        energy.tobytes(),
+        phi.tobytes(),
+        k_axis.tobytes(),
+        float(work_function),
+        None if photon_energy is None else float(photon_energy),
+        float(phi0),
+    )
+    moved = data.transpose(..., "eV", "phi")
+    stack_shape = moved.shape[:-2]
+    maps = moved.values.reshape(-1, len(energy), len(phi)).astype(np.float64)
+    converted = _map_slices(
+        maps,
+        coordinates[np.newaxis],
+        np.zeros(len(maps), dtype=int),
+        n_workers,
+        order,
+    )
+    coords = {
+        name: value
+        for name, value in moved.coords.items()
+        if "phi" not in value.dims
+    }
+    coords["kp"] = k_axis
+    return xr.DataArray(
+        converted.reshape(*stack_shape, len(energy), len(k_axis)),
+        coords=coords,
+        dims=(*moved.dims[:-1], "kp"),
+        name=data.name,
+        attrs=data.attrs,
+    ).transpose(*(("kp" if dim == "phi" else dim) for dim in data.dims))
+
+
+def convert_fermi_surface(  # noqa: PLR0913
+    data: xr.DataArray,
+    kx: ArrayLike | None = None,
+    ky: ArrayLike | None = None,
+    *,
+    theta_axis: str = "theta",
+    work_function: float = 0.0,
+    photon_energy: float | None = None,
+    phi0: float = 0.0,
+    theta0: float = 0.0,
+    n_workers: int = 1,
+    order: int = 1,
+) -> xr.DataArray:
+    """Convert the 3D (eV, phi, theta) Fermi surface scan to (eV, kx, ky).
+
+    Each energy slice is converted by one map_coordinates call with the cached
+    coordinates, and the slices are processed by n_workers threads.
+
+    Parameters
+    ----------
+    data: xr.DataArray
+        Scan with the uniform "eV", "phi" and theta_axis (degree) coordinates.
+        Other dimensions are treated as a stack.
+    kx, ky: ArrayLike | None
+        Output k axes (Å^-1).  By default, the range covered by the scan.
+    theta_axis: str
+        Name of the perpendicular angle
+    work_function, photon_energy, phi0, n_workers, order
+        See :func:`convert_to_k`
+    theta0: float
+        Normal emission of the perpendicular angle (degree)
+
+    Returns
+    -------
+    xr.DataArray
+        phi and theta_axis are replaced by "kx" and "ky".
+
+    """
+    energy = _axis(data.coords["eV"].values)
+    phi = _axis(data.coords["phi"].values)
+    theta = _axis(data.coords[theta_axis].values)
+    kx_axis = (
+        _k_range(energy, phi, work_function, photon_energy, phi0)
+        if kx is None
+        else _axis(kx)
+    )
+    ky_axis = (
+        _k_range(energy, theta, work_function, photon_energy, theta0)
+        if ky is None
+        else _axis(ky)
+    )
+    coordinates = _coordinates_3d(
+        energy.tobytes(),
+        phi.tobytes(),
+        theta.tobytes(),
+        kx_axis.tobytes(),
+        ky_axis.tobytes(),
+        float(work_function),
+        None if photon_energy is None else float(photon_energy),
+        (float(phi0), float(theta0)),
+    )
+    moved = data.transpose(..., "eV", "phi", theta_axis)
+    stack_shape = moved.shape[:-3]
+    energy_slices = moved.values.reshape(-1, len(phi), len(theta))
+    converted = _map_slices(
+        energy_slices.astype(np.float64),
+        coordinates,
+        np.tile(np.arange(len(energy)), len(energy_slices) // len(energy)),
+        n_workers,
+        order,
+    )
+    coords = {
+        name: value
+        for name, value in moved.coords.items()
+        if "phi" not in value.dims and theta_axis not in value.dims
+    }
+    coords["kx"] = kx_axis
+    coords["ky"] = ky_axis
+    output_dims = []
+    for dim in data.dims:
+        if dim == "phi":
+            output_dims.append("kx")
+        elif dim == theta_axis:
+            output_dims.append("ky")
+        else:
+            output_dims.append(dim)
+    return xr.DataArray(
+        converted.reshape(*stack_shape, len(energy), len(kx_axis), len(ky_axis)),
+        coords=coords,
+        dims=(*moved.dims[:-2], "kx", "ky"),
+        name=data.name,
+        attrs=data.attrs,
+    ).transpose(*output_dims)
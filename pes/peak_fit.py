@@ -0,0 +1,514 @@
+r"""Batch fitting of the EDC/MDC peaks, and the parabolic band dispersion.
+
+All the distribution curves of a map are fitted at once by the Levenberg-Marquardt
+method vectorized over the curves: each iteration evaluates the model and its
+analytic Jacobian for every curve in one shot, and solves the small normal
+equations of all the curves by a single batched ``np.linalg.solve``.  Each curve
+keeps its own damping factor and stops on its own convergence.  With n_workers >
+1, the curves are split into chunks fitted in the worker processes.
+:func:`fit_curves` does this for any model with the analytic Jacobian (also used
+by :mod:`pes.fermi_edge`).
+
+Models (with a constant background "offset"):
+
+* "lorentzian": :math:`\frac{A}{\pi}\frac{\gamma}{(x - x_0)^2 + \gamma^2}`
+* "voigt": :math:`A\,\mathrm{Re}[w(z)] / (\sigma\sqrt{2\pi})`,
+  :math:`z = (x - x_0 + i\gamma) / (\sigma\sqrt{2})`
+
+The NaN points (e.g. outside of the k-converted map) are ignored.
+
+The peak positions are then fitted by :func:`pes.parabolic_band_dispersion_k`
+or :func:`pes.parabolic_band_dispersion_angle`.
+
+Example
+-------
+>>> peaks = fit_mdcs(data.sel(eV=slice(9.2, 9.8)), model="lorentzian")
+>>> band = fit_dispersion(peaks)
+>>> band.e0, band.mass
+
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import TYPE_CHECKING
+
+import numpy as np
+import xarray as xr
+from scipy.optimize import curve_fit
+from scipy.special import wofz
+
+from . import parabolic_band_dispersion_angle, parabolic_band_dispersion_k
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+
+    from numpy.typing import NDArray
+
+    ModelFunction = Callable[
+        [NDArray[np.float64], NDArray[np.float64]],
+        tuple[NDArray[np.float64], NDArray[np.float64]],
+    ]
+    InitialFunction = Callable[
+        [NDArray[np.float64], NDArray[np.float64]],
+        NDArray[np.float64],
+    ]
+
+PARAM_NAMES: dict[str, tuple[str, ...]] = {
+    "lorentzian": ("amplitude", "center", "gamma", "offset"),
+    "voigt": ("amplitude", "center", "sigma", "gamma", "offset"),
+}
+#: Dimensions regarded as the emission angle (degree) in fit_dispersion
+ANGLE_DIMS = ("phi", "theta", "psi", "beta")
+
+
+def _lorentzian(
+    x: NDArray[np.float64],
+    params: NDArray[np.float64],
+) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """Return the values (n, m) and the Jacobian (n, m, 4) of the Lorentzian."""
+    amplitude, center, gamma, offset = (params[:, i, np.newaxis] for i in range(4))
+    dx = x - center
+    denominator = dx**2 + gamma**2
+    shape = gamma / (np.pi * denominator)
+    jacobian = np.stack(
+        [
+            shape,
+            2 * amplitude * shape * dx / denominator,
+            amplitude * (dx**2 - gamma**2) / (np.pi * denominator**2),
+            np.ones_like(shape),
+        ],
+        axis=-1,
+    )
+    return amplitude * shape + offset, jacobian
+
+
+def _voigt(
+    x: NDArray[np.float64],
+    params: NDArray[np.float64],
+) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """Return the values (n, m) and the Jacobian (n, m, 5) of the Voigt function."""
+    amplitude, center, sigma, gamma, offset = (
+        params[:, i, np.newaxis] for i in range(5)
+    )
+    scale = sigma * np.sqrt(2)
+    z = (x - center + 1j * gamma) / scale
+    w = wofz(z)
+    dw = -2 * z * w + 2j / np.sqrt(np.pi)
+    norm = 1 / (sigma * np.sqrt(2 * np.pi))
+    shape = w.real * norm
+    jacobian = np.stack(
+        [
+            shape,
+            -amplitude * norm * dw.real / scale,
+            -amplitude * (shape + norm * (dw * z).real) / sigma,
+            -amplitude * norm * dw.imag / scale,
+            np.ones_like(shape),
+        ],
+        axis=-1,
+    )
+    return amplitude * shape + offset, jacobian
+
+
+MODELS: dict[str, ModelFunction] = {
+    "lorentzian": _lorentzian,
+    "voigt": _voigt,
+}
+
+
+def _initial_values(
+    model: str,
+    x: NDArray[np.float64],
+    curves: NDArray[np.float64],
+) -> NDArray[np.float64]:
+    """Rough initial values from the maximum and the width at the half maximum."""
+    offset = np.nanmin(curves, axis=-1)
+    height = np.nanmax(curves, axis=-1) - offset
+    center = x[np.nanargmax(curves, axis=-1)]
+    step = float(np.mean(np.abs(np.diff(x))))
+    above = np.sum(curves - offset[:, np.newaxis] > height[:, np.newaxis] / 2, axis=-1)
+    hwhm = np.maximum(above, 1) * step / 2
+    if model == "lorentzian":
+        return np.stack([height * np.pi * hwhm, center, hwhm, offset], axis=-1)
+    sigma = hwhm / (2 * np.sqrt(2 * np.log(2)))
+    gamma = hwhm / 2
+    peak = wofz(1j * gamma / (sigma * np.sqrt(2))).real / (sigma * np.sqrt(2 * np.pi))
+    return np.stack([height / peak, center, sigma, gamma, offset], axis=-1)
+
+
+def batch_least_squares(  # noqa: PLR0913
+    function: ModelFunction,
+    x: NDArray[np.float64],
+    curves: NDArray[np.float64],
+    params: NDArray[np.float64],
+    *,
+    positive: Sequence[int] = (),
+    max_iter: int = 200,
+    tol: float = 1e-10,
+) -> tuple[NDArray[np.float64], NDArray[np.float64], NDArray[np.float64]]:
+    """Fit the curves (n, m) from params (n, p), all the curves at once.
+
+    Parameters
+    ----------
+    function: ModelFunction
+        ``function(x, params)`` returns the model values (n, m) and the Jacobian
+        (n, m, p) for the parameters (n, p)
+    x: NDArray[np.float64]
+        Independent variable (m,)
+    curves: NDArray[np.float64]
+        Data (n, m).  NaN points are ignored.
+    params: NDArray[np.float64]
+        Initial values (n, p), updated in place
+    positive: Sequence[int]
+        Indices of the parameters (widths) kept positive
+    max_iter: int
+        Maximum number of the iterations
+    tol: float
+        Relative decrease of the chi-square regarded as the convergence
+
+    Returns
+    -------
+    tuple[NDArray[np.float64], NDArray[np.float64], NDArray[np.float64]]
+        Best values (n, p), standard errors (n, p) and the reduced chi-square (n,)
+
+    """
+    n_param = params.shape[-1]
+    weight = np.isfinite(curves).astype(np.float64)
+    curves = np.nan_to_num(curves)
+    widths = list(positive)
+    min_width = 1e-3 * float(np.mean(np.abs(np.diff(x))))
+
+    def evaluate(
+        values: NDArray[np.float64],
+        target: NDArray[np.float64],
+        mask: NDArray[np.float64],
+    ) -> tuple[NDArray[np.float64], NDArray[np.float64], NDArray[np.float64]]:
+        model_values, jacobian = function(x, values)
+        residual = (target - model_values) * mask
+        return residual, jacobian * mask[..., np.newaxis], np.sum(residual**2, axis=-1)
+
+    residual, jacobian, cost = evaluate(params, curves, weight)
+    damping = np.full(len(params), 1e-3)
+    active = np.isfinite(cost)
+    for _ in range(max_iter):
+        index = np.flatnonzero(active)
+        if not index.size:
+            break
+        jtj = np.einsum("kmi,kmj->kij", jacobian[index], jacobian[index])
+        gradient = np.einsum("kmi,km->ki", jacobian[index], residual[index])
+        diagonal = np.einsum("kii->ki", jtj)
+        damped = jtj + np.einsum(
+            "ki,ij->kij",
+            damping[index, np.newaxis] * (diagonal + 1e-12),
+            np.eye(n_param),
+        )
+        step = np.linalg.solve(damped, gradient[..., np.newaxis])[..., 0]
+        trial = params[index] + step
+        trial[:, widths] = np.maximum(trial[:, widths], min_width)
+        new_residual, new_jacobian, new_cost = evaluate(
+            trial,
+            curves[index],
+            weight[index],
+        )
+        better = new_cost < cost[index]
+        accepted = index[better]
+        reduction = cost[accepted] - new_cost[better]
+        params[accepted] = trial[better]
+        residual[accepted] = new_residual[better]
+        jacobian[accepted] = new_jacobian[better]
+        cost[accepted] = new_cost[better]
+        damping[accepted] /= 10
+        damping[index[~better]] *= 10
+        converged = np.zeros(len(index), dtype=bool)
+        converged[better] = reduction <= tol * (cost[accepted] + tol)
+        converged |= damping[index] > 1e10
+        active[index[converged]] = False
+    dof = np.maximum(weight.sum(axis=-1) - n_param, 1)
+    redchi = cost / dof
+    jtj = np.einsum("kmi,kmj->kij", jacobian, jacobian)
+    stderr = np.full_like(params, np.nan)
+    invertible = np.linalg.matrix_rank(jtj) == n_param
+    stderr[invertible] = np.sqrt(
+        np.abs(np.einsum("kii->ki", np.linalg.inv(jtj[invertible])))
+        * redchi[invertible, np.newaxis],
+    )
+    return params, stderr, redchi
+
+
+def _fit_chunk(  # noqa: PLR0913
+    function: ModelFunction,
+    initial: InitialFunction,
+    x: NDArray[np.float64],
+    curves: NDArray[np.float64],
+    *,
+    n_param: int,
+    positive: Sequence[int],
+    max_iter: int,
+    tol: float,
+) -> NDArray[np.float64]:
+    """Fit the curves, and return (values, stderr, redchi) in one array (n, 2p+1)."""
+    result = np.full((len(curves), 2 * n_param + 1), np.nan)
+    valid = np.sum(np.isfinite(curves), axis=-1) > n_param
+    if not np.any(valid):
+        return result
+    params, stderr, redchi = batch_least_squares(
+        function,
+        x,
+        curves[valid],
+        initial(x, curves[valid]),
+        positive=positive,
+        max_iter=max_iter,
+        tol=tol,
+    )
+    result[valid] = np.concatenate([params, stderr, redchi[:, np.newaxis]], axis=-1)
+    return result
+
+
+def fit_curves(  # noqa: PLR0913
+    function: ModelFunction,
+    initial: InitialFunction,
+    data: xr.DataArray,
+    along: str,
+    names: Sequence[str],
+    *,
+    positive: Sequence[int] = (),
+    n_workers: int = 1,
+    max_iter: int = 200,
+    tol: float = 1e-10,
+) -> xr.Dataset:
+    """Fit the model to every curve of the data along the given axis.
+
+    The curves with too few finite points are not fitted (NaN in the result).
+    With n_workers > 1, the curves are split into chunks fitted in the worker
+    processes, so that function and initial should be picklable (module-level
+    functions or their partials).
+
+    Parameters
+    ----------
+    function: ModelFunction
+        ``function(x, params)`` returns the model values (n, m) and the Jacobian
+        (n, m, p)
+    initial: InitialFunction
+        ``initial(x, curves)`` returns the initial values (n, p) of the curves (n, m)
+    data: xr.DataArray
+        Map (or a stack of the maps)
+    along: str
+        Axis of the curves
+    names: Sequence[str]
+        Names of the p parameters
+    positive: Sequence[int]
+        Indices of the parameters (widths) kept positive
+    n_workers: int
+        Number of the worker processes.  1 means fitting in this process.
+    max_iter: int
+        Maximum number of the iterations
+    tol: float
+        Relative decrease of the chi-square regarded as the convergence
+
+    Returns
+    -------
+    xr.Dataset
+        Best values, their standard errors ("<name>_stderr") and "redchi" over the
+        other dimensions of the data.
+
+    """
+    moved = data.transpose(..., along)
+    x = np.asarray(moved.coords[along].values, dtype=np.float64)
+    curves = moved.values.reshape(-1, len(x)).astype(np.float64)
+    fit = partial(
+        _fit_chunk,
+        function,
+        initial,
+        x,
+        n_param=len(names),
+        positive=list(positive),
+        max_iter=max_iter,
+        tol=tol,
+    )
+    if n_workers <= 1:
+        result = fit(curves)
+    else:
+        chunks = [
+            chunk for chunk in np.array_split(curves, n_workers) if len(chunk)
+        ]
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            result = np.concatenate(list(executor.map(fit, chunks)))
+    columns = [*names, *(f"{name}_stderr" for name in names), "redchi"]
+    shape = moved.shape[:-1]
+    coords = {
+        name: value for name, value in moved.coords.items() if along not in value.dims
+    }
+    return xr.Dataset(
+        {
+            column: (moved.dims[:-1], result[:, i].reshape(shape))
+            for i, column in enumerate(columns)
+        },
+        coords=coords,
+    )
+
+
+def fit_peaks(  # noqa: PLR0913
+    data: xr.DataArray,
+    along: str,
+    model: str = "lorentzian",
+    *,
+    n_workers: int = 1,
+    max_iter: int = 200,
+    tol: float = 1e-10,
+) -> xr.Dataset:
+    """Fit a peak to every curve of the data along the given axis.
+
+    Parameters
+    ----------
+    data: xr.DataArray
+        Map (or a stack of the maps)
+    along: str
+        Axis of the curves ("eV" for the EDCs, "phi" or "kp" for the MDCs)
+    model: str
+        "lorentzian" or "voigt"
+    n_workers: int
+        Number of the worker processes.  1 means fitting in this process.
+    max_iter: int
+        Maximum number of the iterations
+    tol: float
+        Relative decrease of the chi-square regarded as the convergence
+
+    Returns
+    -------
+    xr.Dataset
+        Best values, their standard errors ("<name>_stderr") and "redchi" over the
+        other dimensions of the data.  NaN for the curves which cannot be fitted.
+
+    """
+    if model not in MODELS:
+        msg = f"model should be one of {list(MODELS)}, not {model}."
+        raise ValueError(msg)
+    names = PARAM_NAMES[model]
+    return fit_curves(
+        MODELS[model],
+        partial(_initial_values, model),
+        data,
+        along,
+        names,
+        positive=[i for i, name in enumerate(names) if name in {"sigma", "gamma"}],
+        n_workers=n_workers,
+        max_iter=max_iter,
+        tol=tol,
+    ).assign_attrs(model=model, along=along)
+
+
+def fit_mdcs(
+    data: xr.DataArray,
+    model: str = "lorentzian",
+    *,
+    momentum_axis: str = "phi",
+    **options: int | float,
+) -> xr.Dataset:
+    """Fit the MDCs, see :func:`fit_peaks`.  The centers are along momentum_axis."""
+    return fit_peaks(data, momentum_axis, model, **options)  # type: ignore[arg-type]
+
+
+def fit_edcs(
+    data: xr.DataArray,
+    model: str = "lorentzian",
+    **options: int | float,
+) -> xr.Dataset:
+    """Fit the EDCs, see :func:`fit_peaks`.  The centers are along "eV"."""
+    return fit_peaks(data, "eV", model, **options)  # type: ignore[arg-type]
+
+
+@dataclass(frozen=True)
+class Dispersion:
+    """Parabolic band fitted to the peak positions.
+
+    Attributes
+    ----------
+    e0: float
+        Energy at the Gamma point (eV)
+    mass: float
+        Effective mass in the unit of the electron mass
+    e0_stderr: float
+        Standard error of e0
+    mass_stderr: float
+        Standard error of mass
+    n_points: int
+        Number of the peak positions used
+
+    """
+
+    e0: float
+    mass: float
+    e0_stderr: float
+    mass_stderr: float
+    n_points: int
+
+
+def fit_dispersion(
+    peaks: xr.Dataset,
+    *,
+    angle: bool | None = None,
+    wf_offset: float = 0.0,
+    e0: float | None = None,
+    mass: float = 1.0,
+) -> Dispersion:
+    """Fit the parabolic band to the peak positions from fit_mdcs or fit_edcs.
+
+    For the MDC peaks, the points are (center, eV), and for the EDC peaks
+    (momentum coordinate, center).  The points with NaN are dropped.
+
+    Parameters
+    ----------
+    peaks: xr.Dataset
+        Result of :func:`fit_peaks` of a single map
+    angle: bool | None
+        If True, the momentum is the emission angle (degree), and
+        :func:`pes.parabolic_band_dispersion_angle` is used, otherwise
+        :func:`pes.parabolic_band_dispersion_k` (Å^-1).  If None, it is judged
+        from the name of the dimension (``ANGLE_DIMS``).
+    wf_offset: float
+        Work function offset of parabolic_band_dispersion_angle (fixed)
+    e0: float | None
+        Initial value of e0.  By default, the minimum energy of the points.
+    mass: float
+        Initial value of the mass
+
+    Returns
+    -------
+    Dispersion
+        e0, mass and their standard errors
+
+    """
+    along = peaks.attrs["along"]
+    if along == "eV":
+        others = [str(dim) for dim in peaks["center"].dims]
+        if len(others) != 1:
+            msg = f"The peaks should be a 1D result, not {others}."
+            raise ValueError(msg)
+        momentum_axis = others[0]
+        momentum = peaks.coords[momentum_axis].values
+        energy = peaks["center"].values
+    else:
+        momentum_axis = along
+        center, energy_coord = xr.broadcast(peaks["center"], peaks.coords["eV"])
+        momentum = center.values.ravel()
+        energy = energy_coord.values.ravel()
+    if angle is None:
+        angle = momentum_axis in ANGLE_DIMS
+    valid = np.isfinite(momentum) & np.isfinite(energy)
+    momentum, energy = momentum[valid], energy[valid]
+    function: Callable[..., NDArray[np.float64]] = parabolic_band_dispersion_k
+    if angle:
+        momentum = np.deg2rad(momentum)
+        function = partial(parabolic_band_dispersion_angle, wf_offset=wf_offset)
+    initial = [float(np.min(energy)) if e0 is None else e0, mass]
+    values, covariance = curve_fit(function, momentum, energy, p0=initial)
+    stderr = np.sqrt(np.diag(covariance))
+    return Dispersion(
+        e0=float(values[0]),
+        mass=float(values[1]),
+        e0_stderr=float(stderr[0]),
+        mass_stderr=float(stderr[1]),
+        n_points=int(valid.sum()),
+    )
@@ -1,6 +1,7 @@
 """Helper Function for phi correction.
 
-"import arpes" is essentially required.
+The shifts along phi are done by :func:`pes.shift.shift_by` (vectorized, without
+PyARPES).
 """
 
 from collections.abc import Callable
@@ -10,6 +11,8 @@ import numpy as np
 import xarray as xr
 from numpy.typing import NDArray
 
+from .shift import shift_by, sum_shifted
+
 T = TypeVar("T", NDArray[np.float64], float, xr.DataArray)
 
 
@@ -42,7 +45,13 @@ def correct_phi(
 
     """
     correction: xr.DataArray = phi_shift_func(data.coords["eV"])
-    shifted: xr.DataArray = data.G.shift_by(correction, "phi", extend_coords=True)
+    shifted: xr.DataArray = shift_by(
+        data,
+        correction,
+        "phi",
+        extend_coords=True,
+        fill_value=0.0,
+    )
     return shifted.assign_coords(phi=shifted.phi * shurink_phi).dropna(
         dim="phi",
         how="all",
@@ -54,11 +63,14 @@ def ch_calib(
     offset_stride: float,
     *,
     sums: bool = True,
+    accumulate: bool = False,
+    n_workers: int = 1,
 ) -> xr.Dataset | xr.DataArray:
     """Recalibrate channels along the phi direction.
 
     This function shifts each cycle in the data by a specified stride and optionally
-    sums the results.
+    sums the results.  The pixels vacated by the shift are filled with zero (as
+    PyARPES did), so that the phi edges of the sum keep the partial sums.
 
     Args:
         data (xr.DataArray): The dataarray to be corrected. Must be 3-dimensional and
@@ -67,6 +79,11 @@ def ch_calib(
             value is 0.09565217391304348 degrees.
         sums (bool, optional): If True, sum the recalibrated data arrays. If False,
             return concatenated arrays. Defaults to True.
+        accumulate (bool, optional): If True (and sums is True), each cycle is
+            shifted and added to the output buffer in place, so that the memory
+            usage does not depend on the number of cycles. Defaults to False.
+        n_workers (int, optional): Number of threads for the accumulate mode.
+            Defaults to 1.
 
     Returns:
         xr.Dataset | xr.DataArray: Calibrated ARPES data, either summed or concatenated
@@ -74,31 +91,24 @@ def ch_calib(
 
     """
     assert data.ndim == 3
-    original_attrs = data.attrs
-    dict_data_array = {
-        f"idx{int(_.item())}": data.sel({"cycle": _}, drop=True).assign_attrs(
-            tmp_cycle=int(_.item())
-        )
-        for _ in data.coords["cycle"]
-    }
-
-    ds_dict = {}
-    for idx, da in dict_data_array.items():
-        shift_value = (da.attrs["tmp_cycle"] - 1) * offset_stride
-        tmpda: xr.DataArray = da.G.shift_by(
-            np.full(len(da.coords["eV"]), shift_value),
+    cycles: xr.DataArray = data.coords["cycle"]
+    if sums and accumulate:
+        return sum_shifted(
+            data,
+            (cycles - 1) * offset_stride,
             shift_axis="phi",
+            sum_axis="cycle",
+            n_workers=n_workers,
+            fill_value=0.0,
         )
-        ds_dict[idx] = tmpda
-    ds = xr.Dataset(ds_dict)
+    shifted: xr.DataArray = shift_by(
+        data,
+        (cycles - 1) * offset_stride,
+        shift_axis="phi",
+        fill_value=0.0,
+    )
     if not sums:
-        dsarrays = ds.data_vars.values()
-        cycle_values = [da.attrs["tmp_cycle"] for da in dsarrays]
-        return xr.concat(
-            dsarrays,
-            dim=xr.DataArray(cycle_values, dims="cycle", name="cycle"),
-        )
-
-    new_da: xr.DataArray = sum(ds.data_vars.values())
-    new_da.attrs = original_attrs
+        return shifted.transpose("cycle", ...)
+    new_da: xr.DataArray = shifted.sum("cycle", skipna=False)
+    new_da.attrs = data.attrs
     return new_da
@@ -0,0 +1,203 @@
+"""Reader of the Igor text (itx) file exported by SpecsLab Prodigy.
+
+The file consists of the parameter comments, the numeric block and the axis
+scales::
+
+    IGOR
+    X //Acquisition Parameters:
+    X //Scan Mode         = Fixed Analyzer Transmission
+    ...
+    WAVES/S/N=(600,501) 'Spectrum_3_2'
+    BEGIN
+    1.19594 0.617605 0.724821 ...
+    ...
+    END
+    X SetScale/I x, -12.4792, 12.4792, "deg (theta_y)", 'Spectrum_3_2'
+    X SetScale/I y, 9, 10, "eV (Kinetic Energy)", 'Spectrum_3_2'
+    X SetScale/I d, 0, 22.8718, "cps (Intensity)", 'Spectrum_3_2'
+
+The file is mapped into the memory, and the numeric block between BEGIN and END
+is converted by a single call of ``np.fromstring``, not line by line.
+
+Example
+-------
+>>> itx = ProdigyItx("PES_16_Spectrum_3.itx")
+>>> itx.params["Excitation Energy"]
+4.992
+>>> spectrum = itx.to_data_array()  # dims: ("phi", "eV")
+
+"""
+
+from __future__ import annotations
+
+import mmap
+import re
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+import xarray as xr
+
+if TYPE_CHECKING:
+    from numpy.typing import NDArray
+
+WAVES_PATTERN = re.compile(rb"^WAVES/?\S*?/N=\(([\d,\s]+)\)\s*'?([^'\r\n]*)'?", re.M)
+SETSCALE_PATTERN = re.compile(
+    rb"^X SetScale/([IP]) ([xyztd]), *([^,]+), *([^,]+), *\"([^\"]*)\"",
+    re.M,
+)
+PARAM_PATTERN = re.compile(rb"^X //([^=\r\n]+?) *= ?([^\r\n]*?)\r?$", re.M)
+AXIS_NAMES = ("x", "y", "z", "t")
+
+#: Dimension name for the unit of the SetScale
+DIMENSION_NAMES: dict[str, str] = {
+    "deg": "phi",
+    "eV": "eV",
+}
+
+
+def _convert_value(value: str) -> int | float | str:
+    """Return the number if the value is numeric, otherwise the stripped str."""
+    value = value.strip()
+    for convert in (int, float):
+        try:
+            return convert(value)
+        except ValueError:
+            continue
+    return value
+
+
+class ProdigyItx:
+    """Igor text file (single wave) exported by SpecsLab Prodigy.
+
+    Attributes
+    ----------
+    params: dict[str, int | float | str]
+        Acquisition parameters in the "X //" comments
+    pixels: tuple[int, ...]
+        Shape of the wave
+    wavename: str
+        Wave name
+    axis_info: dict[str, tuple[float, float, str]]
+        Start, end (inclusive) and the unit of each axis ("x", "y", ...), and of
+        the data ("d")
+    intensity: NDArray[np.float64]
+        Data with the shape of pixels
+
+    """
+
+    def __init__(self, file_name: str | Path = "") -> None:
+        """Initialization.
+
+        Parameters
+        ----------
+        file_name: str | Path
+            itx file name.  If empty, the attributes are left empty.
+
+        """
+        self.params: dict[str, int | float | str] = {}
+        self.pixels: tuple[int, ...] = ()
+        self.wavename: str = ""
+        self.axis_info: dict[str, tuple[float, float, str]] = {}
+        self.intensity: NDArray[np.float64] = np.empty(0)
+        if file_name:
+            with (
+                Path(file_name).open("rb") as itx,
+                mmap.mmap(itx.fileno(), 0, access=mmap.ACCESS_READ) as content,
+            ):
+                self.parse(content)
+
+    def parse(self, content: bytes | mmap.mmap) -> None:
+        """Parse the content of the itx file.
+
+        Parameters
+        ----------
+        content: bytes | mmap.mmap
+            Content of the file
+
+        """
+        waves = WAVES_PATTERN.search(content)
+        if waves is None:
+            msg = "WAVES line is not found.  Is this an itx file?"
+            raise ValueError(msg)
+        header = content[: waves.start()]
+        for key, value in PARAM_PATTERN.findall(header):
+            self.params[key.decode().strip()] = _convert_value(value.decode())
+        self.pixels = tuple(int(n) for n in waves.group(1).split(b","))
+        self.wavename = waves.group(2).decode().strip()
+        begin = content.find(b"BEGIN", waves.end())
+        end = content.find(b"\nEND", begin)
+        if begin < 0 or end < 0:
+            msg = "BEGIN/END of the numeric block is not found."
+            raise ValueError(msg)
+        begin += len(b"BEGIN")
+        block = content[begin:end].decode("ascii")
+        data = np.fromstring(block, dtype=np.float64, sep=" ")
+        if data.size != np.prod(self.pixels):
+            msg = f"{data.size} values are found for the wave of {self.pixels}."
+            raise ValueError(msg)
+        self.intensity = data.reshape(self.pixels)
+        for scale, axis, first, second, unit in SETSCALE_PATTERN.findall(
+            content[end:],
+        ):
+            start, value = float(first), float(second)
+            if scale == b"P":  # start and delta
+                value = start + value * (self._axis_length(axis.decode()) - 1)
+            self.axis_info[axis.decode()] = (start, value, unit.decode())
+
+    def _axis_length(self, axis: str) -> int:
+        index = AXIS_NAMES.index(axis) if axis in AXIS_NAMES else len(self.pixels)
+        return self.pixels[index] if index < len(self.pixels) else 1
+
+    @property
+    def integrated_intensity(self) -> float:
+        """Return the sum of the intensity."""
+        return float(np.sum(self.intensity))
+
+    def to_data_array(self) -> xr.DataArray:
+        """Return the wave as xr.DataArray.
+
+        The dimension is named from the unit of SetScale ("deg" -> "phi", "eV" ->
+        "eV", see ``DIMENSION_NAMES``), otherwise the Igor axis name is used.
+        The parameters are stored in attrs.
+
+        Returns
+        -------
+        xr.DataArray
+            Spectrum
+
+        """
+        dims: list[str] = []
+        coords: dict[str, NDArray[np.float64]] = {}
+        for axis, n_pixel in zip(AXIS_NAMES, self.pixels, strict=False):
+            start, end, unit = self.axis_info.get(axis, (0, n_pixel - 1, ""))
+            dim = DIMENSION_NAMES.get(unit.split(" ")[0], axis)
+            dims.append(dim)
+            coords[dim] = np.linspace(start, end, n_pixel)
+        attrs: dict[str, int | float | str] = dict(self.params)
+        if "d" in self.axis_info:
+            attrs["units"] = self.axis_info["d"][2]
+        return xr.DataArray(
+            self.intensity,
+            coords=coords,
+            dims=dims,
+            name=self.wavename,
+            attrs=attrs,
+        )
+
+
+def load_itx(file_name: str | Path) -> xr.DataArray:
+    """Load the itx file exported by SpecsLab Prodigy as xr.DataArray.
+
+    Parameters
+    ----------
+    file_name: str | Path
+        itx file name
+
+    Returns
+    -------
+    xr.DataArray
+        Spectrum, see :meth:`ProdigyItx.to_data_array`
+
+    """
+    return ProdigyItx(file_name).to_data_array()
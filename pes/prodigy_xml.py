@@ -0,0 +1,304 @@
+"""Streaming reader of the XML file exported by SpecsLab (Prodigy).
+
+The XML file is the CORBA serialization of the region groups::
+
+    RegionGroupSeq
+      RegionGroup (name, regions)
+        RegionData (name, region (RegionDef), mcd_head, mcd_tail, analyzer_info,
+                    cycles, transmission, parameters, ...)
+          Cycle (time, scans)
+            ScanData (counts)
+
+The counts of a scan is stored as (curves_per_scan, mcd_head + values_per_curve +
+mcd_tail, number of the detector channels).  The detector channel c at the sample
+j measures the kinetic energy of
+:math:`E_0 + (j - \\mathrm{mcd\\_head})\\Delta E + s_c E_p`, where :math:`s_c` is
+the shift of the channel and :math:`E_p` the pass energy.
+
+The file is read by ``iterparse``, and each element is converted and cleared as
+soon as it is closed, so only one region is kept in the memory.  The regions not
+selected are skipped without converting their counts, and the parse stops when
+all the selected regions are found.
+
+Example
+-------
+>>> for region in iter_regions("SPLab-041.xml", regions=["Region2"]):
+...     spectrum = region.to_data_array()
+
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+from xml.etree.ElementTree import iterparse
+
+import numpy as np
+import xarray as xr
+
+if TYPE_CHECKING:
+    from collections.abc import Collection, Iterator
+    from xml.etree.ElementTree import Element
+
+    from numpy.typing import NDArray
+
+INTEGER_TAGS = {"short", "ushort", "long", "ulong", "octet"}
+FLOAT_TAGS = {"float", "double"}
+SEQUENCE_TAGS = {"sequence", "array"}
+
+
+@dataclass(frozen=True)
+class ProdigyRegion:
+    """A region in the SpecsLab XML file.
+
+    Attributes
+    ----------
+    name: str
+        Region name
+    group: str
+        Name of the region group
+    params: dict[str, Any]
+        Region definition (kinetic_energy, pass_energy, scan_delta, ...), and the
+        region parameters
+    detector_shift: NDArray[np.float64]
+        Energy shift of the detector channels (in the unit of the pass energy)
+    detector_position: NDArray[np.float64]
+        Position of the detector channels
+    mcd_head: int
+        Number of the extra samples before the region
+    mcd_tail: int
+        Number of the extra samples after the region
+    counts: NDArray[np.int64]
+        Raw counts with the shape (n_cycles, n_scans, curves_per_scan, n_samples,
+        n_detectors)
+    transmission: NDArray[np.float64]
+        Transmission function
+
+    """
+
+    name: str
+    group: str
+    params: dict[str, Any]
+    detector_shift: NDArray[np.float64]
+    detector_position: NDArray[np.float64]
+    mcd_head: int
+    mcd_tail: int
+    counts: NDArray[np.int64]
+    transmission: NDArray[np.float64] = field(repr=False)
+
+    @property
+    def energy(self) -> NDArray[np.float64]:
+        """Return the kinetic energy of the region."""
+        return self.params["kinetic_energy"] + self.params["scan_delta"] * np.arange(
+            self.params["values_per_curve"],
+        )
+
+    def spectrum(self) -> NDArray[np.float64]:
+        """Return the counts summed over the detector channels on the energy grid.
+
+        The channel c at the energy index i is linearly interpolated at the sample
+        :math:`i + \\mathrm{mcd\\_head} - s_c E_p / \\Delta E`.
+
+        Returns
+        -------
+        NDArray[np.float64]
+            The shape is (n_cycles, n_scans, curves_per_scan, values_per_curve).
+
+        """
+        offset = (
+            self.detector_shift * self.params["pass_energy"] / self.params["scan_delta"]
+        )
+        n_samples = self.counts.shape[-2]
+        position = np.clip(
+            np.arange(self.params["values_per_curve"])[:, np.newaxis]
+            + self.mcd_head
+            - offset,
+            0,
+            n_samples - 1,
+        )
+        lower = np.minimum(np.floor(position).astype(int), n_samples - 2)
+        weight = position - lower
+        channel = np.arange(self.counts.shape[-1])
+        counts = self.counts.astype(np.float64)
+        return np.sum(
+            counts[..., lower, channel] * (1 - weight)
+            + counts[..., lower + 1, channel] * weight,
+            axis=-1,
+        )
+
+    def to_data_array(self) -> xr.DataArray:
+        """Return the spectrum as xr.DataArray.
+
+        Returns
+        -------
+        xr.DataArray
+            Dimensions are ("cycle", "scan", "curve", "eV"), and the attrs are the
+            params.
+
+        """
+        spectrum = self.spectrum()
+        return xr.DataArray(
+            spectrum,
+            coords={
+                "cycle": np.arange(spectrum.shape[0]),
+                "scan": np.arange(spectrum.shape[1]),
+                "curve": np.arange(spectrum.shape[2]),
+                "eV": self.energy,
+            },
+            dims=("cycle", "scan", "curve", "eV"),
+            name=self.name,
+            attrs={"group": self.group, **self.params},
+        )
+
+
+def _leaf_value(elem: Element, *, in_sequence: bool) -> Any:  # noqa: ANN401
+    """Convert the primitive element.  In a sequence, the values are an array."""
+    text = elem.text or ""
+    if elem.tag in INTEGER_TAGS or elem.tag in FLOAT_TAGS:
+        dtype = np.int64 if elem.tag in INTEGER_TAGS else np.float64
+        values = np.fromstring(text, dtype=dtype, sep=" ")
+        return values if in_sequence else values.item()
+    if elem.tag == "boolean":
+        return text.strip() not in {"", "0", "false"}
+    return text.strip()
+
+
+def _value(
+    elem: Element,
+    children: list[tuple[str | None, Any]],
+    *,
+    in_sequence: bool,
+) -> Any:  # noqa: ANN401
+    if elem.tag == "struct":
+        return {name: value for name, value in children}
+    if elem.tag in SEQUENCE_TAGS:
+        values = [value for _, value in children]
+        if len(values) == 1 and isinstance(values[0], np.ndarray):
+            return values[0]
+        return values
+    if elem.tag == "any":
+        return children[0][1] if children else None
+    return _leaf_value(elem, in_sequence=in_sequence)
+
+
+def _parameters(parameters: list[dict[str, Any]]) -> dict[str, Any]:
+    return {parameter["name"]: parameter["value"] for parameter in parameters}
+
+
+def _region(data: dict[str, Any], group: str) -> ProdigyRegion:
+    definition = data["region"]
+    params = {
+        key: value for key, value in definition.items() if not isinstance(value, dict)
+    }
+    params["scan_mode"] = definition["scan_mode"]["name"]
+    params.update(_parameters(data.get("parameters", [])))
+    detectors = data["analyzer_info"]["detectors"]
+    n_samples = definition["values_per_curve"] + data["mcd_head"] + data["mcd_tail"]
+    counts = np.array(
+        [
+            [
+                scan["counts"].reshape(
+                    definition["curves_per_scan"],
+                    n_samples,
+                    len(detectors),
+                )
+                for scan in cycle["scans"]
+            ]
+            for cycle in data["cycles"]
+        ],
+    )
+    return ProdigyRegion(
+        name=data["name"],
+        group=group,
+        params=params,
+        detector_shift=np.array([d["shift"] for d in detectors]),
+        detector_position=np.array([d["position"] for d in detectors]),
+        mcd_head=data["mcd_head"],
+        mcd_tail=data["mcd_tail"],
+        counts=counts,
+        transmission=np.asarray(data["transmission"], dtype=np.float64),
+    )
+
+
+def iter_regions(
+    file_name: str | Path,
+    regions: Collection[str] | None = None,
+) -> Iterator[ProdigyRegion]:
+    """Yield the regions in the SpecsLab XML file one by one.
+
+    Parameters
+    ----------
+    file_name: str | Path
+        XML file name
+    regions: Collection[str] | None
+        Names of the regions to be read.  If None, all the regions are read.
+
+    Yields
+    ------
+    ProdigyRegion
+        Region
+
+    """
+    remaining = None if regions is None else set(regions)
+    # (element, converted children, skipped) of the open elements
+    stack: list[tuple[Element, list[tuple[str | None, Any]], bool]] = []
+    group = ""
+    with Path(file_name).open("rb") as xml_file:
+        for event, elem in iterparse(xml_file, events=("start", "end")):
+            if event == "start":
+                skipped = bool(stack) and stack[-1][2]
+                stack.append((elem, [], skipped))
+                continue
+            _, children, skipped = stack.pop()
+            type_name = elem.get("type_name")
+            name = elem.get("name")
+            if skipped:
+                elem.clear()
+                continue
+            in_sequence = bool(stack) and stack[-1][0].tag in SEQUENCE_TAGS
+            value = _value(elem, children, in_sequence=in_sequence)
+            elem.clear()
+            if not stack:
+                break
+            parent, siblings, _ = stack[-1]
+            if name == "name" and parent.get("type_name") == "RegionGroup":
+                group = value
+            if (
+                name == "name"
+                and parent.get("type_name") == "RegionData"
+                and remaining is not None
+                and value not in remaining
+            ):
+                stack[-1] = (parent, siblings, True)
+                continue
+            if type_name == "RegionData":
+                yield _region(value, group)
+                if remaining is not None:
+                    remaining.discard(value["name"])
+                    if not remaining:
+                        return
+                continue
+            siblings.append((name, value))
+
+
+def load_regions(
+    file_name: str | Path,
+    regions: Collection[str] | None = None,
+) -> dict[str, ProdigyRegion]:
+    """Return the regions in the SpecsLab XML file.
+
+    Parameters
+    ----------
+    file_name: str | Path
+        XML file name
+    regions: Collection[str] | None
+        Names of the regions to be read.  If None, all the regions are read.
+
+    Returns
+    -------
+    dict[str, ProdigyRegion]
+        Regions by name
+
+    """
+    return {region.name: region for region in iter_regions(file_name, regions)}
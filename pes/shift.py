@@ -0,0 +1,290 @@
+"""Fractional shift of the data along an axis, with a different shift for each row.
+
+The same operation as ``data.G.shift_by`` of PyARPES (which calls
+``scipy.ndimage.shift`` row by row), but done by one vectorized linear
+interpolation over the whole array:
+
+:math:`\\mathrm{out}(x) = \\mathrm{in}(x + \\mathrm{shift}_r)` for each row r
+along by_axis.
+
+The interpolation indices and weights depend only on the shift vector and the
+grid, and are cached, so that the same correction applied to many maps (e.g.
+``correct_phi``) builds them only once.
+
+Example
+-------
+>>> correction = phi_shift_from_pes130(data.coords["eV"])  # along "eV"
+>>> shifted = shift_by(data, correction, "phi", extend_coords=True)
+
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+import numpy as np
+import xarray as xr
+
+if TYPE_CHECKING:
+    from numpy.typing import ArrayLike, NDArray
+
+SHIFT_TABLE_CACHE_SIZE = 32
+
+
+@lru_cache(maxsize=SHIFT_TABLE_CACHE_SIZE)
+def _shift_table(
+    shift_pixels: bytes,
+    n_in: int,
+    n_pad: int,
+) -> tuple[NDArray[np.int_], NDArray[np.float64], NDArray[np.bool_]]:
+    """Return the flat lower index, the weight of the upper one and the valid mask.
+
+    Parameters
+    ----------
+    shift_pixels: bytes
+        Shift of each row in the unit of the pixel (float64 array as bytes, for
+        the cache key)
+    n_in: int
+        Number of the pixels along the shift axis
+    n_pad: int
+        Number of the pixels extended on each side
+
+    Returns
+    -------
+    tuple[NDArray[np.int_], NDArray[np.float64], NDArray[np.bool_]]
+        Arrays with the shape (n_rows, n_in + 2 n_pad), read-only.
+
+    """
+    shift = np.frombuffer(shift_pixels, dtype=np.float64)
+    position = (
+        np.arange(-n_pad, n_in + n_pad, dtype=np.float64)[np.newaxis, :]
+        + shift[:, np.newaxis]
+    )
+    valid = (position >= 0) & (position <= n_in - 1)
+    lower = np.clip(np.floor(position).astype(np.int_), 0, max(n_in - 2, 0))
+    weight = np.where(valid, position - lower, 0.0)
+    # index in the flattened (n_rows * n_in) rows
+    lower += n_in * np.arange(len(shift))[:, np.newaxis]
+    for table in (lower, weight, valid):
+        table.flags.writeable = False
+    return lower, weight, valid
+
+
+def clear_shift_cache() -> None:
+    """Clear the cached index and weight tables."""
+    _shift_table.cache_clear()
+
+
+def shift_array(
+    values: NDArray[np.float64],
+    shift_pixels: ArrayLike,
+    *,
+    n_pad: int = 0,
+    fill_value: float = np.nan,
+    out: NDArray[np.float64] | None = None,
+) -> NDArray[np.float64]:
+    """Shift the rows of the array along the last axis by the fractional pixels.
+
+    Parameters
+    ----------
+    values: NDArray[np.float64]
+        Data with the shape (..., n_rows, n).  The rows are the second last axis.
+    shift_pixels: ArrayLike
+        Shift of each row (pixel), :math:`\\mathrm{out}[j] = \\mathrm{in}[j + s]`
+    n_pad: int
+        Number of the pixels extended on each side of the last axis
+    fill_value: float
+        Value outside of the data
+    out: NDArray[np.float64] | None
+        Output buffer with the shape (..., n_rows, n + 2 n_pad).  If None, a new
+        array is allocated.
+
+    Returns
+    -------
+    NDArray[np.float64]
+        Shifted data with the shape (..., n_rows, n + 2 n_pad)
+
+    """
+    values = np.asarray(values, dtype=np.float64)
+    shift = np.ascontiguousarray(
+        np.broadcast_to(shift_pixels, values.shape[-2:-1]),
+        dtype=np.float64,
+    )
+    n_in = values.shape[-1]
+    lower, weight, valid = _shift_table(shift.tobytes(), n_in, n_pad)
+    if out is None:
+        out = np.empty((*values.shape[:-1], lower.shape[-1]))
+    if n_in == 1:
+        out[...] = values
+    else:
+        rows = values.reshape(*values.shape[:-2], -1)
+        np.take(rows, lower, axis=-1, out=out)
+        above = np.take(rows, lower + 1, axis=-1)
+        above -= out
+        above *= weight
+        out += above
+    out[..., ~valid] = fill_value
+    return out
+
+
+def shift_by(  # noqa: PLR0913
+    data: xr.DataArray,
+    shifts: ArrayLike | xr.DataArray,
+    shift_axis: str = "phi",
+    by_axis: str = "",
+    *,
+    extend_coords: bool = False,
+    fill_value: float = np.nan,
+) -> xr.DataArray:
+    """Shift the data along shift_axis by a different amount for each by_axis value.
+
+    Drop-in for ``data.G.shift_by(shifts, shift_axis, extend_coords=...)`` of
+    PyARPES, without the loop over the rows.
+
+    Parameters
+    ----------
+    data: xr.DataArray
+        Data with the uniform shift_axis
+    shifts: ArrayLike | xr.DataArray
+        Shift in the unit of the shift_axis coordinate, one for each value of
+        by_axis.  :math:`\\mathrm{out}(x) = \\mathrm{in}(x + \\mathrm{shift})`
+    shift_axis: str
+        Axis to be shifted
+    by_axis: str
+        Axis along which the shift changes.  If shifts is xr.DataArray, its
+        dimension is used.  If empty for 2D data, the other axis is used.
+    extend_coords: bool
+        If True, shift_axis is extended by the maximum shift on each side, so
+        that no data is lost.
+    fill_value: float
+        Value outside of the data
+
+    Returns
+    -------
+    xr.DataArray
+        Shifted data, with the same dimension order as data
+
+    """
+    if isinstance(shifts, xr.DataArray):
+        by_axis = str(shifts.dims[0])
+    if not by_axis:
+        others = [dim for dim in data.dims if dim != shift_axis]
+        if len(others) != 1:
+            msg = "by_axis should be specified for the data other than 2D."
+            raise ValueError(msg)
+        by_axis = str(others[0])
+    coord = data.coords[shift_axis].values
+    delta = float(coord[1] - coord[0])
+    shift_pixels = np.asarray(shifts, dtype=np.float64) / delta
+    assert shift_pixels.shape == (data.sizes[by_axis],)
+    n_pad = 0
+    if extend_coords and shift_pixels.size:
+        n_pad = int(np.ceil(np.max(np.abs(shift_pixels)) - 1e-9))
+    dims = data.dims
+    moved = data.transpose(..., by_axis, shift_axis)
+    shifted = shift_array(
+        moved.values,
+        shift_pixels,
+        n_pad=n_pad,
+        fill_value=fill_value,
+    )
+    new_coord = coord[0] + delta * np.arange(-n_pad, len(coord) + n_pad)
+    coords = {
+        name: value
+        for name, value in moved.coords.items()
+        if shift_axis not in value.dims
+    }
+    coords[shift_axis] = new_coord
+    return xr.DataArray(
+        shifted,
+        coords=coords,
+        dims=moved.dims,
+        name=data.name,
+        attrs=data.attrs,
+    ).transpose(*dims)
+
+
+def sum_shifted(  # noqa: PLR0913
+    data: xr.DataArray,
+    shifts: ArrayLike | xr.DataArray,
+    shift_axis: str = "phi",
+    sum_axis: str = "cycle",
+    *,
+    n_workers: int = 1,
+    fill_value: float = np.nan,
+) -> xr.DataArray:
+    """Shift each slice along sum_axis by its own amount, and accumulate them.
+
+    Each slice is shifted into a work buffer and added to the output buffer in
+    place, so that the memory usage is a few times the size of a slice,
+    regardless of the number of the slices.  With n_workers > 1, the slices are
+    processed in threads, each having its own buffers.
+
+    Parameters
+    ----------
+    data: xr.DataArray
+        Data with the uniform shift_axis
+    shifts: ArrayLike | xr.DataArray
+        Shift of each slice in the unit of the shift_axis coordinate,
+        :math:`\\mathrm{out}(x) = \\sum_i \\mathrm{in}_i(x + \\mathrm{shift}_i)`
+    shift_axis: str
+        Axis to be shifted
+    sum_axis: str
+        Axis to be summed over
+    n_workers: int
+        Number of the threads
+    fill_value: float
+        Value outside of the data (NaN propagates to the sum)
+
+    Returns
+    -------
+    xr.DataArray
+        Sum of the shifted slices, without sum_axis
+
+    """
+    coord = data.coords[shift_axis].values
+    delta = float(coord[1] - coord[0])
+    shift_pixels = np.asarray(shifts, dtype=np.float64) / delta
+    assert shift_pixels.shape == (data.sizes[sum_axis],)
+    moved = data.transpose(sum_axis, ..., shift_axis)
+    slice_shape = moved.shape[1:]
+    n_workers = max(1, min(n_workers, len(shift_pixels)))
+
+    def _accumulate(indices: range) -> NDArray[np.float64]:
+        total = np.zeros(slice_shape)
+        work = np.empty((*slice_shape[:-1], 1, slice_shape[-1]))
+        for i in indices:
+            values = moved[i].values
+            # a single row of the table is shared by all the rows of the slice
+            shift_array(
+                values.reshape(*values.shape[:-1], 1, values.shape[-1]),
+                shift_pixels[i : i + 1],
+                fill_value=fill_value,
+                out=work,
+            )
+            total += work[..., 0, :]
+        return total
+
+    chunks = [range(i, len(shift_pixels), n_workers) for i in range(n_workers)]
+    if n_workers == 1:
+        total = _accumulate(chunks[0])
+    else:
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            partial_sums = executor.map(_accumulate, chunks)
+            total = next(partial_sums)
+            for partial_sum in partial_sums:
+                total += partial_sum
+    coords = {
+        name: value
+        for name, value in moved.coords.items()
+        if sum_axis not in value.dims
+    }
+    return xr.DataArray(
+        total,
+        coords=coords,
+        dims=moved.dims[1:],
+        name=data.name,
+        attrs=data.attrs,
+    ).transpose(*(dim for dim in data.dims if dim != sum_axis))
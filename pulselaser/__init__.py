@@ -1,7 +1,13 @@
 """Basic functions for pulselaser module."""
 
+from collections.abc import Sequence
+
 import numpy as np
-from numpy.typing import NDArray
+from numpy.typing import ArrayLike, NDArray
+
+from .sellmeier import sellmeier_dispersion
+
+LIGHT_SPEED_MICRON_FS = 0.299792458
 
 
 def gaussian_pulse(
@@ -103,9 +109,57 @@ def broadening_after_n(
     """
     assert isinstance(iteration, int)
     assert iteration > 0
-    if iteration == 1:
-        return broadening(initial_width_fs, gdd)
-    return broadening(broadening_after_n(initial_width_fs, gdd, iteration - 1), gdd)
+    return broadening_table(initial_width_fs, gdd, iteration)[()]
+
+
+def broadening_table(
+    initial_width_fs: ArrayLike,
+    gdd: ArrayLike,
+    iteration: ArrayLike,
+) -> NDArray[np.float64]:
+    """Return pulse broadening after N iteration for arrays of the parameters.
+
+    The same as :func:`broadening_after_n` (:func:`broadening` is applied
+    iteration times), but the arguments are broadcast against each other, and the
+    passes are accumulated by a loop over the iteration count on the whole array.
+
+    Parameters
+    ----------
+    initial_width_fs: ArrayLike
+        initial pulse width (fs unit)
+    gdd: ArrayLike
+        Group delay dispersion (fs^2 unit) per iteration
+    iteration: ArrayLike
+        Number of iteration (int)
+
+    Returns
+    -------
+    NDArray[np.float64]
+        the output pulse width (fs unit) with the broadcast shape of the arguments
+
+    Examples
+    --------
+    Width after 1 - 5000 passes for three GDDs:
+
+    >>> broadening_table(30, [[100], [200], [500]], np.arange(1, 5001))
+
+    """
+    width, gdd_array, n = np.broadcast_arrays(
+        np.asarray(initial_width_fs, dtype=np.float64),
+        np.asarray(gdd, dtype=np.float64),
+        np.asarray(iteration),
+    )
+    assert np.issubdtype(n.dtype, np.integer)
+    assert np.all(width > 0)
+    assert np.all(gdd_array > 0)
+    assert np.all(n > 0)
+    table = np.empty(width.shape)
+    current = width.copy()
+    chirp_squared = gdd_array**2 * 16 * np.log(2) ** 2
+    for i in range(1, int(n.max(initial=0)) + 1):
+        current = np.sqrt(current**4 + chirp_squared) / current
+        table[n == i] = current[n == i]
+    return table
 
 
 def gdd(input_pulse_duration_fs: float, output_pulse_duration_fs: float) -> float:
@@ -133,5 +187,83 @@ def gdd(input_pulse_duration_fs: float, output_pulse_duration_fs: float) -> floa
 
 def gvd(lambda_micron: float, d2n: float) -> float:
     """Return GVD in fs^2/mm units."""
-    light_speed_micron_fs = 0.299792458
-    return lambda_micron**3 / (2 * np.pi * light_speed_micron_fs**2) * d2n * 1e3
+    return lambda_micron**3 / (2 * np.pi * LIGHT_SPEED_MICRON_FS**2) * d2n * 1e3
+
+
+def tod(lambda_micron: float, d2n: float, d3n: float) -> float:
+    """Return TOD (third order dispersion) in fs^3/mm units.
+
+    Parameters
+    ----------
+    lambda_micron: float
+        wavelength in micron
+    d2n: float
+        second derivative of the refractive index (micron^-2)
+    d3n: float
+        third derivative of the refractive index (micron^-3)
+
+    Returns
+    -------
+    float
+        TOD in fs^3/mm
+    """
+    return (
+        -(lambda_micron**4)
+        / (4 * np.pi**2 * LIGHT_SPEED_MICRON_FS**3)
+        * (3 * d2n + lambda_micron * d3n)
+        * 1e3
+    )
+
+
+def fod(lambda_micron: float, d2n: float, d3n: float, d4n: float) -> float:
+    """Return FOD (fourth order dispersion) in fs^4/mm units.
+
+    Parameters
+    ----------
+    lambda_micron: float
+        wavelength in micron
+    d2n: float
+        second derivative of the refractive index (micron^-2)
+    d3n: float
+        third derivative of the refractive index (micron^-3)
+    d4n: float
+        fourth derivative of the refractive index (micron^-4)
+
+    Returns
+    -------
+    float
+        FOD in fs^4/mm
+    """
+    return (
+        lambda_micron**5
+        / (8 * np.pi**3 * LIGHT_SPEED_MICRON_FS**4)
+        * (12 * d2n + 8 * lambda_micron * d3n + lambda_micron**2 * d4n)
+        * 1e3
+    )
+
+
+def material_dispersion(
+    materials: str | Sequence[str],
+    lambda_micron: ArrayLike,
+) -> NDArray[np.float64]:
+    r"""Return GVD, TOD and FOD of the registered materials over the wavelengths.
+
+    Parameters
+    ----------
+    materials: str | Sequence[str]
+        Material name(s) registered in ``pulselaser.sellmeier.SELLMEIER_REGISTRY``.
+    lambda_micron: ArrayLike
+        wavelength in micron
+
+    Returns
+    -------
+    NDArray[np.float64]
+        GVD (fs^2/mm), TOD (fs^3/mm) and FOD (fs^4/mm) stacked along the first axis.
+        The shape is (3, n_materials, \*lambda_micron.shape).  If materials is str,
+        the material axis is dropped.
+    """
+    lam = np.asarray(lambda_micron, dtype=np.float64)
+    _, _, d2n, d3n, d4n = sellmeier_dispersion(materials, lam, max_derivative=4)
+    return np.stack(
+        [gvd(lam, d2n), tod(lam, d2n, d3n), fod(lam, d2n, d3n, d4n)],
+    )
@@ -0,0 +1,278 @@
+r"""Fitting of the intensity autocorrelation traces.
+
+The autocorrelation of the Gaussian and :math:`\mathrm{sech}^2` pulses are fitted,
+and the pulse width is obtained by the deconvolution factor (the ratio of FWHM of
+the autocorrelation to that of the pulse).
+
+* Gaussian: :math:`\sqrt{2}`
+* :math:`\mathrm{sech}^2`: 1.5428
+
+Many traces are fitted in one ``scipy.optimize.least_squares`` call.  Each trace
+has its own amplitude, center, width and offset, and the Jacobian is block
+diagonal, which is told to the solver by ``jac_sparsity``.
+
+Example
+-------
+>>> from pulselaser.autocorrelation import fit_autocorrelation
+>>> result = fit_autocorrelation(delays, traces, shape="sech2")
+>>> result.pulse_width_fs, result.pulse_width_err_fs
+
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Literal
+
+import numpy as np
+from scipy.optimize import least_squares
+from scipy.sparse import csr_matrix
+
+from .stack import LIGHT_SPEED_MICRON_FS
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from numpy.typing import ArrayLike, NDArray
+
+PulseShape = Literal["gaussian", "sech2"]
+
+# FWHM of the sech^2 autocorrelation 3 (x coth x - 1) / sinh^2 x, and of sech^2
+SECH2_AC_FWHM = 2.7195849526105933
+SECH2_FWHM = 1.7627471740390863
+
+DECONVOLUTION_FACTOR: dict[str, float] = {
+    "gaussian": np.sqrt(2),
+    "sech2": SECH2_AC_FWHM / SECH2_FWHM,
+}
+
+N_PARAMS = 4  # amplitude, center, width, offset
+
+
+@dataclass(frozen=True)
+class AutocorrelationFit:
+    """Result of the autocorrelation fit of the traces.
+
+    Attributes
+    ----------
+    shape: str
+        "gaussian" or "sech2"
+    pulse_width_fs: NDArray[np.float64]
+        FWHM of the pulse (deconvolved)
+    pulse_width_err_fs: NDArray[np.float64]
+        Standard error of pulse_width_fs
+    ac_width_fs: NDArray[np.float64]
+        FWHM of the autocorrelation
+    center_fs: NDArray[np.float64]
+        Center (time zero) of the traces
+    amplitude: NDArray[np.float64]
+        Amplitude
+    offset: NDArray[np.float64]
+        Background
+
+    """
+
+    shape: str
+    pulse_width_fs: NDArray[np.float64]
+    pulse_width_err_fs: NDArray[np.float64]
+    ac_width_fs: NDArray[np.float64]
+    center_fs: NDArray[np.float64]
+    amplitude: NDArray[np.float64]
+    offset: NDArray[np.float64]
+
+
+def position_to_delay_fs(
+    position_mm: ArrayLike,
+    origin_mm: float = 0.0,
+    *,
+    double_pass: bool = True,
+) -> NDArray[np.float64]:
+    """Return the delay time (fs) for the position of the delay line.
+
+    Parameters
+    ----------
+    position_mm: ArrayLike
+        Position of the delay stage (mm)
+    origin_mm: float
+        Position of the time zero (mm)
+    double_pass: bool
+        If True (retro reflector), the optical path is twice the stage motion.
+
+    Returns
+    -------
+    NDArray[np.float64]
+        delay time in fs
+    """
+    path_micron = (np.asarray(position_mm, dtype=np.float64) - origin_mm) * 1e3
+    return (2 if double_pass else 1) * path_micron / LIGHT_SPEED_MICRON_FS
+
+
+def gaussian_autocorrelation(
+    tau: NDArray[np.float64],
+    ac_width: float,
+) -> NDArray[np.float64]:
+    """Autocorrelation of the Gaussian pulse (height is unity).
+
+    Parameters
+    ----------
+    tau: NDArray[np.float64]
+        delay
+    ac_width: float
+        FWHM of the autocorrelation (:math:`\\sqrt{2}` times the pulse FWHM)
+
+    Returns
+    -------
+    NDArray[np.float64]
+        autocorrelation
+    """
+    return np.exp(-4 * np.log(2) * (tau / ac_width) ** 2)
+
+
+def sech2_autocorrelation(
+    tau: NDArray[np.float64],
+    ac_width: float,
+) -> NDArray[np.float64]:
+    r"""Autocorrelation of the :math:`\mathrm{sech}^2` pulse (height is unity).
+
+    :math:`\frac{3(x\coth x - 1)}{\sinh^2 x}` with :math:`x = 2.7196\tau/\tau_{AC}`.
+
+    Parameters
+    ----------
+    tau: NDArray[np.float64]
+        delay
+    ac_width: float
+        FWHM of the autocorrelation (1.5428 times the pulse FWHM)
+
+    Returns
+    -------
+    NDArray[np.float64]
+        autocorrelation
+    """
+    x = np.abs(SECH2_AC_FWHM * np.asarray(tau, dtype=np.float64) / ac_width)
+    small = x < 1e-3  # noqa: PLR2004
+    x_safe = np.where(small, 1.0, np.minimum(x, 350))
+    exact = 3 * (x_safe / np.tanh(x_safe) - 1) / np.sinh(x_safe) ** 2
+    return np.where(small, 1 - 0.4 * x**2, exact)
+
+
+AUTOCORRELATION = {
+    "gaussian": gaussian_autocorrelation,
+    "sech2": sech2_autocorrelation,
+}
+
+
+def _initial_params(
+    delay: NDArray[np.float64],
+    trace: NDArray[np.float64],
+) -> NDArray[np.float64]:
+    """Amplitude, center, FWHM (from the second moment) and offset."""
+    offset = float(np.min(trace))
+    weight = np.clip(trace - offset, 0, None)
+    center = float(np.sum(weight * delay) / np.sum(weight))
+    sigma = np.sqrt(np.sum(weight * (delay - center) ** 2) / np.sum(weight))
+    return np.array(
+        [np.max(trace) - offset, center, 2 * np.sqrt(2 * np.log(2)) * sigma, offset],
+    )
+
+
+def fit_autocorrelation(
+    delays: NDArray[np.float64] | Sequence[NDArray[np.float64]],
+    traces: NDArray[np.float64] | Sequence[NDArray[np.float64]],
+    shape: PulseShape = "gaussian",
+) -> AutocorrelationFit:
+    """Fit the autocorrelation traces at once.
+
+    Parameters
+    ----------
+    delays: NDArray[np.float64] | Sequence[NDArray[np.float64]]
+        Delay time (fs) of each trace.  A 1D array is shared by all the traces.
+    traces: NDArray[np.float64] | Sequence[NDArray[np.float64]]
+        Traces, (n_traces, n_delay) array or the sequence of 1D arrays.
+    shape: PulseShape
+        "gaussian" or "sech2"
+
+    Returns
+    -------
+    AutocorrelationFit
+        Results of each trace
+    """
+    if shape not in AUTOCORRELATION:
+        msg = f"Unknown pulse shape: {shape}.  Choose from {list(AUTOCORRELATION)}"
+        raise ValueError(msg)
+    if np.ndim(traces[0]) == 0:  # single trace
+        traces = [traces]
+    y_list = [np.asarray(trace, dtype=np.float64) for trace in traces]
+    if np.ndim(delays[0]) == 0:  # shared by all the traces
+        x_list = [np.asarray(delays, dtype=np.float64)] * len(y_list)
+    else:
+        x_list = [np.asarray(delay, dtype=np.float64) for delay in delays]
+    assert len(x_list) == len(y_list)
+    n_traces = len(y_list)
+    func = AUTOCORRELATION[shape]
+    trace_index = np.repeat(np.arange(n_traces), [len(y) for y in y_list])
+    x_all = np.concatenate(x_list)
+    y_all = np.concatenate(y_list)
+    scale = np.repeat([np.ptp(y) or 1.0 for y in y_list], [len(y) for y in y_list])
+
+    def residual(p: NDArray[np.float64]) -> NDArray[np.float64]:
+        amplitude, center, width, offset = p.reshape(n_traces, N_PARAMS)[trace_index].T
+        return (amplitude * func(x_all - center, width) + offset - y_all) / scale
+
+    p0 = np.concatenate(
+        [_initial_params(x, y) for x, y in zip(x_list, y_list, strict=True)],
+    )
+    lower = np.tile([-np.inf, -np.inf, 0, -np.inf], n_traces)
+    sparsity = csr_matrix(
+        (
+            np.ones(len(y_all) * N_PARAMS),
+            (
+                np.repeat(np.arange(len(y_all)), N_PARAMS),
+                (trace_index[:, np.newaxis] * N_PARAMS + np.arange(N_PARAMS)).ravel(),
+            ),
+        ),
+        shape=(len(y_all), n_traces * N_PARAMS),
+    )
+    result = least_squares(
+        residual,
+        p0,
+        jac_sparsity=sparsity,
+        bounds=(lower, np.inf),
+        x_scale="jac",
+    )
+    params = result.x.reshape(n_traces, N_PARAMS)
+    errors = _standard_errors(result.jac, result.fun, trace_index, n_traces)
+    factor = DECONVOLUTION_FACTOR[shape]
+    return AutocorrelationFit(
+        shape=shape,
+        pulse_width_fs=params[:, 2] / factor,
+        pulse_width_err_fs=errors[:, 2] / factor,
+        ac_width_fs=params[:, 2],
+        center_fs=params[:, 1],
+        amplitude=params[:, 0],
+        offset=params[:, 3],
+    )
+
+
+def _standard_errors(
+    jac: NDArray[np.float64],
+    residual: NDArray[np.float64],
+    trace_index: NDArray[np.int_],
+    n_traces: int,
+) -> NDArray[np.float64]:
+    """Standard errors from the diagonal blocks of the Jacobian of each trace."""
+    jac = jac.tocsr() if hasattr(jac, "tocsr") else jac
+    errors = np.full((n_traces, N_PARAMS), np.nan)
+    for i in range(n_traces):
+        rows = trace_index == i
+        block = jac[rows][:, i * N_PARAMS : (i + 1) * N_PARAMS]
+        block = block.toarray() if hasattr(block, "toarray") else block
+        dof = np.count_nonzero(rows) - N_PARAMS
+        if dof <= 0:
+            continue
+        variance = np.sum(residual[rows] ** 2) / dof
+        try:
+            covariance = np.linalg.inv(block.T @ block) * variance
+        except np.linalg.LinAlgError:
+            continue
+        errors[i] = np.sqrt(np.diag(covariance))
+    return errors
@@ -1,9 +1,18 @@
 """Berek Polarization Compensator:  Model 5540 New Focus."""
 
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import TYPE_CHECKING
 
 import numpy as np
 
-from pulselaser.sellmeier import mgf2
+from pulselaser.sellmeier import sellmeier_dispersion
+
+if TYPE_CHECKING:
+    from numpy.typing import ArrayLike, NDArray
+
+THICKNESS_MICRON = 2000
 
 
 def retardance(lambda_micron: float, tilt_angle_degree: float) -> float:
@@ -22,17 +31,37 @@ def retardance(lambda_micron: float, tilt_angle_degree: float) -> float:
     float
         _description_
     """
-    theta = np.deg2rad(tilt_angle_degree)
+    return retardance_map(lambda_micron, tilt_angle_degree)[()]
+
+
+def retardance_map(
+    lambda_micron: ArrayLike,
+    tilt_angle_degree: ArrayLike,
+) -> NDArray[np.float64]:
+    """Return the retardance R (in waves) over the wavelength and tilt angle grids.
+
+    The refractive indices of MgF2 are evaluated only once for each wavelength.
+
+    Parameters
+    ----------
+    lambda_micron : ArrayLike
+        wave length of the light
+    tilt_angle_degree : ArrayLike
+        the tilt angle, broadcast with lambda_micron (e.g. lambda_micron[:, None]
+        and tilt_angle_degree[None, :] for the map)
+
+    Returns
+    -------
+    NDArray[np.float64]
+        retardance in waves
+    """
+    lam = np.asarray(lambda_micron, dtype=np.float64)
+    n_o, n_e = sellmeier_dispersion(["mgf2_o", "mgf2_e"], lam, max_derivative=0)[0]
+    sin2 = np.sin(np.deg2rad(tilt_angle_degree)) ** 2
     return (
-        (2000 / lambda_micron)
-        * np.sqrt(mgf2(lambda_micron)[0] ** 2 - np.sin(theta) ** 2)
-        * (
-            np.sqrt(
-                (1 - (1 / mgf2(lambda_micron)[1] ** (2)) * np.sin(theta) ** 2)
-                / (1 - (1 / mgf2(lambda_micron)[0] ** (2)) * np.sin(theta) ** 2),
-            )
-            - 1
-        )
+        (THICKNESS_MICRON / lam)
+        * np.sqrt(n_o**2 - sin2)
+        * (np.sqrt((1 - sin2 / n_e**2) / (1 - sin2 / n_o**2)) - 1)
     )
 
 
@@ -51,3 +80,161 @@ def tilt_angle_deg(retardation_indicator: float) -> float:
     """
     theta_r_rad = np.pi / 4 - np.arcsin((50.22 - retardation_indicator) / 71)
     return np.rad2deg(theta_r_rad)
+
+
+def indicator(tilt_angle_degree: ArrayLike) -> NDArray[np.float64]:
+    """Return the indicator value for the tilt angle (inverse of tilt_angle_deg).
+
+    Parameters
+    ----------
+    tilt_angle_degree : ArrayLike
+        tilt angle in degree.
+
+    Returns
+    -------
+    NDArray[np.float64]
+        indicator value
+    """
+    return 50.22 - 71 * np.sin(np.pi / 4 - np.deg2rad(tilt_angle_degree))
+
+
+class BerekTable:
+    """Interpolation table of the tilt angle for the wavelength and the retardance.
+
+    The tilt angle is tabulated on the regular grid of the wavelength and
+    :math:`\\sqrt{R / R_{max}(\\lambda)}` (the tilt angle is almost linear in it),
+    so that a query is a bilinear interpolation by the index arithmetic.
+
+    Attributes
+    ----------
+    lambda_range : tuple[float, float]
+        wavelength range (micron)
+    max_tilt_deg : float
+        maximum tilt angle (degree)
+    """
+
+    def __init__(
+        self,
+        lambda_range: tuple[float, float] = (0.2, 1.6),
+        max_tilt_deg: float = 80.0,
+        n_lambda: int = 701,
+        n_retardance: int = 1001,
+    ) -> None:
+        """Build the table.
+
+        Parameters
+        ----------
+        lambda_range : tuple[float, float]
+            wavelength range (micron)
+        max_tilt_deg : float
+            maximum tilt angle (degree).  The retardance should be monotonic up to
+            this angle.
+        n_lambda : int
+            number of the wavelength grid
+        n_retardance : int
+            number of the retardance grid
+        """
+        self.lambda_range = lambda_range
+        self.max_tilt_deg = max_tilt_deg
+        self._lambda = np.linspace(*lambda_range, n_lambda)
+        self._scale = np.linspace(0, 1, n_retardance)
+        tilt = np.linspace(0, max_tilt_deg, 4 * n_retardance)
+        r_map = retardance_map(self._lambda[:, np.newaxis], tilt[np.newaxis, :])
+        assert np.all(np.diff(r_map, axis=1) > 0)
+        self._r_max = r_map[:, -1]
+        scale = np.sqrt(r_map / self._r_max[:, np.newaxis])
+        self._tilt = np.array([np.interp(self._scale, s, tilt) for s in scale])
+
+    def tilt_angle(
+        self,
+        lambda_micron: ArrayLike,
+        retardance_wave: ArrayLike,
+    ) -> NDArray[np.float64]:
+        """Return the tilt angle (degree) for the retardance (waves).
+
+        Parameters
+        ----------
+        lambda_micron : ArrayLike
+            wave length of the light
+        retardance_wave : ArrayLike
+            target retardance in waves, broadcast with lambda_micron
+
+        Returns
+        -------
+        NDArray[np.float64]
+            tilt angle in degree.  NaN if out of the table.
+        """
+        lam, target = np.broadcast_arrays(
+            np.asarray(lambda_micron, dtype=np.float64),
+            np.asarray(retardance_wave, dtype=np.float64),
+        )
+        x = (lam - self._lambda[0]) / (self._lambda[1] - self._lambda[0])
+        i = np.clip(np.floor(x).astype(int), 0, len(self._lambda) - 2)
+        fx = x - i
+        r_max = self._r_max[i] * (1 - fx) + self._r_max[i + 1] * fx
+        with np.errstate(invalid="ignore"):
+            y = np.sqrt(target / r_max) / (self._scale[1] - self._scale[0])
+        valid = (x >= 0) & (x <= len(self._lambda) - 1) & (y >= 0)
+        valid &= y <= len(self._scale) - 1
+        y = np.where(valid, y, 0)
+        j = np.clip(np.floor(y).astype(int), 0, len(self._scale) - 2)
+        fy = y - j
+        tilt = (
+            self._tilt[i, j] * (1 - fx) * (1 - fy)
+            + self._tilt[i + 1, j] * fx * (1 - fy)
+            + self._tilt[i, j + 1] * (1 - fx) * fy
+            + self._tilt[i + 1, j + 1] * fx * fy
+        )
+        return np.where(valid, tilt, np.nan)
+
+    def solve(
+        self,
+        lambda_micron: ArrayLike,
+        retardance_wave: ArrayLike,
+    ) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+        """Return the tilt angle (degree) and the indicator for the retardance.
+
+        Parameters
+        ----------
+        lambda_micron : ArrayLike
+            wave length of the light
+        retardance_wave : ArrayLike
+            target retardance in waves
+
+        Returns
+        -------
+        tuple[NDArray[np.float64], NDArray[np.float64]]
+            tilt angle and indicator value
+        """
+        tilt = self.tilt_angle(lambda_micron, retardance_wave)
+        return tilt, indicator(tilt)
+
+
+@lru_cache(maxsize=8)
+def berek_table(
+    lambda_range: tuple[float, float] = (0.2, 1.6),
+    max_tilt_deg: float = 80.0,
+) -> BerekTable:
+    """Return the cached :class:`BerekTable`.  It is built at the first call."""
+    return BerekTable(lambda_range, max_tilt_deg)
+
+
+def solve_tilt(
+    lambda_micron: ArrayLike,
+    retardance_wave: ArrayLike,
+) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """Return the tilt angle (degree) and the indicator for the target retardance.
+
+    Parameters
+    ----------
+    lambda_micron : ArrayLike
+        wave length of the light (0.2 - 1.6 micron)
+    retardance_wave : ArrayLike
+        target retardance in waves (e.g. 0.25 for the quarter wave plate)
+
+    Returns
+    -------
+    tuple[NDArray[np.float64], NDArray[np.float64]]
+        tilt angle and indicator value
+    """
+    return berek_table().solve(lambda_micron, retardance_wave)
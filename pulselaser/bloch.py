@@ -3,20 +3,24 @@
 To describe the temporal evolution of the excited state in two level system.
 """
 
+from collections import OrderedDict
 from typing import TYPE_CHECKING
 
 import numpy as np
-from numpy.typing import NDArray
+from numpy.typing import ArrayLike, NDArray
 from scipy.integrate import solve_ivp
-from scipy.interpolate import interp1d
+from scipy.sparse import bsr_matrix
 
 from . import gaussian_pulse
 
 if TYPE_CHECKING:
-    from collections.abc import Callable
-
     from scipy.integrate._ivp import OdeResult
 
+SolutionKey = tuple[float, float, float, float, tuple[float, float], int, str]
+
+SOLUTION_CACHE_SIZE = 256
+_solution_cache: OrderedDict[SolutionKey, NDArray[np.float64]] = OrderedDict()
+
 
 def bloch(  # noqa: PLR0913
     t: NDArray[np.float64],
@@ -82,6 +86,13 @@ def rho22(
 ) -> np.float64:
     r""":math:`\rho_{22}` from bloch equation.
 
+    The normalized solution is memoized by (fwhm, t1, omega12_minus_omega, coeff_a,
+    t_span, num_t, method) with LRU eviction (``SOLUTION_CACHE_SIZE`` entries), so
+    that the repeated calls with the same parameters (e.g. in lmfit) do not solve
+    the equation again.  The equation is solved in the real form (:class:`BlochSystem`)
+    with the step limited by FWHM, so that the pulse is not stepped over even if
+    t_span starts long before the pulse.
+
     Parameters
     ----------
     t
@@ -110,19 +121,471 @@ def rho22(
         [TODO:description]
 
     """
-    init = [0 + 0j, 0 + 0j]
+    t_grid, normalized = solve_rho22(
+        fwhm,
+        t1,
+        omega12_minus_omega,
+        coeff_a,
+        t_span,
+        num_t,
+    )
+    return amplitude * np.interp(t, t_grid, normalized, left=0.0, right=0.0)
+
+
+def _solution_key(  # noqa: PLR0913
+    fwhm: float,
+    t1: float,
+    omega12_minus_omega: float,
+    coeff_a: float,
+    t_span: tuple[float, float],
+    num_t: int,
+    method: str = "RK45",
+) -> SolutionKey:
+    return (
+        float(fwhm),
+        float(t1),
+        float(omega12_minus_omega),
+        float(coeff_a),
+        (float(t_span[0]), float(t_span[1])),
+        int(num_t),
+        method,
+    )
+
+
+def _cache_get(key: SolutionKey) -> NDArray[np.float64] | None:
+    normalized = _solution_cache.get(key)
+    if normalized is not None:
+        _solution_cache.move_to_end(key)
+    return normalized
+
+
+def _cache_put(key: SolutionKey, normalized: NDArray[np.float64]) -> None:
+    normalized.flags.writeable = False
+    _solution_cache[key] = normalized
+    _solution_cache.move_to_end(key)
+    while len(_solution_cache) > SOLUTION_CACHE_SIZE:
+        _solution_cache.popitem(last=False)
+
+
+def clear_solution_cache() -> None:
+    """Clear the memoized solutions of the Bloch equation."""
+    _solution_cache.clear()
+
+
+def solve_rho22(  # noqa: PLR0913
+    fwhm: float,
+    t1: float,
+    omega12_minus_omega: float,
+    coeff_a: float,
+    t_span: tuple[float, float],
+    num_t: int,
+    method: str = "RK45",
+) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    r"""Return the time grid and the normalized :math:`\rho_{22}`, memoized (LRU).
+
+    Parameters
+    ----------
+    fwhm, t1, omega12_minus_omega, coeff_a
+        Parameters, see :func:`rho22`
+    t_span
+        time span, see :func:`rho22`
+    num_t
+        number of the time grid
+    method
+        Integration method, see :func:`rho22_batch`
+
+    Returns
+    -------
+    tuple[NDArray[np.float64], NDArray[np.float64]]
+        The time grid and :math:`\rho_{22}` normalized by its maximum.  The
+        solution is shared with the cache (read-only).
+
+    """
+    key = _solution_key(
+        fwhm,
+        t1,
+        omega12_minus_omega,
+        coeff_a,
+        t_span,
+        num_t,
+        method,
+    )
+    return np.linspace(*key[4], key[5]), _normalized_solutions([key])[key]
+
+
+def bloch_real(  # noqa: PLR0913
+    t: float,
+    y: NDArray[np.float64],
+    fwhm: NDArray[np.float64],
+    t1: NDArray[np.float64],
+    omega12_minus_omega: NDArray[np.float64],
+    coeff_a: NDArray[np.float64],
+) -> NDArray[np.float64]:
+    r"""Bloch equation of many parameter sets in the real form.
+
+    A shorthand of :class:`BlochSystem` for a single evaluation.  With
+    :math:`r = \rho_{22}`, :math:`u + iv = \tilde{\rho}_{12}`,
+    :math:`\Delta = \omega_{12}-\omega` and :math:`T_2 = 2T_1`,
+
+    .. math::
+
+        \dot{r} &= 2AEv - r / T_1 \\
+        \dot{u} &= -\Delta v - u / T_2 \\
+        \dot{v} &= -AE(2r - 1) + \Delta u - v / T_2
+
+    Parameters
+    ----------
+    t
+        time in fs unit.
+    y
+        (r, u, v) of each parameter set, flattened from the shape (n_sets, 3).
+    fwhm, t1, omega12_minus_omega, coeff_a
+        Parameters with the shape (n_sets,).  See :func:`bloch`.
+
+    Returns
+    -------
+    NDArray[np.float64]
+        The time derivative of y
+
+    """
+    return BlochSystem(fwhm, t1, omega12_minus_omega, coeff_a)(t, y)
+
+
+def bloch_real_jacobian(  # noqa: PLR0913
+    t: float,
+    y: NDArray[np.float64],  # noqa: ARG001
+    fwhm: NDArray[np.float64],
+    t1: NDArray[np.float64],
+    omega12_minus_omega: NDArray[np.float64],
+    coeff_a: NDArray[np.float64],
+) -> bsr_matrix:
+    """Analytic Jacobian of :func:`bloch_real`, block diagonal with 3x3 blocks."""
+    n_sets = len(t1)
+    a_e = coeff_a * gaussian_pulse(t=t, fwhm=fwhm, t0=0)
+    t2 = 2 * t1
+    blocks = np.zeros((n_sets, 3, 3))
+    blocks[:, 0, 0] = -1 / t1
+    blocks[:, 0, 2] = 2 * a_e
+    blocks[:, 1, 1] = -1 / t2
+    blocks[:, 1, 2] = -omega12_minus_omega
+    blocks[:, 2, 0] = -2 * a_e
+    blocks[:, 2, 1] = omega12_minus_omega
+    blocks[:, 2, 2] = -1 / t2
+    return bsr_matrix(
+        (blocks, np.arange(n_sets), np.arange(n_sets + 1)),
+        shape=(3 * n_sets, 3 * n_sets),
+    )
+
+
+class BlochSystem:
+    r"""Real form Bloch equations of many parameter sets with precomputed constants.
+
+    The equations of :func:`bloch_real`.  The coefficients of the field envelope
+    :math:`AE(t) = A\exp(-4\ln 2\, t^2/\mathrm{FWHM}^2)` and the relaxation
+    rates are computed once, and the right-hand side is written into
+    the given buffer.  :meth:`rk4` integrates all the sets on a fixed grid by the
+    classical Runge-Kutta scheme, with the envelope tabulated at the (half) steps
+    and the stages kept in preallocated arrays, so nothing is allocated per step.
+
+    Parameters
+    ----------
+    fwhm, t1, omega12_minus_omega, coeff_a
+        Parameters, broadcast against each other and flattened.  See :func:`bloch`.
+
+    """
+
+    def __init__(
+        self,
+        fwhm: ArrayLike,
+        t1: ArrayLike,
+        omega12_minus_omega: ArrayLike,
+        coeff_a: ArrayLike = 1e-3,
+    ) -> None:
+        fwhm_, t1_, delta, coeff_a_ = (
+            np.ravel(p).astype(np.float64)
+            for p in np.broadcast_arrays(fwhm, t1, omega12_minus_omega, coeff_a)
+        )
+        self.fwhm = fwhm_
+        self.t1 = t1_
+        self.n_sets = len(t1_)
+        self._exponent = -4 * np.log(2) / fwhm_**2
+        self._coeff_a = coeff_a_
+        self._delta = delta
+        self._decay = 1 / t1_
+        self._dephasing = 1 / (2 * t1_)
+        self._a_e = np.empty(self.n_sets)
+        self._work = np.empty(self.n_sets)
+        self._dydt = np.empty((self.n_sets, 3))
+
+    def field(
+        self,
+        t: float | NDArray[np.float64],
+        out: NDArray[np.float64] | None = None,
+    ) -> NDArray[np.float64]:
+        """Return :math:`AE(t)` with the shape (\\*t.shape, n_sets)."""
+        t_ = np.asarray(t, dtype=np.float64)[..., np.newaxis]
+        out = np.multiply(t_**2, self._exponent, out=out)
+        np.exp(out, out=out)
+        return np.multiply(out, self._coeff_a, out=out)
+
+    def derivative(
+        self,
+        y: NDArray[np.float64],
+        a_e: NDArray[np.float64],
+        out: NDArray[np.float64],
+    ) -> NDArray[np.float64]:
+        """Write dy/dt of y (n_sets, 3) at the field a_e (n_sets,) into out."""
+        r, u, v = y[:, 0], y[:, 1], y[:, 2]
+        work = self._work
+        # dr/dt = 2 AE v - r / T1
+        np.multiply(a_e, v, out=out[:, 0])
+        out[:, 0] *= 2
+        np.multiply(r, self._decay, out=work)
+        out[:, 0] -= work
+        # du/dt = -Delta v - u / T2
+        np.multiply(u, self._dephasing, out=out[:, 1])
+        np.multiply(self._delta, v, out=work)
+        out[:, 1] += work
+        out[:, 1] *= -1
+        # dv/dt = -AE (2r - 1) + Delta u - v / T2
+        np.multiply(r, 2, out=work)
+        work -= 1
+        work *= a_e
+        np.multiply(self._delta, u, out=out[:, 2])
+        out[:, 2] -= work
+        np.multiply(v, self._dephasing, out=work)
+        out[:, 2] -= work
+        return out
+
+    def __call__(self, t: float, y: NDArray[np.float64]) -> NDArray[np.float64]:
+        """Right-hand side for ``solve_ivp`` (y is flattened from (n_sets, 3))."""
+        self.field(t, out=self._a_e)
+        self.derivative(y.reshape(-1, 3), self._a_e, self._dydt)
+        # solve_ivp keeps the returned array (e.g. the derivative of the last
+        # accepted step of Radau and DOP853), so the buffer itself is not returned.
+        return self._dydt.ravel().copy()
+
+    def jacobian(self, t: float, y: NDArray[np.float64]) -> bsr_matrix:
+        """Analytic Jacobian, see :func:`bloch_real_jacobian`."""
+        return bloch_real_jacobian(
+            t,
+            y,
+            self.fwhm,
+            self.t1,
+            self._delta,
+            self._coeff_a,
+        )
+
+    def rk4(
+        self,
+        t_grid: NDArray[np.float64],
+        max_step: float | None = None,
+    ) -> NDArray[np.float64]:
+        """Integrate from zero on the uniform grid by the classical Runge-Kutta.
+
+        The step is an integer multiple (or fraction) of the grid spacing, and the
+        state on t_grid is obtained by the cubic Hermite interpolation of the
+        steps, with the derivatives already computed as the first stages.
+
+        Parameters
+        ----------
+        t_grid
+            Uniform time grid.  The state is zero at t_grid[0].
+        max_step
+            Maximum step.  By default, 1/8 of the shortest FWHM or :math:`T_1/2`,
+            whichever is shorter.
+
+        Returns
+        -------
+        NDArray[np.float64]
+            (r, u, v) with the shape (n_sets, len(t_grid), 3)
+
+        """
+        t_grid = np.asarray(t_grid, dtype=np.float64)
+        dt = t_grid[1] - t_grid[0]
+        if max_step is None:
+            max_step = min(np.min(self.fwhm) / 8, np.min(self.t1) / 2)
+        if abs(dt) > max_step:
+            h = dt / np.ceil(abs(dt) / max_step)
+        else:
+            h = dt * np.floor(max_step / abs(dt))
+        n_steps = int(np.ceil(round((t_grid[-1] - t_grid[0]) / h, 9)))
+        # envelope at every half step
+        a_e = self.field(t_grid[0] + h / 2 * np.arange(2 * n_steps + 1))
+        nodes = np.zeros((n_steps + 1, self.n_sets, 3))
+        slopes = np.empty_like(nodes)
+        y = np.zeros((self.n_sets, 3))
+        y_stage = np.empty_like(y)
+        k2, k3, k4 = (np.empty_like(y) for _ in range(3))
+        for step in range(n_steps):
+            half = 2 * step
+            k1 = self.derivative(y, a_e[half], slopes[step])
+            np.multiply(k1, h / 2, out=y_stage)
+            y_stage += y
+            self.derivative(y_stage, a_e[half + 1], k2)
+            np.multiply(k2, h / 2, out=y_stage)
+            y_stage += y
+            self.derivative(y_stage, a_e[half + 1], k3)
+            np.multiply(k3, h, out=y_stage)
+            y_stage += y
+            self.derivative(y_stage, a_e[half + 2], k4)
+            k2 += k3
+            k2 *= 2
+            k2 += k1
+            k2 += k4
+            k2 *= h / 6
+            y += k2
+            nodes[step + 1] = y
+        self.derivative(y, a_e[-1], slopes[-1])
+        x = (t_grid - t_grid[0]) / h
+        return _hermite(nodes, slopes * h, x).transpose(1, 0, 2)
+
+
+def _hermite(
+    nodes: NDArray[np.float64],
+    slopes: NDArray[np.float64],
+    x: NDArray[np.float64],
+) -> NDArray[np.float64]:
+    """Cubic Hermite interpolation on the unit spaced nodes (slopes per node)."""
+    index = np.clip(np.floor(x).astype(int), 0, len(nodes) - 2)
+    s = (x - index)[:, np.newaxis, np.newaxis]
+    h00 = (1 + 2 * s) * (1 - s) ** 2
+    h10 = s * (1 - s) ** 2
+    h01 = s**2 * (3 - 2 * s)
+    h11 = s**2 * (s - 1)
+    return (
+        h00 * nodes[index]
+        + h10 * slopes[index]
+        + h01 * nodes[index + 1]
+        + h11 * slopes[index + 1]
+    )
+
+
+IMPLICIT_METHODS = ("Radau", "BDF")
+FIXED_STEP_METHODS = ("RK4",)
+
+
+def _max_step(key: SolutionKey) -> float:
+    """Step limit of the key, so that the pulse is not stepped over."""
+    fwhm, t1, method = key[0], key[1], key[6]
+    if method in FIXED_STEP_METHODS:
+        return min(fwhm / 8, t1 / 2)
+    return fwhm / 4
+
+
+def _solve_group(keys: list[SolutionKey]) -> NDArray[np.float64]:
+    """Return :math:`\\rho_{22}` of the keys sharing t_span, num_t and method."""
+    t_span, num_t, method = keys[0][4:]
+    system = BlochSystem(*(np.array([key[i] for key in keys]) for i in range(4)))
+    t_eval = np.linspace(*t_span, num_t)
+    if method in FIXED_STEP_METHODS:
+        return system.rk4(t_eval, max_step=_max_step(keys[0]))[..., 0]
     sol: OdeResult = solve_ivp(
-        bloch,
+        system,
         t_span=t_span,
-        y0=init,
-        args=(fwhm, t1, omega12_minus_omega, coeff_a),
-        t_eval=np.linspace(*t_span, num_t),
+        y0=np.zeros(3 * len(keys)),
+        method=method,
+        t_eval=t_eval,
+        max_step=_max_step(keys[0]),
+        rtol=1e-6,
+        atol=1e-9,
+        **({"jac": system.jacobian} if method in IMPLICIT_METHODS else {}),
     )
-    rho22: Callable[[float], np.float64] = interp1d(
-        x=sol.t,
-        y=sol.y[0] / np.max(sol.y[0]),
-        assume_sorted=True,
-        bounds_error=False,
-        fill_value=0.0,
+    return sol.y[0::3]
+
+
+def _normalized_solutions(
+    keys: list[SolutionKey],
+) -> dict[SolutionKey, NDArray[np.float64]]:
+    """Return the normalized :math:`\\rho_{22}` of the keys.
+
+    The keys found in the cache are reused, and the rest are solved by
+    :class:`BlochSystem`, then stored in the cache.  The cached solution of a key
+    does not depend on the other keys solved at the same time: with "RK4", the
+    keys with the same step (:func:`_max_step`) are integrated together, which is
+    the same arithmetic as one by one.  With the adaptive methods, the step size
+    is controlled by the error of all the components of the system, so each key
+    is solved alone.
+    """
+    normalized: dict[SolutionKey, NDArray[np.float64]] = {}
+    for key in keys:
+        cached = _cache_get(key)
+        if cached is not None:
+            normalized[key] = cached
+    groups: dict[tuple, list[SolutionKey]] = {}
+    for key in dict.fromkeys(key for key in keys if key not in normalized):
+        group = (*key[4:], _max_step(key)) if key[6] in FIXED_STEP_METHODS else key
+        groups.setdefault(group, []).append(key)
+    for group_keys in groups.values():
+        r = _solve_group(group_keys)
+        r /= np.max(r, axis=1, keepdims=True)
+        for key, r_set in zip(group_keys, r, strict=True):
+            normalized[key] = r_set.copy()
+            _cache_put(key, normalized[key])
+    return normalized
+
+
+def rho22_batch(  # noqa: PLR0913
+    t: ArrayLike,
+    t_span: tuple[float, float],
+    fwhm: ArrayLike,
+    t1: ArrayLike,
+    omega12_minus_omega: ArrayLike,
+    amplitude: ArrayLike = 1.0,
+    num_t: int = 5000,
+    coeff_a: ArrayLike = 1e-3,
+    method: str = "RK45",
+) -> NDArray[np.float64]:
+    r""":math:`\rho_{22}` for many parameter sets.
+
+    The parameters are broadcast against each other.  The sets found in the cache
+    of :func:`rho22` (with the same method) are reused, and the rest are solved by
+    :class:`BlochSystem`, then stored in the cache.  With "RK4", the sets are
+    integrated together as one system.  With the adaptive methods, each set is
+    solved alone, so that the cached solution does not depend on the other sets.
+
+    Parameters
+    ----------
+    t
+        the time
+    t_span
+        time span, see :func:`rho22`
+    fwhm, t1, omega12_minus_omega, amplitude, coeff_a
+        Parameters (arrays), see :func:`rho22`
+    num_t
+        default is 5000.
+    method
+        Integration method of ``solve_ivp``.  For the implicit methods ("Radau" and
+        "BDF"), the analytic sparse Jacobian (:func:`bloch_real_jacobian`) is
+        used, which is preferable for stiff cases (e.g. :math:`T_1` much shorter
+        than the pulse).  "RK4" integrates on the fixed grid
+        (:meth:`BlochSystem.rk4`), which is the fastest for many parameter sets.
+        The solutions are cached separately for each method.
+
+    Returns
+    -------
+    NDArray[np.float64]
+        The shape is (\*broadcast parameter shape, \*t.shape).
+
+    """
+    *params, amplitude_ = np.broadcast_arrays(
+        *(
+            np.asarray(p, dtype=np.float64)
+            for p in (fwhm, t1, omega12_minus_omega, coeff_a, amplitude)
+        ),
     )
-    return amplitude * np.real(rho22(t))
+    shape = amplitude_.shape
+    keys = [
+        _solution_key(*p, t_span, num_t, method)
+        for p in zip(*(p.ravel() for p in params), strict=True)
+    ]
+    t_grid = np.linspace(float(t_span[0]), float(t_span[1]), num_t)
+    normalized = _normalized_solutions(keys)
+    t_array = np.asarray(t, dtype=np.float64)
+    result = np.array(
+        [
+            np.interp(t_array, t_grid, normalized[key], left=0.0, right=0.0)
+            for key in keys
+        ],
+    ).reshape(shape + t_array.shape)
+    return amplitude_[(...,) + (np.newaxis,) * t_array.ndim] * result
@@ -0,0 +1,339 @@
+r"""Design of the prism pair and the grating pair compressors.
+
+The GDD and TOD of the compressors are given analytically, and evaluated over
+arrays of the geometries at once.  The geometry cancelling the dispersion of the
+beamline (:class:`pulselaser.stack.OpticalStack`) is found by the grid search.
+
+Prism pair (Brewster prisms, apex-to-apex separation :math:`L`, glass path
+:math:`L_g`, for a single pass),
+
+:math:`P'' = L_g n'' - 8 L n'^2`, :math:`P''' = L_g n''' - 24 L n' n''`,
+
+from the path :math:`P = L_g n + 2L\cos 2\Delta n` around the center wavelength
+(:math:`\Delta n = 0`).
+
+:math:`GDD = \frac{\lambda^3}{2\pi c^2} P''`, :math:`TOD = -\frac{\lambda^4}{4\pi^2
+c^3}(3P'' + \lambda P''')`.
+
+Grating pair (Treacy, first order, perpendicular separation :math:`G`, groove
+spacing :math:`d`, incidence angle :math:`\gamma`, for a single pass),
+
+:math:`GDD = -\frac{\lambda^3 G}{2\pi c^2 d^2}\left[1 - \left(\frac{\lambda}{d}
+- \sin\gamma\right)^2\right]^{-3/2}`,
+
+:math:`TOD = -GDD \frac{3\lambda}{2\pi c} \frac{1 + \frac{\lambda}{d}\sin\gamma
+- \sin^2\gamma}{1 - \left(\frac{\lambda}{d} - \sin\gamma\right)^2}`.
+
+Example
+-------
+>>> from pulselaser.stack import OpticalStack
+>>> beamline = OpticalStack([("fused_silica", 20), ("bk7", 10)])
+>>> design = optimize_prism_pair("sf10", 0.8, beamline,
+...                              np.linspace(100, 1000, 901), np.linspace(0, 20, 201))
+>>> design.parameters
+
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .sellmeier import sellmeier_dispersion
+from .stack import LIGHT_SPEED_MICRON_FS, OpticalStack
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from numpy.typing import ArrayLike, NDArray
+
+
+@dataclass(frozen=True)
+class CompressorDesign:
+    """Result of the compressor optimization.
+
+    Attributes
+    ----------
+    parameters: dict[str, float]
+        The best geometry (e.g. {"separation_mm": .., "insertion_mm": ..}).
+    gdd: float
+        GDD of the compressor (fs^2)
+    tod: float
+        TOD of the compressor (fs^3)
+    residual_gdd: float
+        GDD of the compressor and the beamline (fs^2)
+    residual_tod: float
+        TOD of the compressor and the beamline (fs^3)
+    score: NDArray[np.float64]
+        Score (squared residual phase, rad^2) of all the candidates.
+
+    """
+
+    parameters: dict[str, float]
+    gdd: float
+    tod: float
+    residual_gdd: float
+    residual_tod: float
+    score: NDArray[np.float64]
+
+
+def prism_pair_dispersion(
+    material: str,
+    lambda_micron: float,
+    separation_mm: ArrayLike,
+    insertion_mm: ArrayLike,
+    *,
+    double_pass: bool = True,
+) -> NDArray[np.float64]:
+    """Return GDD (fs^2) and TOD (fs^3) of the Brewster prism pair.
+
+    Parameters
+    ----------
+    material: str
+        Prism material registered in ``SELLMEIER_REGISTRY``
+    lambda_micron: float
+        Center wavelength in micron
+    separation_mm: ArrayLike
+        Apex-to-apex separation (mm)
+    insertion_mm: ArrayLike
+        Glass path in the two prisms per pass (mm)
+    double_pass: bool
+        If True, the compressor is passed twice (with the folding mirror).
+
+    Returns
+    -------
+    NDArray[np.float64]
+        GDD and TOD stacked along the first axis.  The shape is (2, \\*broadcast
+        shape of separation_mm and insertion_mm).
+
+    """
+    _, dn, d2n, d3n = sellmeier_dispersion(material, lambda_micron, max_derivative=3)
+    separation = np.asarray(separation_mm, dtype=np.float64) * 1e3
+    insertion = np.asarray(insertion_mm, dtype=np.float64) * 1e3
+    p2 = insertion * d2n - 8 * separation * dn**2
+    p3 = insertion * d3n - 24 * separation * dn * d2n
+    return _path_to_dispersion(lambda_micron, p2, p3) * (2 if double_pass else 1)
+
+
+def _path_to_dispersion(
+    lambda_micron: float,
+    p2: NDArray[np.float64],
+    p3: NDArray[np.float64],
+) -> NDArray[np.float64]:
+    """GDD and TOD from the second and third derivatives of the optical path."""
+    c = LIGHT_SPEED_MICRON_FS
+    gdd = lambda_micron**3 / (2 * np.pi * c**2) * p2
+    tod = -(lambda_micron**4) / (4 * np.pi**2 * c**3) * (3 * p2 + lambda_micron * p3)
+    return np.stack(np.broadcast_arrays(gdd, tod))
+
+
+def grating_pair_dispersion(
+    lambda_micron: float,
+    separation_mm: ArrayLike,
+    incidence_deg: ArrayLike,
+    grooves_per_mm: ArrayLike,
+    *,
+    double_pass: bool = True,
+) -> NDArray[np.float64]:
+    """Return GDD (fs^2) and TOD (fs^3) of the grating pair (first order).
+
+    Parameters
+    ----------
+    lambda_micron: float
+        Center wavelength in micron
+    separation_mm: ArrayLike
+        Perpendicular separation of the gratings (mm)
+    incidence_deg: ArrayLike
+        Incidence angle (degree)
+    grooves_per_mm: ArrayLike
+        Groove density (lines/mm)
+    double_pass: bool
+        If True, the compressor is passed twice.
+
+    Returns
+    -------
+    NDArray[np.float64]
+        GDD and TOD stacked along the first axis.  NaN if the first order does
+        not exist.
+
+    """
+    c = LIGHT_SPEED_MICRON_FS
+    spacing = 1e3 / np.asarray(grooves_per_mm, dtype=np.float64)  # micron
+    separation = np.asarray(separation_mm, dtype=np.float64) * 1e3
+    sin_gamma = np.sin(np.deg2rad(incidence_deg))
+    with np.errstate(invalid="ignore"):
+        cos2_diffraction = 1 - (lambda_micron / spacing - sin_gamma) ** 2
+        gdd = (
+            -(lambda_micron**3)
+            * separation
+            / (2 * np.pi * c**2 * spacing**2)
+            * cos2_diffraction ** (-1.5)
+        )
+        tod = (
+            -gdd
+            * 3
+            * lambda_micron
+            / (2 * np.pi * c)
+            * (1 + lambda_micron / spacing * sin_gamma - sin_gamma**2)
+            / cos2_diffraction
+        )
+    dispersion = np.stack(np.broadcast_arrays(gdd, tod)) * (2 if double_pass else 1)
+    return np.where(cos2_diffraction > 0, dispersion, np.nan)
+
+
+def _beamline_dispersion(
+    beamline: OpticalStack | Iterable[tuple[str, float]],
+    lambda_micron: float,
+) -> tuple[float, float]:
+    if not isinstance(beamline, OpticalStack):
+        beamline = OpticalStack(beamline)
+    _, gdd, tod = beamline.dispersion(lambda_micron)
+    return float(gdd), float(tod)
+
+
+def _score(
+    gdd: NDArray[np.float64],
+    tod: NDArray[np.float64],
+    pulse_width_fs: float,
+) -> NDArray[np.float64]:
+    """Squared spectral phase at the half width of the transform limited pulse."""
+    d_omega = 2 * np.log(2) / pulse_width_fs
+    return (gdd * d_omega**2 / 2) ** 2 + (tod * d_omega**3 / 6) ** 2
+
+
+def _best(
+    names: tuple[str, ...],
+    grids: tuple[NDArray[np.float64], ...],
+    dispersion: NDArray[np.float64],
+    beamline: tuple[float, float],
+    pulse_width_fs: float,
+) -> CompressorDesign:
+    residual_gdd = dispersion[0] + beamline[0]
+    residual_tod = dispersion[1] + beamline[1]
+    score = _score(residual_gdd, residual_tod, pulse_width_fs)
+    index = np.unravel_index(np.nanargmin(score), score.shape)
+    return CompressorDesign(
+        parameters={
+            name: float(np.broadcast_to(grid, score.shape)[index])
+            for name, grid in zip(names, grids, strict=True)
+        },
+        gdd=float(dispersion[0][index]),
+        tod=float(dispersion[1][index]),
+        residual_gdd=float(residual_gdd[index]),
+        residual_tod=float(residual_tod[index]),
+        score=score,
+    )
+
+
+def optimize_prism_pair(  # noqa: PLR0913
+    material: str,
+    lambda_micron: float,
+    beamline: OpticalStack | Iterable[tuple[str, float]],
+    separations_mm: ArrayLike,
+    insertions_mm: ArrayLike,
+    pulse_width_fs: float = 30.0,
+    *,
+    double_pass: bool = True,
+) -> CompressorDesign:
+    """Find the prism pair geometry cancelling the dispersion of the beamline.
+
+    All the combinations of the separations and the insertions are evaluated, and
+    the one minimizing the residual spectral phase (GDD and TOD weighted at the
+    half width of the spectrum of pulse_width_fs) is returned.
+
+    Parameters
+    ----------
+    material: str
+        Prism material
+    lambda_micron: float
+        Center wavelength in micron
+    beamline: OpticalStack | Iterable[tuple[str, float]]
+        The optics to be compensated, (material, thickness_mm)
+    separations_mm: ArrayLike
+        Candidates of the apex-to-apex separation (mm)
+    insertions_mm: ArrayLike
+        Candidates of the glass path per pass (mm)
+    pulse_width_fs: float
+        Transform limited pulse width (FWHM) for the weight of TOD.
+    double_pass: bool
+        If True, the compressor is passed twice.
+
+    Returns
+    -------
+    CompressorDesign
+        The best geometry.  score has the shape (n_separations, n_insertions).
+
+    """
+    separation = np.asarray(separations_mm, dtype=np.float64)[:, np.newaxis]
+    insertion = np.asarray(insertions_mm, dtype=np.float64)[np.newaxis, :]
+    dispersion = prism_pair_dispersion(
+        material,
+        lambda_micron,
+        separation,
+        insertion,
+        double_pass=double_pass,
+    )
+    return _best(
+        ("separation_mm", "insertion_mm"),
+        (separation, insertion),
+        dispersion,
+        _beamline_dispersion(beamline, lambda_micron),
+        pulse_width_fs,
+    )
+
+
+def optimize_grating_pair(  # noqa: PLR0913
+    lambda_micron: float,
+    beamline: OpticalStack | Iterable[tuple[str, float]],
+    separations_mm: ArrayLike,
+    incidences_deg: ArrayLike,
+    grooves_per_mm: ArrayLike,
+    pulse_width_fs: float = 30.0,
+    *,
+    double_pass: bool = True,
+) -> CompressorDesign:
+    """Find the grating pair geometry cancelling the dispersion of the beamline.
+
+    Parameters
+    ----------
+    lambda_micron: float
+        Center wavelength in micron
+    beamline: OpticalStack | Iterable[tuple[str, float]]
+        The optics to be compensated, (material, thickness_mm)
+    separations_mm: ArrayLike
+        Candidates of the perpendicular separation (mm)
+    incidences_deg: ArrayLike
+        Candidates of the incidence angle (degree)
+    grooves_per_mm: ArrayLike
+        Candidates of the groove density (lines/mm)
+    pulse_width_fs: float
+        Transform limited pulse width (FWHM) for the weight of TOD.
+    double_pass: bool
+        If True, the compressor is passed twice.
+
+    Returns
+    -------
+    CompressorDesign
+        The best geometry.  score has the shape (n_separations, n_incidences,
+        n_grooves).
+
+    """
+    separation = np.asarray(separations_mm, dtype=np.float64)[:, None, None]
+    incidence = np.asarray(incidences_deg, dtype=np.float64)[None, :, None]
+    grooves = np.asarray(grooves_per_mm, dtype=np.float64)[None, None, :]
+    dispersion = grating_pair_dispersion(
+        lambda_micron,
+        separation,
+        incidence,
+        grooves,
+        double_pass=double_pass,
+    )
+    return _best(
+        ("separation_mm", "incidence_deg", "grooves_per_mm"),
+        (separation, incidence, grooves),
+        dispersion,
+        _beamline_dispersion(beamline, lambda_micron),
+        pulse_width_fs,
+    )
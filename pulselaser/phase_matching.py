@@ -0,0 +1,321 @@
+r"""Phase matching of the three wave mixing (SHG, SFG, DFG) in uniaxial crystals.
+
+The three waves are labelled s, i and p (:math:`1/\lambda_p = 1/\lambda_s +
+1/\lambda_i`), and the phase mismatch is
+
+:math:`\Delta k = 2\pi\left(\frac{n_p}{\lambda_p} - \frac{n_s}{\lambda_s}
+- \frac{n_i}{\lambda_i}\right)`.
+
+* SHG: :math:`\lambda_s = \lambda_i = \lambda_1`, p is the second harmonic.
+* SFG: :math:`\lambda_s = \lambda_1`, :math:`\lambda_i = \lambda_2`, p is the sum
+  frequency.
+* DFG: :math:`\lambda_p = \lambda_1` (pump), :math:`\lambda_s = \lambda_2`, i is the
+  difference frequency.
+
+The crystal is given by the name registered in
+``pulselaser.sellmeier.SELLMEIER_REGISTRY`` as "<crystal>_o" and "<crystal>_e",
+and the ordinary and the extraordinary indices of all the waves are evaluated in
+one :func:`pulselaser.sellmeier.sellmeier_dispersion` call for the whole
+wavelength grid.
+
+The acceptance bandwidths are FWHM of :math:`\mathrm{sinc}^2(\Delta k L / 2)`,
+in the first order of :math:`\Delta k`.
+
+Example
+-------
+>>> pm = phase_matching("beta_bbo", np.linspace(0.7, 1.0, 31), length_mm=0.5)
+>>> pm.theta_deg, pm.spectral_acceptance_nm
+
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Literal
+
+import numpy as np
+
+from .sellmeier import sellmeier_dispersion
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from numpy.typing import ArrayLike, NDArray
+
+Process = Literal["SHG", "SFG", "DFG"]
+
+# sinc^2(x) = 1/2 at x = 1.39156, thus FWHM of Delta k L = 4 x 1.39156
+SINC2_FWHM = 5.56626
+
+# Polarizations of (s, i, p) for the negative (n_e < n_o) and the positive crystals
+POLARIZATIONS: dict[str, tuple[str, str]] = {
+    "I": ("ooe", "eeo"),
+    "II": ("eoe", "oeo"),
+}
+
+# Thermo-optic coefficients dn/dT (1/K).  Registered as the Sellmeier materials.
+THERMO_OPTIC: dict[str, float] = {
+    "beta_bbo_o": -16.6e-6,
+    "beta_bbo_e": -9.3e-6,
+}
+
+# Perturbation of (nu_s, nu_i, nu_p) by the frequency of the first input
+_FREQUENCY_SHIFT: dict[str, tuple[float, float, float]] = {
+    "SHG": (1.0, 1.0, 2.0),
+    "SFG": (1.0, 0.0, 1.0),
+    "DFG": (0.0, 1.0, 1.0),
+}
+_SIGN = np.array([-1.0, -1.0, 1.0])
+
+
+@dataclass(frozen=True)
+class PhaseMatching:
+    """Phase matching condition and the acceptance bandwidths (FWHM).
+
+    Attributes
+    ----------
+    theta_deg: NDArray[np.float64]
+        Phase matching angle from the optic axis (degree).  NaN if not
+        phase-matchable.
+    output_micron: NDArray[np.float64]
+        Wavelength of the generated wave.
+    angular_acceptance_mrad: NDArray[np.float64]
+        Angular acceptance (internal angle, mrad).
+    spectral_acceptance_nm: NDArray[np.float64]
+        Spectral acceptance in the wavelength of the first input (nm).  The
+        second input is fixed for SFG and DFG.
+    temperature_acceptance_k: NDArray[np.float64]
+        Temperature acceptance (K).  NaN if the thermo-optic coefficients of the
+        crystal are not in ``THERMO_OPTIC``.
+
+    """
+
+    theta_deg: NDArray[np.float64]
+    output_micron: NDArray[np.float64]
+    angular_acceptance_mrad: NDArray[np.float64]
+    spectral_acceptance_nm: NDArray[np.float64]
+    temperature_acceptance_k: NDArray[np.float64]
+
+
+def three_wavelengths(
+    lambda1_micron: ArrayLike,
+    lambda2_micron: ArrayLike | None = None,
+    process: Process = "SHG",
+) -> NDArray[np.float64]:
+    """Return the wavelengths of (s, i, p).
+
+    Parameters
+    ----------
+    lambda1_micron: ArrayLike
+        First input (the fundamental for SHG, the pump for DFG)
+    lambda2_micron: ArrayLike | None
+        Second input (the signal for DFG).  Not used for SHG.
+    process: Process
+        "SHG", "SFG" or "DFG"
+
+    Returns
+    -------
+    NDArray[np.float64]
+        The shape is (3, \\*broadcast shape of the inputs).
+
+    """
+    lambda1 = np.asarray(lambda1_micron, dtype=np.float64)
+    if process == "SHG":
+        return np.stack([lambda1, lambda1, lambda1 / 2])
+    if lambda2_micron is None:
+        msg = f"{process} requires the second wavelength."
+        raise ValueError(msg)
+    lambda1, lambda2 = np.broadcast_arrays(
+        lambda1,
+        np.asarray(lambda2_micron, dtype=np.float64),
+    )
+    if process == "SFG":
+        return np.stack([lambda1, lambda2, 1 / (1 / lambda1 + 1 / lambda2)])
+    if process == "DFG":
+        if np.any(lambda1 >= lambda2):
+            msg = "The pump (lambda1) should be shorter than the signal (lambda2)."
+            raise ValueError(msg)
+        return np.stack([lambda2, 1 / (1 / lambda1 - 1 / lambda2), lambda1])
+    msg = f"Unknown process: {process}"
+    raise ValueError(msg)
+
+
+def _angle_index(
+    theta: NDArray[np.float64],
+    n_o: NDArray[np.float64],
+    n_e: NDArray[np.float64],
+    extraordinary: NDArray[np.bool_],
+) -> NDArray[np.float64]:
+    r""":math:`n(\theta)` with :math:`1/n^2 = \cos^2\theta/n_o^2 + \sin^2\theta/n_e^2`."""
+    n_theta = (np.cos(theta) ** 2 / n_o**2 + np.sin(theta) ** 2 / n_e**2) ** (-0.5)
+    return np.where(extraordinary, n_theta, n_o)
+
+
+def _angle_index_derivative(
+    theta: NDArray[np.float64],
+    n_o: NDArray[np.float64],
+    n_e: NDArray[np.float64],
+    d_o: NDArray[np.float64],
+    d_e: NDArray[np.float64],
+    extraordinary: NDArray[np.bool_],
+) -> NDArray[np.float64]:
+    """Derivative of n(theta) by a variable, from those of n_o (d_o) and n_e (d_e)."""
+    n_theta = _angle_index(theta, n_o, n_e, extraordinary)
+    d_theta = n_theta**3 * (
+        np.cos(theta) ** 2 * d_o / n_o**3 + np.sin(theta) ** 2 * d_e / n_e**3
+    )
+    return np.where(extraordinary, d_theta, d_o)
+
+
+def phase_matching(  # noqa: PLR0913
+    crystal: str,
+    lambda1_micron: ArrayLike,
+    lambda2_micron: ArrayLike | None = None,
+    process: Process = "SHG",
+    pm_type: str = "I",
+    length_mm: float = 1.0,
+) -> PhaseMatching:
+    """Return the phase matching angle and the acceptance bandwidths.
+
+    Parameters
+    ----------
+    crystal: str
+        Crystal name, e.g. "beta_bbo" ("beta_bbo_o" and "beta_bbo_e" are used).
+    lambda1_micron: ArrayLike
+        First input (the fundamental for SHG, the pump for DFG)
+    lambda2_micron: ArrayLike | None
+        Second input (the signal for DFG).  Not used for SHG.
+    process: Process
+        "SHG", "SFG" or "DFG"
+    pm_type: str
+        "I" or "II", or the polarizations of (s, i, p) such as "ooe".  For type
+        II, the wave s has the different polarization from i.  The polarizations
+        of type I and II are chosen by the sign of the birefringence at p.
+    length_mm: float
+        Crystal length (mm) for the acceptance bandwidths.
+
+    Returns
+    -------
+    PhaseMatching
+        The arrays have the broadcast shape of the inputs.
+
+    """
+    lam = three_wavelengths(lambda1_micron, lambda2_micron, process)
+    (n_o, n_e), (dn_o, dn_e) = sellmeier_dispersion(
+        [f"{crystal}_o", f"{crystal}_e"],
+        lam,
+        max_derivative=1,
+    )
+    extraordinary = _extraordinary(pm_type, n_o[2] > n_e[2])
+    sign = _SIGN.reshape((3,) + (1,) * (lam.ndim - 1))
+
+    def mismatch(theta: NDArray[np.float64]) -> NDArray[np.float64]:
+        n = _angle_index(theta, n_o, n_e, extraordinary)
+        return 2 * np.pi * np.sum(sign * n / lam, axis=0)
+
+    theta = _bisection(mismatch, lam.shape[1:])
+    length_micron = length_mm * 1e3
+
+    # angle
+    n_theta = _angle_index(theta, n_o, n_e, extraordinary)
+    dn_dtheta = np.where(
+        extraordinary,
+        -(n_theta**3) / 2 * np.sin(2 * theta) * (1 / n_e**2 - 1 / n_o**2),
+        0.0,
+    )
+    dk_dtheta = 2 * np.pi * np.sum(sign * dn_dtheta / lam, axis=0)
+
+    # wavelength: dk/dnu = 2 pi n_g, with n_g = n - lambda dn/dlambda
+    group_index = n_theta - lam * _angle_index_derivative(
+        theta,
+        n_o,
+        n_e,
+        dn_o,
+        dn_e,
+        extraordinary,
+    )
+    shift = np.reshape(_FREQUENCY_SHIFT[process], sign.shape)
+    dk_dnu = 2 * np.pi * np.sum(sign * shift * group_index, axis=0)
+
+    # temperature
+    try:
+        dn_dt = _angle_index_derivative(
+            theta,
+            n_o,
+            n_e,
+            np.full_like(n_o, THERMO_OPTIC[f"{crystal}_o"]),
+            np.full_like(n_e, THERMO_OPTIC[f"{crystal}_e"]),
+            extraordinary,
+        )
+        dk_dt = 2 * np.pi * np.sum(sign * dn_dt / lam, axis=0)
+    except KeyError:
+        dk_dt = np.zeros_like(theta)
+
+    with np.errstate(divide="ignore"):
+        acceptance = SINC2_FWHM / length_micron / np.abs(
+            np.stack([dk_dtheta, dk_dnu, dk_dt]),
+        )
+    lambda1 = lam[2] if process == "DFG" else lam[0]
+    output = lam[1] if process == "DFG" else lam[2]
+    return PhaseMatching(
+        theta_deg=np.rad2deg(theta),
+        output_micron=output,
+        angular_acceptance_mrad=acceptance[0] * 1e3,
+        spectral_acceptance_nm=acceptance[1] * lambda1**2 * 1e3,
+        temperature_acceptance_k=np.where(dk_dt == 0, np.nan, acceptance[2]),
+    )
+
+
+def phase_matching_angle_deg(
+    crystal: str,
+    lambda1_micron: ArrayLike,
+    lambda2_micron: ArrayLike | None = None,
+    process: Process = "SHG",
+    pm_type: str = "I",
+) -> NDArray[np.float64]:
+    """Return the phase matching angle (degree), see :func:`phase_matching`."""
+    return phase_matching(
+        crystal,
+        lambda1_micron,
+        lambda2_micron,
+        process,
+        pm_type,
+    ).theta_deg
+
+
+def _extraordinary(
+    pm_type: str,
+    negative: NDArray[np.bool_],
+) -> NDArray[np.bool_]:
+    """Return whether each of (s, i, p) is the extraordinary wave."""
+    if pm_type in POLARIZATIONS:
+        for_negative, for_positive = (
+            np.array([c == "e" for c in pol]) for pol in POLARIZATIONS[pm_type]
+        )
+        expand = (slice(None),) + (np.newaxis,) * negative.ndim
+        return np.where(negative, for_negative[expand], for_positive[expand])
+    if len(pm_type) != 3 or set(pm_type) - {"o", "e"}:  # noqa: PLR2004
+        msg = f"pm_type should be 'I', 'II' or the polarizations like 'ooe': {pm_type}"
+        raise ValueError(msg)
+    extraordinary = np.array([c == "e" for c in pm_type])
+    return extraordinary.reshape((3,) + (1,) * negative.ndim) & np.ones_like(negative)
+
+
+def _bisection(
+    mismatch: Callable[[NDArray[np.float64]], NDArray[np.float64]],
+    shape: tuple[int, ...],
+    n_iteration: int = 60,
+) -> NDArray[np.float64]:
+    """Solve mismatch(theta) = 0 in [0, pi/2] elementwise, NaN if no sign change."""
+    low = np.zeros(shape)
+    high = np.full(shape, np.pi / 2)
+    f_low = mismatch(low)
+    valid = np.sign(f_low) != np.sign(mismatch(high))
+    for _ in range(n_iteration):
+        middle = (low + high) / 2
+        f_middle = mismatch(middle)
+        same = np.sign(f_middle) == np.sign(f_low)
+        low = np.where(same, middle, low)
+        f_low = np.where(same, f_middle, f_low)
+        high = np.where(same, high, middle)
+    return np.where(valid, (low + high) / 2, np.nan)
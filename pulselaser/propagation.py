@@ -0,0 +1,254 @@
+r"""Linear propagation of the pulse through the dispersive media in the spectral domain.
+
+The complex envelope :math:`A(t)` on the uniform time grid is Fourier transformed,
+multiplied by :math:`\exp[-i\phi(\omega)]` with the full Sellmeier phase
+:math:`\phi(\omega) = n(\omega)\omega L / c`, and transformed back.  The constant
+and the group delay at the center wavelength are removed from :math:`\phi`, so
+the output pulse stays at the center of the time window.
+
+Many materials, thicknesses and stacks are propagated by one batched FFT along the
+last axis.
+
+Example
+-------
+>>> t = np.linspace(-2000, 2000, 8192)
+>>> field = np.sqrt(gaussian_pulse(t, fwhm=30))
+>>> intensity, width = propagate_pulse(field, t, 0.8, "fused_silica",
+...                                    thickness_mm=np.arange(0, 21, 5))
+
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .sellmeier import sellmeier_dispersion
+from .stack import LIGHT_SPEED_MICRON_FS, OpticalStack
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from numpy.typing import ArrayLike, NDArray
+
+
+def angular_frequency(
+    t_fs: NDArray[np.float64],
+    center_wavelength_micron: float,
+) -> NDArray[np.float64]:
+    """Return the angular frequency (rad/fs) of the FFT bins of the time grid.
+
+    Parameters
+    ----------
+    t_fs: NDArray[np.float64]
+        Uniform time grid (fs)
+    center_wavelength_micron: float
+        Center (carrier) wavelength in micron
+
+    Returns
+    -------
+    NDArray[np.float64]
+        :math:`\\omega_0 + \\Omega` in the order of ``np.fft.fftfreq``
+
+    """
+    omega0 = 2 * np.pi * LIGHT_SPEED_MICRON_FS / center_wavelength_micron
+    return omega0 + 2 * np.pi * np.fft.fftfreq(len(t_fs), d=t_fs[1] - t_fs[0])
+
+
+def _phase_per_mm(
+    names: list[str],
+    omega: NDArray[np.float64],
+    center_wavelength_micron: float,
+) -> NDArray[np.float64]:
+    """Return the spectral phase of 1 mm of each material with shape (n_mat, n_omega).
+
+    The frequencies where the Sellmeier equation is not valid (non-positive
+    frequency, or imaginary index) get zero phase.
+    """
+    omega0 = 2 * np.pi * LIGHT_SPEED_MICRON_FS / center_wavelength_micron
+    n0, dn0 = sellmeier_dispersion(names, center_wavelength_micron, max_derivative=1)
+    # group delay per µm (fs/µm)
+    group_delay = (n0 - center_wavelength_micron * dn0) / LIGHT_SPEED_MICRON_FS
+    with np.errstate(divide="ignore", invalid="ignore"):
+        wavelength = 2 * np.pi * LIGHT_SPEED_MICRON_FS / omega
+        (n,) = sellmeier_dispersion(names, wavelength, max_derivative=0)
+        phase = (n * omega - (n0 * omega0)[:, np.newaxis]) / LIGHT_SPEED_MICRON_FS
+        phase -= group_delay[:, np.newaxis] * (omega - omega0)
+    phase = np.where((omega > 0)[np.newaxis] & np.isfinite(phase), phase, 0.0)
+    return phase * 1e3
+
+
+def material_phase(
+    materials: str | Sequence[str],
+    thickness_mm: ArrayLike,
+    omega: NDArray[np.float64],
+    center_wavelength_micron: float,
+) -> NDArray[np.float64]:
+    """Return the spectral phase of the materials for all thicknesses.
+
+    Parameters
+    ----------
+    materials: str | Sequence[str]
+        Registered material name(s)
+    thickness_mm: ArrayLike
+        Thickness(es) in mm
+    omega: NDArray[np.float64]
+        Angular frequency (rad/fs), see :func:`angular_frequency`
+    center_wavelength_micron: float
+        Center wavelength in micron
+
+    Returns
+    -------
+    NDArray[np.float64]
+        The shape is (n_materials, \\*thickness_mm.shape, n_omega).  If materials
+        is str, the material axis is dropped.
+
+    """
+    names = [materials] if isinstance(materials, str) else list(materials)
+    thickness = np.asarray(thickness_mm, dtype=np.float64)
+    per_mm = _phase_per_mm(names, omega, center_wavelength_micron)
+    per_mm = per_mm.reshape((len(names),) + (1,) * thickness.ndim + (-1,))
+    phase = per_mm * thickness[..., np.newaxis]
+    return phase[0] if isinstance(materials, str) else phase
+
+
+def stack_phase(
+    stacks: OpticalStack | Sequence[OpticalStack],
+    omega: NDArray[np.float64],
+    center_wavelength_micron: float,
+) -> NDArray[np.float64]:
+    """Return the spectral phase of the optical stacks.
+
+    Parameters
+    ----------
+    stacks: OpticalStack | Sequence[OpticalStack]
+        Beamline(s)
+    omega: NDArray[np.float64]
+        Angular frequency (rad/fs), see :func:`angular_frequency`
+    center_wavelength_micron: float
+        Center wavelength in micron
+
+    Returns
+    -------
+    NDArray[np.float64]
+        The shape is (n_stacks, n_omega).  If a single stack is given, the stack
+        axis is dropped.
+
+    """
+    stack_list = [stacks] if isinstance(stacks, OpticalStack) else list(stacks)
+    thickness = [stack.thickness_by_material() for stack in stack_list]
+    names = sorted({name for t in thickness for name in t})
+    length_mm = np.array([[t.get(name, 0.0) for name in names] for t in thickness])
+    if not names:
+        phase = np.zeros((len(stack_list), len(omega)))
+    else:
+        phase = length_mm @ _phase_per_mm(names, omega, center_wavelength_micron)
+    return phase[0] if isinstance(stacks, OpticalStack) else phase
+
+
+def propagate(
+    field: ArrayLike,
+    phase: NDArray[np.float64],
+) -> NDArray[np.complex128]:
+    """Apply the spectral phase to the complex envelope.
+
+    Parameters
+    ----------
+    field: ArrayLike
+        Complex envelope on the time grid (the last axis).  For the real pulse
+        shape such as :func:`pulselaser.gaussian_pulse` or
+        :func:`pulselaser.sech2`, use the square root of the intensity.
+    phase: NDArray[np.float64]
+        Spectral phase in FFT order (the last axis).  The leading axes are
+        broadcast with those of field.
+
+    Returns
+    -------
+    NDArray[np.complex128]
+        Complex envelope after the propagation
+
+    """
+    spectrum = np.fft.fft(np.asarray(field, dtype=np.complex128), axis=-1)
+    return np.fft.ifft(spectrum * np.exp(-1j * phase), axis=-1)
+
+
+def fwhm(t: NDArray[np.float64], intensity: NDArray[np.float64]) -> NDArray[np.float64]:
+    """Return FWHM of the single peaked profiles along the last axis.
+
+    The half maximum is found from the outermost samples above it, and linearly
+    interpolated.
+
+    Parameters
+    ----------
+    t: NDArray[np.float64]
+        Uniform grid
+    intensity: NDArray[np.float64]
+        Profiles (the last axis corresponds to t)
+
+    Returns
+    -------
+    NDArray[np.float64]
+        FWHM with the shape of the leading axes of intensity
+
+    """
+    y = np.asarray(intensity, dtype=np.float64)
+    half = y.max(axis=-1, keepdims=True) / 2
+    above = y >= half
+    n = y.shape[-1]
+    first = np.argmax(above, axis=-1)[..., np.newaxis]
+    last = (n - 1 - np.argmax(above[..., ::-1], axis=-1))[..., np.newaxis]
+    before = np.clip(first - 1, 0, n - 1)
+    after = np.clip(last + 1, 0, n - 1)
+    dt = t[1] - t[0]
+
+    def _crossing(inside: NDArray[np.int_], outside: NDArray[np.int_]) -> NDArray:
+        y_in = np.take_along_axis(y, inside, axis=-1)
+        y_out = np.take_along_axis(y, outside, axis=-1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fraction = np.where(y_in > y_out, (y_in - half) / (y_in - y_out), 0.0)
+        return t[inside] + np.sign(outside - inside) * fraction * dt
+
+    return (_crossing(last, after) - _crossing(first, before))[..., 0]
+
+
+def propagate_pulse(
+    field: ArrayLike,
+    t_fs: NDArray[np.float64],
+    center_wavelength_micron: float,
+    medium: str | Sequence[str] | OpticalStack | Sequence[OpticalStack],
+    thickness_mm: ArrayLike = 1.0,
+) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """Return the temporal intensity and FWHM after the propagation.
+
+    Parameters
+    ----------
+    field: ArrayLike
+        Complex envelope on t_fs (the last axis)
+    t_fs: NDArray[np.float64]
+        Uniform time grid (fs)
+    center_wavelength_micron: float
+        Center wavelength in micron
+    medium: str | Sequence[str] | OpticalStack | Sequence[OpticalStack]
+        Material name(s) or beamline(s).  An empty sequence means no dispersion.
+    thickness_mm: ArrayLike
+        Thickness(es) in mm for the materials.  Ignored for the stacks.
+
+    Returns
+    -------
+    tuple[NDArray[np.float64], NDArray[np.float64]]
+        Intensity :math:`|A(t)|^2`, with the leading axes of the phase (see
+        :func:`material_phase` and :func:`stack_phase`), and its FWHM (fs)
+
+    """
+    omega = angular_frequency(t_fs, center_wavelength_micron)
+    if not isinstance(medium, str | OpticalStack) and len(medium) == 0:
+        medium = OpticalStack()  # no dispersion
+    if isinstance(medium, OpticalStack) or (
+        not isinstance(medium, str) and isinstance(medium[0], OpticalStack)
+    ):
+        phase = stack_phase(medium, omega, center_wavelength_micron)
+    else:
+        phase = material_phase(medium, thickness_mm, omega, center_wavelength_micron)
+    intensity = np.abs(propagate(field, phase)) ** 2
+    return intensity, fwhm(t_fs, intensity)
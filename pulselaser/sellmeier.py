@@ -2,11 +2,18 @@
 
 from __future__ import annotations
 
-from typing import Literal
+from math import comb
+from typing import TYPE_CHECKING, Literal
 
 import numpy as np
 
-DERIVATIVE_ORDER = Literal[0, 1, 2]
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from numpy.typing import ArrayLike, NDArray
+
+DERIVATIVE_ORDER = Literal[0, 1, 2, 3, 4]
+MAX_DERIVATIVE_ORDER = 4
 
 
 def three_term_sellmier(
@@ -72,24 +79,15 @@ def first_derivative_three_term_sellmier(
         Calculated refractive index
 
     """
-    b1, b2, b3 = coeff_b
-    c1, c2, c3 = coeff_c
-    return (
-        lambda_micron
-        * (
-            (b1 * (-2 * c1**2 + lambda_micron)) / (c1**2 - lambda_micron) ** 2
-            + (b2 * (-2 * c2**2 + lambda_micron)) / (c2**2 - lambda_micron) ** 2
-            + (b3 * (-2 * c3**2 + lambda_micron)) / (c3**2 - lambda_micron) ** 2
-        )
-    ) / (
-        2.0
-        * np.sqrt(
-            1
-            + (b1 * lambda_micron**2) / (-(c1**2) + lambda_micron)
-            + (b2 * lambda_micron**2) / (-(c2**2) + lambda_micron)
-            + (b3 * lambda_micron**2) / (-(c3**2) + lambda_micron),
-        )
-    )
+    lam = np.asarray(lambda_micron, dtype=np.float64)
+    return _sellmeier_derivatives(
+        lam,
+        1.0,
+        _terms(coeff_b, lam),
+        _terms(coeff_c, lam) ** 2,
+        0.0,
+        max_derivative=1,
+    )[1]
 
 
 def second_derivative_three_term_sellmier(
@@ -114,39 +112,15 @@ def second_derivative_three_term_sellmier(
         Calculated refractive index
 
     """
-    b1, b2, b3 = coeff_b
-    c1, c2, c3 = coeff_c
-    return (
-        -4
-        * lambda_micron**2
-        * (
-            (b1 * c1) / (c1 - lambda_micron**2) ** 2
-            + (b2 * c2) / (c2 - lambda_micron**2) ** 2
-            + (b3 * c3) / (c3 - lambda_micron**2) ** 2
-        )
-        ** 2
-        + 2
-        * (
-            1
-            + (b1 * lambda_micron**2) / (-c1 + lambda_micron**2)
-            + (b2 * lambda_micron**2) / (-c2 + lambda_micron**2)
-            + (b3 * lambda_micron**2) / (-c3 + lambda_micron**2)
-        )
-        * (
-            (-2 * b1 * c1 * (c1 + 3 * lambda_micron**2)) / (c1 - lambda_micron**2) ** 3
-            - (2 * b2 * c2 * (c2 + 3 * lambda_micron**2)) / (c2 - lambda_micron**2) ** 3
-            - (2 * b3 * c3 * (c3 + 3 * lambda_micron**2)) / (c3 - lambda_micron**2) ** 3
-        )
-    ) / (
-        4.0
-        * (
-            1
-            + (b1 * lambda_micron**2) / (-c1 + lambda_micron**2)
-            + (b2 * lambda_micron**2) / (-c2 + lambda_micron**2)
-            + (b3 * lambda_micron**2) / (-c3 + lambda_micron**2)
-        )
-        ** 1.5
-    )
+    lam = np.asarray(lambda_micron, dtype=np.float64)
+    return _sellmeier_derivatives(
+        lam,
+        1.0,
+        _terms(coeff_b, lam),
+        _terms(coeff_c, lam) ** 2,
+        0.0,
+        max_derivative=2,
+    )[2]
 
 
 def two_term_serllmier(
@@ -259,16 +233,7 @@ def bk7(lambda_micron: float, *, derivative: DERIVATIVE_ORDER = 0) -> float:
     c = (np.sqrt(0.00600069867), np.sqrt(0.0200179144), np.sqrt(103.560653))
     if derivative == 0:
         return three_term_sellmier(lambda_micron, b, c)
-    if derivative == 1:
-        return first_derivative_three_term_sellmier(lambda_micron, b, c)
-    if derivative == 2:
-        return second_derivative_three_term_sellmier(
-            lambda_micron,
-            b,
-            c,
-        )
-    msg = "Derivative order should be 0, 1, or 2"
-    raise RuntimeError(msg)
+    return _registered_derivative("bk7", lambda_micron, derivative)
 
 
 def fused_silica(lambda_micron: float, *, derivative: DERIVATIVE_ORDER = 0) -> float:
@@ -288,16 +253,7 @@ def fused_silica(lambda_micron: float, *, derivative: DERIVATIVE_ORDER = 0) -> f
     c = (0.06840432, 0.11624142, 9.8961612)
     if derivative == 0:
         return three_term_sellmier(lambda_micron, b, c)
-    if derivative == 1:
-        return first_derivative_three_term_sellmier(lambda_micron, b, c)
-    if derivative == 2:
-        return second_derivative_three_term_sellmier(
-            lambda_micron,
-            b,
-            c,
-        )
-    msg = "Derivative order should be 0, 1, or 2"
-    raise RuntimeError(msg)
+    return _registered_derivative("fused_silica", lambda_micron, derivative)
 
 
 def caf2(lambda_micron: float, *, derivative: DERIVATIVE_ORDER = 0) -> float:
@@ -316,16 +272,7 @@ def caf2(lambda_micron: float, *, derivative: DERIVATIVE_ORDER = 0) -> float:
         return np.sqrt(
             three_term_sellmier(lambda_micron, b, c) ** 2 + 0.33973,
         )
-    if derivative == 1:
-        return first_derivative_three_term_sellmier(lambda_micron, b, c)
-    if derivative == 2:
-        return second_derivative_three_term_sellmier(
-            lambda_micron,
-            b,
-            c,
-        )
-    msg = "Derivative order should be 0, 1, or 2"
-    raise RuntimeError(msg)
+    return _registered_derivative("caf2", lambda_micron, derivative)
 
 
 def sf10(lambda_micron: float, *, derivative: DERIVATIVE_ORDER = 0) -> float:
@@ -344,29 +291,22 @@ def sf10(lambda_micron: float, *, derivative: DERIVATIVE_ORDER = 0) -> float:
     c = (np.sqrt(0.0122241457), np.sqrt(0.0595736775), np.sqrt(147.468793))
     if derivative == 0:
         return three_term_sellmier(lambda_micron, b, c)
-    if derivative == 1:
-        return first_derivative_three_term_sellmier(lambda_micron, b, c)
-    if derivative == 2:
-        return second_derivative_three_term_sellmier(
-            lambda_micron,
-            b,
-            c,
-        )
-    msg = "Derivative order should be 0, 1, or 2"
-    raise RuntimeError(msg)
+    return _registered_derivative("sf10", lambda_micron, derivative)
 
 
-def air(lambda_micron: float, *, second_derivative: bool = False) -> float:
+def air(lambda_micron: float, *, derivative: DERIVATIVE_ORDER = 0) -> float:
     r"""Dispersion of air.
 
-    https://refractiveindelambda_micron.info/?shelf=other&book=air&page=Ciddor
+    https://refractiveindex.info/?shelf=other&book=air&page=Ciddor
+
+    :math:`n - 1 = \frac{B_1}{C_1 - \lambda^{-2}} + \frac{B_2}{C_2 - \lambda^{-2}}`
 
     Parameters
     ----------
     lambda_micron: float
         wavelength (:math:`\lambda`) in micron (:math:`\mu m`) unit.
-    second_derivative: bool
-        if True return :math:`\frac{d^2n}{d\lambda^2}`
+    derivative: int
+        Derivative order
 
     Returns
     -------
@@ -376,15 +316,11 @@ def air(lambda_micron: float, *, second_derivative: bool = False) -> float:
     """
     b1 = 0.05792105
     c1 = 238.0185
-    b1 = 0.00167917
+    b2 = 0.00167917
     c2 = 57.362
-    if second_derivative:
-        return (2 * b1 * (1 + 3 * c1 * lambda_micron**2)) / (
-            -1 + c1 * lambda_micron**2
-        ) ** 3 + (2 * (b1 + 3 * b1 * c2 * lambda_micron**2)) / (
-            -1 + c2 * lambda_micron**2
-        ) ** 3
-    return 1 + b1 / (c1 - lambda_micron ** (-2)) + b1 / (c2 - lambda_micron ** (-2))
+    if derivative == 0:
+        return 1 + b1 / (c1 - lambda_micron ** (-2)) + b2 / (c2 - lambda_micron ** (-2))
+    return _registered_derivative("air", lambda_micron, derivative)
 
 
 def bbo_sellmeier(
@@ -404,10 +340,16 @@ def bbo_sellmeier_1st_derivative(
     c: float,
     d: float,
 ) -> float:
-    return -(
-        (d * lambda_micron)
-        / np.sqrt(a - d * lambda_micron**2 + b / (-c + lambda_micron**2))
-    )
+    lam = np.asarray(lambda_micron, dtype=np.float64)
+    coeff_a, coeff_b, coeff_c, coeff_d = _bbo_coefficients(a, b, c, d)
+    return _sellmeier_derivatives(
+        lam,
+        coeff_a,
+        _terms(coeff_b, lam),
+        _terms(coeff_c, lam),
+        coeff_d,
+        max_derivative=1,
+    )[1]
 
 
 def bbo_sellmeier_2nd_derivative(
@@ -417,9 +359,16 @@ def bbo_sellmeier_2nd_derivative(
     c: float,
     d: float,
 ) -> float:
-    return (d * (-a + b / (c - lambda_micron**2))) / (
-        a - d * lambda_micron**2 + b / (-c + lambda_micron**2)
-    ) ** (3 / 2)
+    lam = np.asarray(lambda_micron, dtype=np.float64)
+    coeff_a, coeff_b, coeff_c, coeff_d = _bbo_coefficients(a, b, c, d)
+    return _sellmeier_derivatives(
+        lam,
+        coeff_a,
+        _terms(coeff_b, lam),
+        _terms(coeff_c, lam),
+        coeff_d,
+        max_derivative=2,
+    )[2]
 
 
 def alpha_bbo(
@@ -449,42 +398,10 @@ def alpha_bbo(
             bbo_sellmeier(lambda_micron, 2.67579, 0.02099, 0.00470, 0.00528),
             bbo_sellmeier(lambda_micron, 2.31197, 0.01184, 0.016070, 0.00400),
         )
-    if derivative == 1:
-        return (
-            bbo_sellmeier_1st_derivative(
-                lambda_micron,
-                2.67579,
-                0.02099,
-                0.00470,
-                0.00528,
-            ),
-            bbo_sellmeier_1st_derivative(
-                lambda_micron,
-                2.31197,
-                0.01184,
-                0.016070,
-                0.00400,
-            ),
-        )
-    if derivative == 2:
-        return (
-            bbo_sellmeier_2nd_derivative(
-                lambda_micron,
-                2.67579,
-                0.02099,
-                0.00470,
-                0.00528,
-            ),
-            bbo_sellmeier_2nd_derivative(
-                lambda_micron,
-                2.31197,
-                0.01184,
-                0.016070,
-                0.00400,
-            ),
-        )
-    msg = "Derivative order should be 0, 1, or 2"
-    raise RuntimeError(msg)
+    return (
+        _registered_derivative("alpha_bbo_o", lambda_micron, derivative),
+        _registered_derivative("alpha_bbo_e", lambda_micron, derivative),
+    )
 
 
 def beta_bbo(
@@ -503,7 +420,7 @@ def beta_bbo(
     lambda_micron: float
         wavelength (:math:`\lambda`) in micron (:math:`\mu m`) unit.
     derivative: DERIVATIVE_ORDER
-        Order of derivative (0, 1, 2)
+        Order of derivative (0 - 4)
 
     Returns
     -------
@@ -516,45 +433,17 @@ def beta_bbo(
             bbo_sellmeier(lambda_micron, 2.7359, 0.01878, 0.01822, 0.01354),
             bbo_sellmeier(lambda_micron, 2.3753, 0.01224, 0.01667, 0.01516),
         )
-    if derivative == 1:
-        return (
-            bbo_sellmeier_1st_derivative(
-                lambda_micron,
-                2.7359,
-                0.01878,
-                0.01822,
-                0.01354,
-            ),
-            bbo_sellmeier_1st_derivative(
-                lambda_micron,
-                2.3753,
-                0.01224,
-                0.01667,
-                0.01516,
-            ),
-        )
-    if derivative == 2:
-        return (
-            bbo_sellmeier_2nd_derivative(
-                lambda_micron,
-                2.7359,
-                0.01878,
-                0.01822,
-                0.01354,
-            ),
-            bbo_sellmeier_2nd_derivative(
-                lambda_micron,
-                2.3753,
-                0.01224,
-                0.01667,
-                0.01516,
-            ),
-        )
-    msg = "Derivative order should be 0, 1, or 2"
-    raise RuntimeError(msg)
+    return (
+        _registered_derivative("beta_bbo_o", lambda_micron, derivative),
+        _registered_derivative("beta_bbo_e", lambda_micron, derivative),
+    )
 
 
-def quartz(lambda_micron: float) -> tuple[float, float]:
+def quartz(
+    lambda_micron: float,
+    *,
+    derivative: DERIVATIVE_ORDER = 0,
+) -> tuple[float, float]:
     r"""Dispersion of crystal quartz.
 
     Optics communications. 2011, vol. 284, issue 12, p. 2683-2686.
@@ -563,6 +452,8 @@ def quartz(lambda_micron: float) -> tuple[float, float]:
     ----------
     lambda_micron: float
         wavelength (:math:`\lambda`) in micron (:math:`\mu m`) unit.
+    derivative: DERIVATIVE_ORDER
+        Order of derivative (0 - 4)
 
     Returns
     -------
@@ -570,6 +461,11 @@ def quartz(lambda_micron: float) -> tuple[float, float]:
         :math:`n_o` and :math:`n_e`
 
     """
+    if derivative:
+        return (
+            _registered_derivative("quartz_o", lambda_micron, derivative),
+            _registered_derivative("quartz_e", lambda_micron, derivative),
+        )
     return (
         np.sqrt(
             1.28604141
@@ -584,7 +480,11 @@ def quartz(lambda_micron: float) -> tuple[float, float]:
     )
 
 
-def calcite(lambda_micron: float) -> tuple[float, float]:
+def calcite(
+    lambda_micron: float,
+    *,
+    derivative: DERIVATIVE_ORDER = 0,
+) -> tuple[float, float]:
     r"""Dispersion of calcite.  (:math:`\mathrm{CaCO}_3`).
 
     http://www.redoptronics.com/Calcite-crystal.html
@@ -595,6 +495,8 @@ def calcite(lambda_micron: float) -> tuple[float, float]:
     ----------
     lambda_micron: float
         wavelength (:math:`\lambda`) in micron (:math:`\mu m`) unit.
+    derivative: DERIVATIVE_ORDER
+        Order of derivative (0 - 4)
 
     Returns
     -------
@@ -602,6 +504,11 @@ def calcite(lambda_micron: float) -> tuple[float, float]:
         :math:`n_o` and :math:`n_e`
 
     """
+    if derivative:
+        return (
+            _registered_derivative("calcite_o", lambda_micron, derivative),
+            _registered_derivative("calcite_e", lambda_micron, derivative),
+        )
     return (
         np.sqrt(
             1.28604141
@@ -616,19 +523,30 @@ def calcite(lambda_micron: float) -> tuple[float, float]:
     )
 
 
-def mgf2(lambda_micron: float) -> tuple[float, float]:
+def mgf2(
+    lambda_micron: float,
+    *,
+    derivative: DERIVATIVE_ORDER = 0,
+) -> tuple[float, float]:
     r"""Dispersion of mgf2.
 
     Parameters
     ----------
     lambda_micron: float
         wavelength (:math:`\lambda`) in micron (:math:`\mu m`) unit.
+    derivative: DERIVATIVE_ORDER
+        Order of derivative (0 - 4)
 
     Returns
     -------
     tuple:
         :math:`n_o` and :math:`n_e`
     """
+    if derivative:
+        return (
+            _registered_derivative("mgf2_o", lambda_micron, derivative),
+            _registered_derivative("mgf2_e", lambda_micron, derivative),
+        )
     no = np.sqrt(
         1
         + 0.4876 * lambda_micron**2 / (lambda_micron**2 - 0.0434**2)
@@ -665,3 +583,265 @@ def phase_matching_angle_bbo(fundamental_micron: float) -> float:
         - (beta_bbo(fundamental_micron / 2)[0] ** (-2))
     )
     return np.rad2deg(np.arcsin(np.sqrt(sin2theta)))
+
+
+# ----------- Registry
+#
+# Coefficients of the generalized Sellmeier equation
+#
+#   n^2 = A + B_1 l^2 / (l^2 - C_1) + B_2 l^2 / (l^2 - C_2) + B_3 l^2 / (l^2 - C_3)
+#         - D l^2
+#
+# are stored as the row [A, B_1, B_2, B_3, C_1, C_2, C_3, D] (l in micron, C in
+# micron^2).  The BBO type equation n^2 = a + b / (l^2 - c) - d l^2 is rewritten by
+# b / (l^2 - c) = (b / c) l^2 / (l^2 - c) - b / c.
+# Birefringent materials are registered as "<name>_o" and "<name>_e".
+# The materials in LINEAR_SELLMEIER (e.g. air) use the same row for n - 1 instead
+# of n^2 - 1.
+
+N_SELLMEIER_TERMS = 3
+
+SELLMEIER_REGISTRY: dict[str, NDArray[np.float64]] = {}
+LINEAR_SELLMEIER: set[str] = set()
+
+
+def register_sellmeier(
+    name: str,
+    coeff_a: float,
+    coeff_b: tuple[float, ...],
+    coeff_c: tuple[float, ...],
+    coeff_d: float = 0.0,
+    *,
+    squared: bool = True,
+) -> None:
+    r"""Register the Sellmeier coefficients of the material.
+
+    :math:`n^2 = A + \sum_i \frac{B_i \lambda^2}{\lambda^2 - C_i} - D\lambda^2`
+
+    Parameters
+    ----------
+    name: str
+        Material name.  For the birefringent materials, use "<name>_o" and
+        "<name>_e".
+    coeff_a: float
+        Coefficient A
+    coeff_b: tuple[float, ...]
+        Coefficient B (up to three terms)
+    coeff_c: tuple[float, ...]
+        Coefficient C (:math:`\mu m^2`, up to three terms)
+    coeff_d: float
+        Coefficient D (:math:`\mu m^{-2}`)
+    squared: bool
+        If False, the right hand side gives :math:`n` instead of :math:`n^2`.
+
+    """
+    assert len(coeff_b) == len(coeff_c) <= N_SELLMEIER_TERMS
+    padding = (0.0,) * (N_SELLMEIER_TERMS - len(coeff_b))
+    SELLMEIER_REGISTRY[name] = np.array(
+        [coeff_a, *coeff_b, *padding, *coeff_c, *padding, coeff_d],
+        dtype=np.float64,
+    )
+    if squared:
+        LINEAR_SELLMEIER.discard(name)
+    else:
+        LINEAR_SELLMEIER.add(name)
+
+
+def _bbo_coefficients(
+    a: float,
+    b: float,
+    c: float,
+    d: float,
+) -> tuple[float, tuple[float], tuple[float], float]:
+    return a - b / c, (b / c,), (c,), d
+
+
+register_sellmeier(
+    "bk7",
+    1.0,
+    (1.03961212, 0.231792344, 1.01046945),
+    (0.00600069867, 0.0200179144, 103.560653),
+)
+register_sellmeier(
+    "fused_silica",
+    1.0,
+    (0.6961663, 0.4079426, 0.8974794),
+    (0.06840432**2, 0.11624142**2, 9.8961612**2),
+)
+register_sellmeier(
+    "caf2",
+    1.0 + 0.33973,
+    (0.69913, 0.11994, 4.35181),
+    (0.09374**2, 21.18**2, 38.46**2),
+)
+register_sellmeier(
+    "sf10",
+    1.0,
+    (1.6215390, 0.256287842, 1.64447552),
+    (0.0122241457, 0.0595736775, 147.468793),
+)
+register_sellmeier("alpha_bbo_o", *_bbo_coefficients(2.67579, 0.02099, 0.00470, 0.00528))
+register_sellmeier("alpha_bbo_e", *_bbo_coefficients(2.31197, 0.01184, 0.01607, 0.00400))
+register_sellmeier("beta_bbo_o", *_bbo_coefficients(2.7359, 0.01878, 0.01822, 0.01354))
+register_sellmeier("beta_bbo_e", *_bbo_coefficients(2.3753, 0.01224, 0.01667, 0.01516))
+register_sellmeier(
+    "quartz_o",
+    1.28604141,
+    (1.07044083, 1.10202242),
+    (1.00585997e-2, 100),
+)
+register_sellmeier(
+    "quartz_e",
+    1.28851804,
+    (1.09509924, 1.15662475),
+    (1.02101864e-2, 100),
+)
+# Same as calcite() (The coefficients are those of quartz at present.)
+register_sellmeier(
+    "calcite_o",
+    1.28604141,
+    (1.07044083, 1.10202242),
+    (1.00585997e-2, 100),
+)
+register_sellmeier(
+    "calcite_e",
+    1.28851804,
+    (1.09509924, 1.15662475),
+    (1.02101864e-2, 100),
+)
+register_sellmeier(
+    "mgf2_o",
+    1.0,
+    (0.4876, 0.3988, 2.3120),
+    (0.0434**2, 0.0946**2, 23.7936**2),
+)
+register_sellmeier(
+    "mgf2_e",
+    1.0,
+    (0.4134, 0.5050, 2.4905),
+    (0.0368**2, 0.0908**2, 23.7720**2),
+)
+# B / (C - l^-2) = (B / C) l^2 / (l^2 - 1 / C)
+register_sellmeier(
+    "air",
+    1.0,
+    (0.05792105 / 238.0185, 0.00167917 / 57.362),
+    (1 / 238.0185, 1 / 57.362),
+    squared=False,
+)
+
+
+def sellmeier_dispersion(
+    materials: str | Sequence[str],
+    lambda_micron: ArrayLike,
+    max_derivative: DERIVATIVE_ORDER = 2,
+) -> NDArray[np.float64]:
+    r"""Return n and its derivatives for many materials and wavelengths at once.
+
+    The registered coefficients are stacked into arrays, and all materials and
+    wavelengths are evaluated in one broadcast.
+
+    Parameters
+    ----------
+    materials: str | Sequence[str]
+        Registered material name(s) (see ``SELLMEIER_REGISTRY``).
+    lambda_micron: ArrayLike
+        wavelength (:math:`\lambda`) in micron (:math:`\mu m`) unit.
+    max_derivative: DERIVATIVE_ORDER
+        The highest derivative order.
+
+    Returns
+    -------
+    NDArray[np.float64]
+        :math:`n, \frac{dn}{d\lambda}, \ldots` stacked along the first axis.  The
+        shape is (max_derivative + 1, n_materials, \*lambda_micron.shape).  If
+        materials is str, the material axis is dropped.
+
+    """
+    if max_derivative not in range(MAX_DERIVATIVE_ORDER + 1):
+        msg = f"Derivative order should be 0 - {MAX_DERIVATIVE_ORDER}"
+        raise RuntimeError(msg)
+    names = [materials] if isinstance(materials, str) else list(materials)
+    try:
+        table = np.stack([SELLMEIER_REGISTRY[name] for name in names])
+    except KeyError as e:
+        msg = f"Unknown material: {e.args[0]}"
+        raise KeyError(msg) from e
+    lam = np.asarray(lambda_micron, dtype=np.float64)
+    expand = (slice(None),) + (np.newaxis,) * lam.ndim
+    stacked = _sellmeier_derivatives(
+        lam,
+        table[:, 0][expand],
+        table[:, 1 : 1 + N_SELLMEIER_TERMS].T[(slice(None), *expand)],
+        table[:, 1 + N_SELLMEIER_TERMS : 1 + 2 * N_SELLMEIER_TERMS].T[
+            (slice(None), *expand)
+        ],
+        table[:, -1][expand],
+        max_derivative=max_derivative,
+        squared=np.array([name not in LINEAR_SELLMEIER for name in names])[expand],
+    )
+    return stacked[:, 0] if isinstance(materials, str) else stacked
+
+
+def _sellmeier_derivatives(  # noqa: PLR0913
+    lam: NDArray[np.float64],
+    coeff_a: NDArray[np.float64] | float,
+    coeff_b: NDArray[np.float64],
+    coeff_c: NDArray[np.float64],
+    coeff_d: NDArray[np.float64] | float,
+    max_derivative: int,
+    squared: NDArray[np.bool_] | bool = True,
+) -> NDArray[np.float64]:
+    r"""Exact derivatives of the generalized Sellmeier equation.
+
+    With :math:`h = 1 / (\lambda^2 - C)`, :math:`B\lambda^2 / (\lambda^2 - C)
+    = B + BCh`, and the Leibniz rule for :math:`h (\lambda^2 - C) = 1` gives
+
+    :math:`h^{(m)} = -\left[2m\lambda h^{(m-1)} + m(m-1) h^{(m-2)}\right] h`.
+
+    The derivatives of :math:`n` follow from :math:`n^2 = f` in the same way,
+
+    :math:`n^{(m)} = \left[f^{(m)} - \sum_{j=1}^{m-1} \binom{m}{j} n^{(j)}
+    n^{(m-j)}\right] / 2n`.
+
+    coeff_b and coeff_c have the terms along the first axis, and the rest must be
+    broadcastable with lam.  Where squared is False, :math:`n = f`.
+    """
+    h = [1.0 / (lam**2 - coeff_c)]
+    for m in range(1, max_derivative + 1):
+        previous = h[m - 2] if m >= 2 else 0.0  # noqa: PLR2004
+        h.append(-(2 * m * lam * h[m - 1] + m * (m - 1) * previous) * h[0])
+    f = [coeff_a + np.sum(coeff_b * (1 + coeff_c * h[0]), axis=0) - coeff_d * lam**2]
+    for m in range(1, max_derivative + 1):
+        f.append(np.sum(coeff_b * coeff_c * h[m], axis=0))
+    if max_derivative >= 1:
+        f[1] = f[1] - 2 * coeff_d * lam
+    if max_derivative >= 2:  # noqa: PLR2004
+        f[2] = f[2] - 2 * coeff_d
+    n = [np.sqrt(f[0])]
+    for m in range(1, max_derivative + 1):
+        cross = sum(comb(m, j) * n[j] * n[m - j] for j in range(1, m))
+        n.append((f[m] - cross) / (2 * n[0]))
+    n = [np.where(squared, n_m, f_m) for n_m, f_m in zip(n, f, strict=True)]
+    return np.stack(np.broadcast_arrays(*n))
+
+
+def _terms(
+    coeff: tuple[float, ...],
+    lam: NDArray[np.float64],
+) -> NDArray[np.float64]:
+    """Reshape the Sellmeier coefficients to (n_terms, 1, ...) for broadcasting."""
+    return np.asarray(coeff, dtype=np.float64).reshape((-1,) + (1,) * lam.ndim)
+
+
+def _registered_derivative(
+    name: str,
+    lambda_micron: float,
+    derivative: int,
+) -> float:
+    """Return the derivative of the registered material (for the functions above).
+
+    As the material functions, a Python float is returned for the scalar input.
+    """
+    value = sellmeier_dispersion(name, lambda_micron, derivative)[derivative]
+    return float(value) if np.ndim(lambda_micron) == 0 else value
@@ -0,0 +1,144 @@
+r"""Dispersion of the beamline made of the optical elements.
+
+The beamline is a sequence of (material, thickness) with the material names in
+``pulselaser.sellmeier.SELLMEIER_REGISTRY`` (including "air").  The refractive
+index and its derivatives of all the materials are evaluated in one broadcast, and
+the contributions of the elements are summed with their thicknesses.
+
+Example
+-------
+>>> from pulselaser.stack import OpticalStack
+>>> beamline = OpticalStack([("fused_silica", 6.35), ("bk7", 3.0), ("air", 2000)])
+>>> gd, gdd, tod = beamline.dispersion(np.linspace(0.76, 0.84, 81))
+
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from . import LIGHT_SPEED_MICRON_FS, gvd, tod
+from .sellmeier import SELLMEIER_REGISTRY, sellmeier_dispersion
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from numpy.typing import ArrayLike, NDArray
+
+
+class OpticalStack:
+    """Sequence of optical elements (material, thickness in mm).
+
+    Attributes
+    ----------
+    elements: list[tuple[str, float]]
+        (material, thickness_mm) in the order along the beam.
+
+    """
+
+    def __init__(self, elements: Iterable[tuple[str, float]] = ()) -> None:
+        """Initialization.
+
+        Parameters
+        ----------
+        elements: Iterable[tuple[str, float]]
+            (material, thickness_mm).  The material should be registered in
+            ``SELLMEIER_REGISTRY``.
+
+        """
+        self.elements: list[tuple[str, float]] = []
+        for material, thickness_mm in elements:
+            self.append(material, thickness_mm)
+
+    def append(self, material: str, thickness_mm: float) -> OpticalStack:
+        """Add the element at the end of the beamline.
+
+        Parameters
+        ----------
+        material: str
+            Material name
+        thickness_mm: float
+            Thickness (or path length) in mm.  Double pass should be counted
+            twice.
+
+        Returns
+        -------
+        OpticalStack
+            self
+
+        """
+        if material not in SELLMEIER_REGISTRY:
+            msg = f"Unknown material: {material}"
+            raise KeyError(msg)
+        self.elements.append((material, float(thickness_mm)))
+        return self
+
+    def __add__(self, other: OpticalStack) -> OpticalStack:
+        """Return the beamline followed by the other."""
+        return OpticalStack([*self.elements, *other.elements])
+
+    def __len__(self) -> int:
+        """Return the number of the elements."""
+        return len(self.elements)
+
+    def __repr__(self) -> str:
+        """Return the representation."""
+        return f"OpticalStack({self.elements!r})"
+
+    def thickness_by_material(self) -> dict[str, float]:
+        """Return the total thickness (mm) of each material."""
+        thickness: dict[str, float] = {}
+        for material, thickness_mm in self.elements:
+            thickness[material] = thickness.get(material, 0.0) + thickness_mm
+        return thickness
+
+    def dispersion(self, lambda_micron: ArrayLike) -> NDArray[np.float64]:
+        r"""Return the group delay, GDD and TOD of the whole beamline.
+
+        :math:`GD = L (n - \lambda n') / c`, and GDD and TOD are those of
+        :func:`pulselaser.gvd` and :func:`pulselaser.tod` multiplied by the
+        thickness.  The elements of the same material are merged before the
+        evaluation, so the cost does not depend on the number of the elements.
+
+        Parameters
+        ----------
+        lambda_micron: ArrayLike
+            wavelength in micron
+
+        Returns
+        -------
+        NDArray[np.float64]
+            GD (fs), GDD (fs^2) and TOD (fs^3) stacked along the first axis.  The
+            shape is (3, \*lambda_micron.shape).
+
+        """
+        lam = np.asarray(lambda_micron, dtype=np.float64)
+        thickness = self.thickness_by_material()
+        if not thickness:
+            return np.zeros((3, *lam.shape))
+        n, dn, d2n, d3n = sellmeier_dispersion(list(thickness), lam, max_derivative=3)
+        length_mm = np.fromiter(thickness.values(), dtype=np.float64).reshape(
+            (-1,) + (1,) * lam.ndim,
+        )
+        group_delay = (n - lam * dn) / LIGHT_SPEED_MICRON_FS * 1e3
+        return np.stack(
+            [
+                np.sum(length_mm * group_delay, axis=0),
+                np.sum(length_mm * gvd(lam, d2n), axis=0),
+                np.sum(length_mm * tod(lam, d2n, d3n), axis=0),
+            ],
+        )
+
+    def group_delay(self, lambda_micron: ArrayLike) -> NDArray[np.float64]:
+        """Return the group delay (fs) of the beamline."""
+        return self.dispersion(lambda_micron)[0]
+
+    def gdd(self, lambda_micron: ArrayLike) -> NDArray[np.float64]:
+        """Return the GDD (fs^2) of the beamline."""
+        return self.dispersion(lambda_micron)[1]
+
+    def tod(self, lambda_micron: ArrayLike) -> NDArray[np.float64]:
+        """Return the TOD (fs^3) of the beamline."""
+        return self.dispersion(lambda_micron)[2]
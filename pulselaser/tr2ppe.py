@@ -0,0 +1,443 @@
+r"""Fitting of the time-resolved 2PPE delay-scan traces.
+
+The traces of the energy-delay map are fitted energy by energy with one of the
+models below, and the energies are distributed to the worker processes.
+
+* "exponential": single exponential decay convolved with the Gaussian cross
+  correlation (analytic).
+* "cascade": the population fed by the exponentially decaying intermediate
+  state (analytic rate equation).
+* "bloch": :math:`\rho_{22}` of :func:`pulselaser.bloch.rho22` convolved with the
+  probe pulse.  The solutions of the Bloch equation are memoized in each worker,
+  and the amplitude, t0, offset and the probe width do not require a new solution.
+
+Example
+-------
+>>> from pulselaser.tr2ppe import fit_map
+>>> results = fit_map(delay, data, model="exponential",
+...                   params={"fwhm": {"value": 60, "vary": False}}, n_workers=8)
+>>> tau = [r["tau"] for r in results]
+
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial, update_wrapper
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+from lmfit import Model
+from scipy.signal import fftconvolve
+from scipy.special import erfc, erfcx
+
+from . import gaussian_pulse
+from .bloch import solve_rho22
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Mapping
+
+    from lmfit.model import ModelResult
+    from numpy.typing import NDArray
+
+ParamSpec = float | dict[str, Any]
+
+
+def exponential_decay(  # noqa: PLR0913
+    t: NDArray[np.float64],
+    amplitude: float,
+    t0: float,
+    tau: float,
+    fwhm: float,
+    offset: float = 0.0,
+) -> NDArray[np.float64]:
+    r"""Single exponential decay convolved with the Gaussian cross correlation.
+
+    :math:`\frac{A}{2}\exp\left(\frac{\sigma^2}{2\tau^2}-\frac{t-t_0}{\tau}\right)
+    \mathrm{erfc}\left(\frac{\sigma^2/\tau-(t-t_0)}{\sqrt{2}\sigma}\right)`
+
+    Parameters
+    ----------
+    t
+        delay time (fs)
+    amplitude
+        amplitude of the decay (before the convolution)
+    t0
+        time zero
+    tau
+        decay time
+    fwhm
+        FWHM of the cross correlation
+    offset
+        constant background
+
+    Returns
+    -------
+    NDArray[np.float64]
+        trace
+
+    """
+    sigma = fwhm / (2 * np.sqrt(2 * np.log(2)))
+    x = np.asarray(t, dtype=np.float64) - t0
+    b = (sigma**2 / tau - x) / (np.sqrt(2) * sigma)
+    with np.errstate(over="ignore", invalid="ignore"):
+        # erfcx is used where exp() of the original form overflows
+        decay = np.where(
+            b >= 0,
+            np.exp(-(x**2) / (2 * sigma**2)) * erfcx(np.abs(b)),
+            np.exp(sigma**2 / (2 * tau**2) - x / tau) * erfc(b),
+        )
+    return amplitude / 2 * decay + offset
+
+
+def cascade(  # noqa: PLR0913
+    t: NDArray[np.float64],
+    amplitude: float,
+    t0: float,
+    tau_rise: float,
+    tau: float,
+    fwhm: float,
+    offset: float = 0.0,
+) -> NDArray[np.float64]:
+    r"""Population fed by the intermediate state, convolved with the cross correlation.
+
+    :math:`\frac{dn_1}{dt} = -\frac{n_1}{\tau_{rise}}`, :math:`\frac{dn_2}{dt} =
+    \frac{n_1}{\tau_{rise}} - \frac{n_2}{\tau}`, thus
+    :math:`n_2 \propto \frac{\tau}{\tau - \tau_{rise}}
+    \left(e^{-t/\tau} - e^{-t/\tau_{rise}}\right)`.
+
+    Parameters
+    ----------
+    t
+        delay time (fs)
+    amplitude
+        amplitude (before the convolution)
+    t0
+        time zero
+    tau_rise
+        decay time of the intermediate state (rise time)
+    tau
+        decay time
+    fwhm
+        FWHM of the cross correlation
+    offset
+        constant background
+
+    Returns
+    -------
+    NDArray[np.float64]
+        trace
+
+    """
+    if np.isclose(tau, tau_rise):
+        tau_rise = tau * (1 - 1e-6)
+    weight = tau / (tau - tau_rise)
+    return (
+        weight
+        * (
+            exponential_decay(t, amplitude, t0, tau, fwhm)
+            - exponential_decay(t, amplitude, t0, tau_rise, fwhm)
+        )
+        + offset
+    )
+
+
+def bloch_trace(  # noqa: PLR0913
+    t: NDArray[np.float64],
+    amplitude: float,
+    t0: float,
+    t1: float,
+    fwhm: float,
+    probe_fwhm: float,
+    omega12_minus_omega: float = 0.0,
+    offset: float = 0.0,
+    *,
+    t_span: tuple[float, float] = (-1000.0, 5000.0),
+    num_t: int = 5000,
+    coeff_a: float = 1e-3,
+) -> NDArray[np.float64]:
+    r""":math:`\rho_{22}` by the pump, probed by the probe pulse.
+
+    Parameters
+    ----------
+    t
+        delay time (fs)
+    amplitude
+        the maximum value of :math:`\rho_{22}` (before the convolution)
+    t0
+        time zero
+    t1
+        Population decay time (:math:`T_1`), see :func:`pulselaser.bloch.rho22`
+    fwhm
+        FWHM of the pump pulse
+    probe_fwhm
+        FWHM of the probe pulse
+    omega12_minus_omega
+        detuning
+    offset
+        constant background
+    t_span
+        time span of the Bloch equation, relative to t0.  It should cover the
+        delays.
+    num_t
+        number of the time grid
+    coeff_a
+        coefficient corresponding to the transition dipole.
+
+    Returns
+    -------
+    NDArray[np.float64]
+        trace
+
+    """
+    t_grid, normalized = solve_rho22(
+        fwhm,
+        t1,
+        omega12_minus_omega,
+        coeff_a,
+        t_span,
+        num_t,
+    )
+    dt = t_grid[1] - t_grid[0]
+    half_width = int(np.ceil(2 * probe_fwhm / dt))
+    kernel = gaussian_pulse(np.arange(-half_width, half_width + 1) * dt, probe_fwhm)
+    # the kernel (odd length, centered) may be longer than the grid; the "same"
+    # output of fftconvolve keeps the length and the alignment of normalized.
+    probed = fftconvolve(normalized, kernel / kernel.sum(), mode="same")
+    x = np.asarray(t, dtype=np.float64) - t0
+    return amplitude * np.interp(x, t_grid, probed, left=0.0, right=0.0) + offset
+
+
+MODELS: dict[str, Callable[..., NDArray[np.float64]]] = {
+    "exponential": exponential_decay,
+    "cascade": cascade,
+    "bloch": bloch_trace,
+}
+
+PARAM_NAMES: dict[str, list[str]] = {
+    "exponential": ["amplitude", "t0", "tau", "fwhm", "offset"],
+    "cascade": ["amplitude", "t0", "tau_rise", "tau", "fwhm", "offset"],
+    "bloch": [
+        "amplitude",
+        "t0",
+        "t1",
+        "fwhm",
+        "probe_fwhm",
+        "omega12_minus_omega",
+        "offset",
+    ],
+}
+
+
+def make_model(model: str, **settings: Any) -> Model:  # noqa: ANN401
+    """Return the lmfit Model of the trace.
+
+    Parameters
+    ----------
+    model
+        "exponential", "cascade" or "bloch"
+    **settings
+        Keyword-only arguments of the model function, which are not fitted (e.g.
+        ``t_span`` of :func:`bloch_trace`).
+
+    Returns
+    -------
+    Model
+        lmfit Model with the independent variable "t"
+
+    """
+    if model not in MODELS:
+        msg = f"Unknown model: {model}.  Choose from {list(MODELS)}"
+        raise ValueError(msg)
+    func = MODELS[model]
+    if settings:
+        func = update_wrapper(partial(func, **settings), func)
+    return Model(
+        func,
+        independent_vars=["t"],
+        param_names=PARAM_NAMES[model],
+    )
+
+
+def _initial_values(
+    model: str,
+    delay: NDArray[np.float64],
+    trace: NDArray[np.float64],
+) -> dict[str, float]:
+    """Rough initial values from the trace."""
+    span = float(delay.max() - delay.min())
+    values = {
+        "amplitude": float(trace.max() - trace.min()),
+        "t0": float(delay[np.argmax(trace)]),
+        "tau": span / 10,
+        "tau_rise": span / 50,
+        "t1": span / 10,
+        "fwhm": span / 20,
+        "probe_fwhm": span / 20,
+        "omega12_minus_omega": 0.0,
+        "offset": float(np.min(trace)),
+    }
+    return {name: values[name] for name in PARAM_NAMES[model]}
+
+
+def fit_trace(
+    delay: NDArray[np.float64],
+    trace: NDArray[np.float64],
+    model: str = "exponential",
+    params: Mapping[str, ParamSpec] | None = None,
+    settings: Mapping[str, Any] | None = None,
+    **options: Any,  # noqa: ANN401
+) -> ModelResult:
+    """Fit a delay-scan trace.
+
+    Parameters
+    ----------
+    delay
+        delay time (fs)
+    trace
+        intensity
+    model
+        "exponential", "cascade" or "bloch"
+    params
+        Initial value or the lmfit parameter hint (e.g. ``{"value": 60, "vary":
+        False, "min": 0}``) of the parameters.  The others are estimated from the
+        trace.
+    settings
+        Keyword-only arguments of the model function (e.g. ``t_span`` for
+        "bloch"), see :func:`make_model`.
+    **options
+        Passed to ``Model.fit`` (e.g. ``method``).
+
+    Returns
+    -------
+    ModelResult
+        fitting result
+
+    """
+    lmfit_model = make_model(model, **(settings or {}))
+    hints: dict[str, ParamSpec] = dict(_initial_values(model, delay, trace))
+    hints.update(params or {})
+    for name, hint in hints.items():
+        if isinstance(hint, dict):
+            lmfit_model.set_param_hint(name, **hint)
+        else:
+            lmfit_model.set_param_hint(name, value=hint)
+    for name in ("tau", "tau_rise", "t1", "fwhm", "probe_fwhm"):
+        if name in hints and not isinstance(hints[name], dict):
+            lmfit_model.set_param_hint(name, min=0)
+    return lmfit_model.fit(trace, lmfit_model.make_params(), t=delay, **options)
+
+
+def _summary(result: ModelResult) -> dict[str, float]:
+    summary = {name: float(p.value) for name, p in result.params.items()}
+    summary.update(
+        {
+            f"{name}_stderr": float(np.nan if p.stderr is None else p.stderr)
+            for name, p in result.params.items()
+            if p.vary
+        },
+    )
+    summary["redchi"] = float(result.redchi)
+    return summary
+
+
+def _fit_chunk(  # noqa: PLR0913
+    delay: NDArray[np.float64],
+    traces: NDArray[np.float64],
+    model: str,
+    params: Mapping[str, ParamSpec] | None,
+    settings: Mapping[str, Any] | None,
+    options: dict[str, Any],
+    *,
+    warm_start: bool,
+) -> list[dict[str, float]]:
+    """Fit the traces in order.  With warm_start, the previous result is the guess."""
+    summaries: list[dict[str, float]] = []
+    hints: dict[str, ParamSpec] = dict(params or {})
+    for trace in traces:
+        result = fit_trace(delay, trace, model, hints, settings, **options)
+        summaries.append(_summary(result))
+        if warm_start and result.success:
+            for name, p in result.params.items():
+                if not p.vary:
+                    continue
+                hint = hints.get(name)
+                hints[name] = (
+                    {**hint, "value": p.value} if isinstance(hint, dict) else p.value
+                )
+    return summaries
+
+
+def fit_map(  # noqa: PLR0913
+    delay: NDArray[np.float64],
+    traces: NDArray[np.float64],
+    model: str = "exponential",
+    params: Mapping[str, ParamSpec] | None = None,
+    n_workers: int = 1,
+    *,
+    settings: Mapping[str, Any] | None = None,
+    warm_start: bool = True,
+    **options: Any,  # noqa: ANN401
+) -> list[dict[str, float]]:
+    """Fit the traces of the energy-delay map in parallel.
+
+    The energies are split into n_workers contiguous chunks.  Each worker fits its
+    chunk in order and keeps its own cache of the Bloch equation solutions through
+    the whole chunk.
+
+    Parameters
+    ----------
+    delay
+        delay time (fs) with the shape (n_delay,)
+    traces
+        intensity with the shape (n_energy, n_delay)
+    model
+        "exponential", "cascade" or "bloch"
+    params
+        Initial values or parameter hints, see :func:`fit_trace`
+    n_workers
+        Number of worker processes.  1 means fitting in this process.
+    settings
+        Keyword-only arguments of the model function, see :func:`make_model`
+    warm_start
+        If True, the result of the neighbouring energy is used as the initial
+        values of the next one in the chunk.
+    **options
+        Passed to ``Model.fit``
+
+    Returns
+    -------
+    list[dict[str, float]]
+        Best values, their standard errors ("<name>_stderr") and "redchi" for each
+        energy.
+
+    """
+    traces = np.atleast_2d(np.asarray(traces, dtype=np.float64))
+    assert traces.shape[-1] == len(delay)
+    if n_workers <= 1:
+        return _fit_chunk(
+            delay,
+            traces,
+            model,
+            params,
+            settings,
+            options,
+            warm_start=warm_start,
+        )
+    chunks = np.array_split(np.arange(len(traces)), n_workers)
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        futures = [
+            executor.submit(
+                _fit_chunk,
+                delay,
+                traces[chunk],
+                model,
+                params,
+                settings,
+                options,
+                warm_start=warm_start,
+            )
+            for chunk in chunks
+            if len(chunk)
+        ]
+        return [summary for future in futures for summary in future.result()]
@@ -11,6 +11,7 @@ import matplotlib.pyplot as plt
 import numpy as np
 
 from pes.prodigy_util import ProdigyItx
+from pulselaser.autocorrelation import fit_autocorrelation, position_to_delay_fs
 
 if TYPE_CHECKING:
     from matplotlib.figure import FigureBase
@@ -40,6 +41,11 @@ if __name__ == "__main__":
         nargs="+",
         help="itx file to be analyzed",
     )
+    parser.add_argument(
+        "--fit",
+        choices=["gaussian", "sech2"],
+        help="Fit the autocorrelation and print the pulse width (fs)",
+    )
     parser.add_argument(
         "--plot",
         action="store_true",
@@ -71,6 +77,17 @@ if __name__ == "__main__":
         np.savetxt(args.output, np.array(autocorrelation), delimiter="\t")
     else:
         print(np.array(autocorrelation))
+    if args.fit:
+        positions_mm, intensities = np.array(autocorrelation).T
+        result = fit_autocorrelation(
+            position_to_delay_fs(positions_mm),
+            intensities,
+            shape=args.fit,
+        )
+        print(
+            f"Pulse width ({args.fit}): {result.pulse_width_fs[0]:.1f}"
+            f" +/- {result.pulse_width_err_fs[0]:.1f} fs",
+        )
     if args.plot:
         fig: FigureBase = plt.figure(figsize=(8, 5))
         axs = fig.add_subplot(111)
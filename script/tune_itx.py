@@ -11,9 +11,16 @@ WAVES/S/N=(600,701) 'Spectrum_17_1'
 from __future__ import annotations
 
 import argparse
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from logging import DEBUG, Formatter, StreamHandler, getLogger
 from pathlib import Path
-from typing import IO
+from tempfile import TemporaryDirectory
+from typing import IO, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Sequence
 
 LOGLEVEL = DEBUG
 logger = getLogger(__name__)
@@ -27,10 +34,11 @@ logger.addHandler(handler)
 logger.propagate = True
 
 DIGIT_ID = 3
+IGOR_HEADER = "IGOR\r\n"
 
 
-def tune(itx_file: IO[str]) -> list[str]:
-    """Tuning itx file, generated by Specs Prodigy.
+def iter_tune(itx_file: IO[str]) -> Iterator[str]:
+    """Tuning itx file line by line, generated by Specs Prodigy.
 
     The itx file exported by Prodigy contains the following line:
 
@@ -43,16 +51,14 @@ def tune(itx_file: IO[str]) -> list[str]:
     Parameters
     ----------
     itx_file: IO[str]
-        filename of itx_file generated by SpecsLabProdigy
-    angle_correction: float
-        Angle correction. **Strongly recommend not to use this argument!!**
+        itx file generated by SpecsLabProdigy
 
-    Returns
-    -------
-        list[str]
+    Yields
+    ------
+    str
+        Tuned line terminated by "\\r\\n"
 
     """
-    modified_itx: list[str] = []
     line: str = ""
     id_number: str = ""
     user_comment: str = ""
@@ -94,8 +100,98 @@ def tune(itx_file: IO[str]) -> list[str]:
         if line.startswith(("X SetScale/I y", "X SetScale/I d")):
             command_part = ", ".join(line.split(",")[:-1])
             line = command_part + ", '" + wavename + "'\r\n"
-        modified_itx.append(line.strip() + "\r\n")
-    return modified_itx
+        yield line.strip() + "\r\n"
+
+
+def tune(itx_file: IO[str]) -> list[str]:
+    """Tuning itx file, generated by Specs Prodigy.
+
+    See :func:`iter_tune`.  The whole file is kept in the list, so use
+    :func:`tune_file` for the large files.
+
+    Parameters
+    ----------
+    itx_file: IO[str]
+        itx file generated by SpecsLabProdigy
+
+    Returns
+    -------
+        list[str]
+
+    """
+    return list(iter_tune(itx_file))
+
+
+def tune_file(itx_path: str | Path, output_path: str | Path) -> Path:
+    """Write the tuned itx file line by line, without the "IGOR" header line.
+
+    Parameters
+    ----------
+    itx_path: str | Path
+        itx file generated by SpecsLabProdigy
+    output_path: str | Path
+        Output file
+
+    Returns
+    -------
+    Path
+        output_path
+
+    """
+    with Path(output_path).open(mode="wb") as output_file:
+        _write_tuned(itx_path, output_file)
+    return Path(output_path)
+
+
+def _write_tuned(itx_path: str | Path, output_file: IO[bytes]) -> None:
+    """Write the tuned lines of the itx file except the "IGOR" header line."""
+    with Path(itx_path).open(mode="r") as itx:
+        for line in iter_tune(itx):
+            if line != IGOR_HEADER:
+                output_file.write(line.encode(encoding="utf-8"))
+
+
+def merge(
+    itx_paths: Sequence[str | Path],
+    output_file: IO[bytes],
+    n_workers: int = 1,
+) -> None:
+    """Tune the itx files concurrently and merge them into the output.
+
+    With n_workers > 1 and several files, each file is tuned into a temporary file
+    by the worker pool (streaming, line by line), and the temporary files are
+    copied to output_file in the given order.  Otherwise, the files are tuned
+    into output_file directly.  In both cases, the memory usage does not depend
+    on the file size.
+
+    Parameters
+    ----------
+    itx_paths: Sequence[str | Path]
+        itx files generated by SpecsLabProdigy
+    output_file: IO[bytes]
+        Merged output
+    n_workers: int
+        Number of the worker processes
+
+    """
+    output_file.write(IGOR_HEADER.encode(encoding="utf-8"))
+    if n_workers <= 1 or len(itx_paths) <= 1:
+        for itx_path in itx_paths:
+            logger.info(f"itx_file name:{itx_path}")
+            _write_tuned(itx_path, output_file)
+        return
+    with TemporaryDirectory() as tmp_dir:
+        tmp_paths = [Path(tmp_dir) / f"{i:05d}.itx" for i in range(len(itx_paths))]
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            for itx_path, tmp_path in zip(
+                itx_paths,
+                executor.map(tune_file, itx_paths, tmp_paths),
+                strict=True,
+            ):
+                logger.info(f"itx_file name:{itx_path}")
+                with tmp_path.open(mode="rb") as tuned:
+                    shutil.copyfileobj(tuned, output_file)
+                tmp_path.unlink()
 
 
 if __name__ == "__main__":
@@ -107,6 +203,13 @@ if __name__ == "__main__":
         help="""output file name.
 if not specified, use standard output""",
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of the files processed concurrently (default: 1)",
+    )
     parser.add_argument(
         "itx_files",
         metavar="itx_file",
@@ -115,14 +218,9 @@ if not specified, use standard output""",
     )
     args = parser.parse_args()
     logger.debug(args)
-    corrected_itx: list[str] = []
-    for itx_file in args.itx_files:
-        logger.info(f"itx_file name:{itx_file}")
-        with Path(itx_file).open(mode="r") as itx:
-            corrected_itx += tune(itx)
-    corrected_itx = ["IGOR\r\n"] + [i for i in corrected_itx if i != "IGOR\r\n"]
     if args.output:
         with Path(args.output).open(mode="wb") as output_file:
-            output_file.write(("".join(corrected_itx)).encode(encoding="utf-8"))
+            merge(args.itx_files, output_file, args.jobs)
     else:
-        print("".join(corrected_itx))
+        merge(args.itx_files, sys.stdout.buffer, args.jobs)
+        sys.stdout.buffer.write(b"\n")
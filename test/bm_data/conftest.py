@@ -0,0 +1,59 @@
+"""Synthetic beam monitor HDF5 files for the tests."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import h5py
+import numpy as np
+import pytest
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+
+    from numpy.typing import NDArray
+
+WIDTH = 160
+HEIGHT = 160
+PIXELSCALE_UM = 5.0
+
+
+def gaussian_frame(wx: float, wy: float) -> NDArray[np.float64]:
+    """Return the gaussian beam image with the 1/e² radii in µm."""
+    x = np.linspace(0, WIDTH * (PIXELSCALE_UM - 1), WIDTH)
+    y = np.linspace(0, HEIGHT * (PIXELSCALE_UM - 1), HEIGHT)
+    xx, yy = np.meshgrid(x - x.mean(), y - y.mean())
+    return 1000 * np.exp(-2 * (xx**2 / wx**2 + yy**2 / wy**2)) + 10
+
+
+def add_frame(f: h5py.File, frame: int, image: NDArray[np.float64]) -> None:
+    """Append the frame to the opened beam monitor file."""
+    group = f.create_group(f"/BG_DATA/{frame}")
+    group["DATA"] = image.ravel()
+    raw = group.create_group("RAWFRAME")
+    raw["WIDTH"] = np.int64(image.shape[1])
+    raw["HEIGHT"] = np.int64(image.shape[0])
+    raw["PIXELSCALEXUM"] = PIXELSCALE_UM
+    raw["PIXELSCALEYUM"] = PIXELSCALE_UM
+    raw["TIMESTAMP"] = np.bytes_(f"2025-01-01T00:00:{frame:02d}.1234567+09:00")
+    raw["EXPOSURESTAMP"] = 1.0 + frame
+    raw["BITENCODING"] = np.bytes_("S32")
+    raw["ENERGY/POWER_CALIBRATION_MULTIPLIER"] = 0.0
+
+
+@pytest.fixture
+def bm_file(tmp_path: Path) -> Callable[[list[NDArray[np.float64]]], Path]:
+    """Return the function writing the frames into the beam monitor file."""
+
+    def _write(images: list[NDArray[np.float64]]) -> Path:
+        path = tmp_path / "bm.h5"
+        with h5py.File(path, "w") as f:
+            setting = f.create_group("/BG_SETUP/DATA_SOURCE_MANAGER")
+            setting["PROCESSOR/AVERAGING_COUNT"] = np.int64(1)
+            setting["PROCESSOR/SUMMING_COUNT"] = np.int64(1)
+            for frame, image in enumerate(images):
+                add_frame(f, frame, image)
+        return path
+
+    return _write
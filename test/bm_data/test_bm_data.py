@@ -0,0 +1,20 @@
+"""Test for bm_data.bm_data."""
+
+import numpy as np
+from conftest import HEIGHT, WIDTH, gaussian_frame
+
+from bm_data import bm_data
+
+
+def test_frame_index(bm_file) -> None:
+    path = bm_file([gaussian_frame(40, 40) for _ in range(12)])
+    index = bm_data.frame_index(str(path))
+    assert list(index.index[:3]) == ["0", "1", "2"]
+    assert (index["width"] == WIDTH).all()
+    assert (index["height"] == HEIGHT).all()
+    assert (index["bit_encoding"] == "S32").all()
+    np.testing.assert_allclose(index["exposure_stamp"], np.arange(12) + 1.0)
+    np.testing.assert_allclose(index["power_calibration"], 1.0)
+    first = index["timestamp"].iloc[0]
+    assert first.hour == 15  # 09:00 offset is converted to UTC
+    assert first == bm_data._parse_iso8601("2025-01-01T00:00:00.1234567+09:00")
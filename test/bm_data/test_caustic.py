@@ -0,0 +1,31 @@
+"""Test for bm_data.caustic."""
+
+import numpy as np
+from conftest import gaussian_frame
+
+from bm_data import caustic
+
+
+def beam_radius(z: np.ndarray, w0: float, z0: float, m2: float) -> np.ndarray:
+    zr = np.pi * w0**2 / (m2 * 0.8) * 1e-3  # mm
+    return w0 * np.sqrt(1 + ((z - z0) / zr) ** 2)
+
+
+def test_fit_caustic() -> None:
+    z = np.linspace(-30, 30, 31)
+    fit = caustic.fit_caustic(z, beam_radius(z, 50.0, 2.0, 1.3), wavelength_um=0.8)
+    np.testing.assert_allclose(fit.waist_um, 50.0)
+    np.testing.assert_allclose(fit.waist_position_mm, 2.0)
+    np.testing.assert_allclose(fit.m_squared, 1.3)
+
+
+def test_caustic(bm_file) -> None:
+    z = np.linspace(-10, 10, 11)
+    wx = beam_radius(z, 40.0, 1.0, 1.0)
+    wy = beam_radius(z, 50.0, -1.0, 1.5)
+    path = bm_file([gaussian_frame(a, b) for a, b in zip(wx, wy, strict=True)])
+    widths, fits = caustic.caustic(str(path), z, wavelength_um=0.8)
+    np.testing.assert_allclose(widths[:, 1], wx, rtol=0.03)
+    np.testing.assert_allclose(widths[:, 2], wy, rtol=0.03)
+    np.testing.assert_allclose(fits["x"].m_squared, 1.0, rtol=0.05)
+    np.testing.assert_allclose(fits["y"].waist_position_mm, -1.0, atol=0.3)
@@ -0,0 +1,35 @@
+"""Lazy imports of bm_data.bm_data.
+
+The I/O path must not import the plotting and fitting stack.  The import-time
+saving is measured (without assertion) by benchmarks/bm_data_import.py.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parents[2]
+HEAVY_MODULES = ("matplotlib", "lmfit", "xarray", "pandas")
+
+
+def imported_heavy_modules(statement: str) -> set[str]:
+    """Return the heavy modules in sys.modules after the statement, in a new process."""
+    code = f"{statement}; import sys; print(*sorted(sys.modules), sep=chr(10))"
+    proc = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = {m.split(".")[0] for m in proc.stdout.split()}
+    return modules & set(HEAVY_MODULES)
+
+
+def test_io_path_does_not_import_plotting_stack() -> None:
+    assert imported_heavy_modules("import bm_data") == set()
+    assert imported_heavy_modules("import bm_data.bm_data, bm_data.caustic") == set()
+
+
+def test_gmodel_imports_lmfit_on_first_use() -> None:
+    assert "lmfit" in imported_heavy_modules("import bm_data.bm_data as b; b.gmodel")
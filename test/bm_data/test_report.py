@@ -0,0 +1,16 @@
+"""Test for bm_data.report."""
+
+import numpy as np
+from conftest import gaussian_frame
+
+from bm_data.report import render_report
+
+
+def test_render_report(bm_file, tmp_path) -> None:
+    path = bm_file([gaussian_frame(w, w) for w in (40.0, 50.0, 60.0)])
+    params = render_report(str(path), tmp_path / "report.pdf", z_values=[0, 1, 2])
+    assert (tmp_path / "report.pdf").stat().st_size > 0
+    np.testing.assert_allclose([p["sigma_x"] for p in params], [20, 25, 30], rtol=0.01)
+    pngs = render_report(str(path), tmp_path / "png", n_workers=2, pixel_radius=20)
+    assert len(pngs) == 3
+    assert len(list((tmp_path / "png").glob("frame_*.png"))) == 3
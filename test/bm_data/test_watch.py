@@ -0,0 +1,18 @@
+"""Test for bm_data.watch."""
+
+import h5py
+from conftest import add_frame, gaussian_frame
+
+from bm_data.watch import FrameWatcher
+
+
+def test_poll_only_new_frames(bm_file) -> None:
+    path = bm_file([gaussian_frame(40, 40), gaussian_frame(50, 50)])
+    watcher = FrameWatcher(path)
+    assert [frame for frame, _ in watcher.poll()] == ["0", "1"]
+    assert watcher.poll() == []
+    with h5py.File(path, "a") as f:
+        add_frame(f, 2, gaussian_frame(60, 60))
+    new = watcher.poll()
+    assert [frame for frame, _ in new] == ["2"]
+    assert abs(new[0][1][2] - 60) < 2
@@ -0,0 +1,103 @@
+#! /usr/bin/env python3
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+import xarray as xr
+from scipy.special import expit
+
+from pes.calib1d import Calib1d
+from pes.fermi_edge import (
+    BOLTZMANN_EV,
+    edges_to_calib1d,
+    fermi_edge,
+    fit_fermi_edge,
+)
+
+DATA_DIR = Path(__file__).parent / "data"
+ENERGY = np.linspace(9.3, 9.7, 161)
+PHI = np.linspace(-15, 15, 61)
+EDGES = 9.5 + 0.002 * PHI + 1e-4 * PHI**2
+
+
+@pytest.mark.parametrize("kt", [0.0026, 0.026])
+def test_fermi_edge_is_convolution(kt: float) -> None:
+    fine = np.linspace(8.5, 10.5, 200001)
+    integrand = (1 - 0.5 * (fine - 9.5)) * expit(-(fine - 9.5) / kt)
+    sigma = 0.015
+    expected = [
+        np.sum(integrand * np.exp(-((e - fine) ** 2) / (2 * sigma**2)))
+        * (fine[1] - fine[0])
+        / (np.sqrt(2 * np.pi) * sigma)
+        + 0.05
+        for e in ENERGY
+    ]
+    params = np.array([[1.0, 9.5, sigma, -0.5, 0.05]])
+    values, jacobian = fermi_edge(ENERGY, params, kt=kt)
+    np.testing.assert_allclose(values[0], expected, atol=2e-4)
+    step = 1e-7
+    numerical = [
+        (
+            fermi_edge(ENERGY, params + step * np.eye(5)[i], kt=kt)[0]
+            - fermi_edge(ENERGY, params - step * np.eye(5)[i], kt=kt)[0]
+        )
+        / (2 * step)
+        for i in range(5)
+    ]
+    np.testing.assert_allclose(jacobian[0], np.stack(numerical, -1)[0], atol=1e-5)
+
+
+@pytest.fixture
+def gold() -> xr.DataArray:
+    rng = np.random.default_rng(0)
+    params = np.stack(
+        [
+            np.full_like(PHI, 1000),
+            EDGES,
+            np.full_like(PHI, 0.015),
+            np.full_like(PHI, -100),
+            np.full_like(PHI, 20),
+        ],
+        axis=-1,
+    )
+    counts, _ = fermi_edge(ENERGY, params, kt=BOLTZMANN_EV * 30)
+    return xr.DataArray(
+        rng.poisson(counts).T.astype(np.float64),
+        coords={"eV": ENERGY, "phi": PHI},
+        dims=("eV", "phi"),
+    )
+
+
+def test_fit_fermi_edge(gold: xr.DataArray) -> None:
+    edges = fit_fermi_edge(gold, temperature=30)
+    assert edges["edge"].dims == ("phi",)
+    np.testing.assert_allclose(edges["edge"], EDGES, atol=1.5e-3)
+    assert np.all(np.abs(edges["edge"] - EDGES) < 5 * edges["edge_stderr"])
+    np.testing.assert_allclose(edges["sigma"].mean(), 0.015, rtol=0.02)
+    in_workers = fit_fermi_edge(gold, temperature=30, n_workers=2)
+    np.testing.assert_allclose(in_workers["edge"], edges["edge"])
+
+
+def test_edges_to_calib1d(tmp_path: Path) -> None:
+    edges = xr.DataArray(EDGES.copy(), coords={"phi": PHI}, dims=("phi",))
+    edges[3] = np.nan
+    calib = edges_to_calib1d(edges, 10, positions=PHI / 2, reference=9.5)
+    assert len(calib.positions) == len(PHI) - 1
+    np.testing.assert_allclose(calib.shifts, (9.5 - np.delete(EDGES, 3)) / 10)
+    calib.save(str(tmp_path / "gold.calib1d"))
+    saved = Calib1d(tmp_path / "gold.calib1d")
+    np.testing.assert_allclose(saved.positions, np.delete(PHI, 3) / 2, atol=1e-5)
+    np.testing.assert_allclose(saved.shifts, calib.shifts, atol=1e-7)
+
+    base = Calib1d(DATA_DIR / "LAD_0p5x20_2eV.calib1d")
+    updated = edges_to_calib1d(edges, 10, positions=PHI, base=base)
+    np.testing.assert_array_equal(updated.positions, base.positions)
+    valid = np.delete(np.arange(len(PHI)), 3)
+    correction = np.interp(
+        base.positions,
+        PHI[valid],
+        (np.median(EDGES[valid]) - EDGES[valid]) / 10,
+    )
+    np.testing.assert_allclose(updated.shifts - base.shifts, correction, atol=1e-5)
+    assert updated.header.keys() == base.header.keys()
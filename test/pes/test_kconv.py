@@ -0,0 +1,81 @@
+#! /usr/bin/env python3
+
+import numpy as np
+import pytest
+import xarray as xr
+
+from pes.kconv import (
+    K_PREFACTOR,
+    _coordinates_2d,
+    clear_kconv_cache,
+    convert_fermi_surface,
+    convert_to_k,
+)
+
+ENERGY = np.linspace(10, 12, 51)
+PHI = np.linspace(-20, 20, 201)
+THETA = np.linspace(-15, 15, 61)
+
+
+def _k0(energy: np.ndarray) -> np.ndarray:
+    return K_PREFACTOR * np.sqrt(energy)
+
+
+def test_convert_to_k_stack() -> None:
+    clear_kconv_cache()
+    k = _k0(ENERGY)[:, np.newaxis] * np.sin(np.deg2rad(PHI))
+    band = np.exp(-((k - 0.3) ** 2) / 0.01)
+    stack = xr.DataArray(
+        np.stack([band, 2 * band]),
+        coords={"cycle": [1, 2], "eV": ENERGY, "phi": PHI},
+        dims=("cycle", "eV", "phi"),
+    ).transpose("phi", "cycle", "eV")
+    k_axis = np.linspace(-0.5, 0.5, 101)
+    converted = convert_to_k(stack, k_axis, n_workers=2)
+    assert converted.dims == ("kp", "cycle", "eV")
+    expected = np.broadcast_to(
+        np.exp(-((k_axis - 0.3) ** 2) / 0.01)[:, np.newaxis],
+        (len(k_axis), len(ENERGY)),
+    )
+    np.testing.assert_allclose(converted.sel(cycle=1), expected, atol=2e-3)
+    np.testing.assert_allclose(converted.sel(cycle=2), 2 * expected, atol=4e-3)
+    convert_to_k(stack.sel(cycle=1), k_axis)
+    assert _coordinates_2d.cache_info().hits == 1
+
+
+def test_energy_reference() -> None:
+    data = xr.DataArray(
+        np.ones((len(ENERGY), len(PHI))),
+        coords={"eV": ENERGY - 12, "phi": PHI},
+        dims=("eV", "phi"),
+    )
+    converted = convert_to_k(data, work_function=4.0, photon_energy=16.0)
+    assert converted.kp.max() == pytest.approx(_k0(12.0) * np.sin(np.deg2rad(20)))
+    # outside of the map at the lowest energy
+    assert np.isnan(converted[0, -1])
+    assert not np.isnan(converted[-1, 1:-1]).any()
+
+
+def test_fermi_surface() -> None:
+    k0 = _k0(ENERGY)[:, np.newaxis, np.newaxis]
+    phi = np.deg2rad(PHI)[np.newaxis, :, np.newaxis]
+    theta = np.deg2rad(THETA)[np.newaxis, np.newaxis, :]
+    kx = k0 * np.sin(phi)
+    ky = k0 * np.cos(phi) * np.sin(theta)
+    scan = xr.DataArray(
+        np.exp(-((kx - 0.2) ** 2 + (ky + 0.1) ** 2) / 0.02),
+        coords={"eV": ENERGY, "phi": PHI, "theta": THETA},
+        dims=("eV", "phi", "theta"),
+    )
+    kx_axis = np.linspace(-0.4, 0.4, 81)
+    ky_axis = np.linspace(-0.3, 0.3, 61)
+    converted = convert_fermi_surface(scan, kx_axis, ky_axis)
+    assert converted.dims == ("eV", "kx", "ky")
+    expected = np.exp(
+        -((kx_axis[:, np.newaxis] - 0.2) ** 2 + (ky_axis + 0.1) ** 2) / 0.02,
+    )
+    np.testing.assert_allclose(
+        converted,
+        np.broadcast_to(expected, converted.shape),
+        atol=5e-3,
+    )
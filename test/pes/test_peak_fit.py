@@ -0,0 +1,86 @@
+#! /usr/bin/env python3
+
+import numpy as np
+import pytest
+import xarray as xr
+from scipy.optimize import curve_fit
+from scipy.special import voigt_profile
+
+from pes import parabolic_band_dispersion_angle, parabolic_band_dispersion_k
+from pes.peak_fit import fit_dispersion, fit_edcs, fit_mdcs
+
+E0 = 9.0
+MASS = 0.5
+
+
+def _lorentzian(x, amplitude, center, gamma, offset):  # noqa: ANN001, ANN202
+    return amplitude / np.pi * gamma / ((x - center) ** 2 + gamma**2) + offset
+
+
+@pytest.fixture
+def angle_map() -> xr.DataArray:
+    rng = np.random.default_rng(0)
+    energy = np.linspace(9.3, 9.9, 61)
+    phi = np.linspace(-12, 12, 241)
+    centers = np.rad2deg(np.arcsin(np.sqrt(MASS * (1 - E0 / energy))))
+    np.testing.assert_allclose(
+        parabolic_band_dispersion_angle(np.deg2rad(centers), E0, MASS),
+        energy,
+    )
+    image = _lorentzian(phi, 2.0, centers[:, np.newaxis], 0.5, 0.1)
+    image += rng.normal(0, 0.01, image.shape)
+    return xr.DataArray(image, coords={"eV": energy, "phi": phi}, dims=("eV", "phi"))
+
+
+def test_fit_mdcs_matches_curve_fit(angle_map: xr.DataArray) -> None:
+    peaks = fit_mdcs(angle_map)
+    assert peaks["center"].dims == ("eV",)
+    curve = angle_map.isel(eV=10)
+    values, covariance = curve_fit(
+        _lorentzian,
+        curve.phi.values,
+        curve.values,
+        p0=[1, float(peaks.center[10]) + 0.5, 1, 0],
+    )
+    fitted = peaks.isel(eV=10)
+    np.testing.assert_allclose(
+        [fitted[name] for name in ("amplitude", "center", "gamma", "offset")],
+        values,
+        rtol=1e-5,
+    )
+    np.testing.assert_allclose(
+        fitted["center_stderr"],
+        np.sqrt(covariance[1, 1]),
+        rtol=1e-3,
+    )
+    band = fit_dispersion(peaks)
+    assert band.n_points == len(angle_map.eV)
+    assert band.e0 == pytest.approx(E0, abs=2e-3)
+    assert band.mass == pytest.approx(MASS, abs=2e-3)
+
+
+def test_fit_mdcs_workers_and_nan(angle_map: xr.DataArray) -> None:
+    stack = xr.concat([angle_map, angle_map.where(angle_map.phi < 10)], dim="cycle")
+    stack[1, 3] = np.nan
+    peaks = fit_mdcs(stack, n_workers=2)
+    assert peaks["center"].dims == ("cycle", "eV")
+    assert np.isnan(peaks["center"][1, 3])
+    centers = np.delete(peaks["center"].values, 3, axis=1)
+    np.testing.assert_allclose(centers[1, :20], centers[0, :20], atol=5e-3)
+
+
+def test_fit_edcs_voigt() -> None:
+    rng = np.random.default_rng(1)
+    k = np.linspace(-0.3, 0.3, 31)
+    energy = np.linspace(8.5, 10.5, 201)
+    centers = parabolic_band_dispersion_k(k, E0, MASS)
+    image = 3.0 * voigt_profile(energy - centers[:, np.newaxis], 0.05, 0.04) + 0.2
+    image += rng.normal(0, 0.02, image.shape)
+    data = xr.DataArray(image, coords={"kp": k, "eV": energy}, dims=("kp", "eV"))
+    peaks = fit_edcs(data, model="voigt")
+    np.testing.assert_allclose(peaks["center"], centers, atol=3e-3)
+    np.testing.assert_allclose(peaks["sigma"].median(), 0.05, rtol=0.1)
+    np.testing.assert_allclose(peaks["gamma"].median(), 0.04, rtol=0.1)
+    band = fit_dispersion(peaks)
+    assert band.e0 == pytest.approx(E0, abs=2e-3)
+    assert band.mass == pytest.approx(MASS, rel=1e-2)
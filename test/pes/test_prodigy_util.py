@@ -0,0 +1,59 @@
+#! /usr/bin/env python3
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from pes.prodigy_util import ProdigyItx, load_itx
+
+DATA = Path(__file__).parent / "data" / "PES_16_Spectrum_3.itx"
+
+
+@pytest.fixture(scope="module")
+def itx() -> ProdigyItx:
+    return ProdigyItx(DATA)
+
+
+def test_params(itx: ProdigyItx) -> None:
+    assert itx.params["User Comment"] == ""
+    assert itx.params["Spectrum ID"] == 2  # noqa: PLR2004
+    assert itx.params["Excitation Energy"] == pytest.approx(4.992)
+    assert itx.params["Scan Mode"] == "Fixed Analyzer Transmission"
+    assert itx.wavename == "Spectrum_3_2"
+
+
+def test_intensity_agrees_with_line_by_line(itx: ProdigyItx) -> None:
+    text = DATA.read_text()
+    block = text.split("BEGIN")[1].split("\nEND")[0].strip()
+    expected = np.array(
+        [[float(v) for v in line.split()] for line in block.splitlines()],
+    )
+    assert itx.pixels == (600, 501)
+    np.testing.assert_array_equal(itx.intensity, expected)
+    assert itx.integrated_intensity == pytest.approx(expected.sum())
+
+
+def test_data_array() -> None:
+    spectrum = load_itx(DATA)
+    assert spectrum.dims == ("phi", "eV")
+    np.testing.assert_allclose(spectrum.phi[[0, -1]], [-12.4792, 12.4792])
+    np.testing.assert_allclose(spectrum.eV[[0, -1]], [9, 10])
+    assert spectrum.attrs["units"] == "cps (Intensity)"
+    assert spectrum.attrs["Pass Energy"] == 5  # noqa: PLR2004
+
+
+def test_setscale_p_and_1d() -> None:
+    itx = ProdigyItx()
+    itx.parse(
+        b"IGOR\nX //Pass Energy = 10\nWAVES/S/N=(3) 'w'\nBEGIN\n1 2 -3.5\nEND\n"
+        b'X SetScale/P x, 9, 0.5, "eV (Kinetic Energy)", \'w\'\n',
+    )
+    np.testing.assert_array_equal(itx.intensity, [1, 2, -3.5])
+    spectrum = itx.to_data_array()
+    np.testing.assert_allclose(spectrum.eV, [9, 9.5, 10])
+
+
+def test_broken_block() -> None:
+    with pytest.raises(ValueError, match="values are found"):
+        ProdigyItx().parse(b"WAVES/S/N=(2,2) 'w'\nBEGIN\n1 2 3\nEND\n")
@@ -0,0 +1,65 @@
+#! /usr/bin/env python3
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from pes.prodigy_xml import ProdigyRegion, iter_regions, load_regions
+
+DATA = Path(__file__).parent / "data" / "SPLab-041.xml"
+
+
+@pytest.fixture(scope="module")
+def regions() -> dict[str, ProdigyRegion]:
+    return load_regions(DATA)
+
+
+def test_regions(regions: dict[str, ProdigyRegion]) -> None:
+    assert list(regions) == ["Region1", "Region2", "Region3", "Region4"]
+    region1 = regions["Region1"]
+    assert region1.group == "Group1"
+    assert region1.counts.shape == (1, 1, 20, 211 + 8 + 8, 24)
+    assert regions["Region2"].counts.shape == (1, 1, 20, 106 + 4 + 4, 24)
+    assert region1.counts[0, 0, 0, 0, :2].tolist() == [161, 201]
+    assert region1.params["pass_energy"] == pytest.approx(1.0)
+    assert region1.params["scan_mode"] == "FixedAnalyzerTransmission"
+    assert region1.params["OrdinateUnit"] == "deg"
+    assert region1.detector_shift[0] == pytest.approx(-0.0847422)
+    assert region1.transmission.shape == (211,)
+    np.testing.assert_allclose(region1.energy[[0, -1]], [5.1, 7.2])
+
+
+def test_selected_region(regions: dict[str, ProdigyRegion]) -> None:
+    selected = list(iter_regions(DATA, regions=["Region3"]))
+    assert [region.name for region in selected] == ["Region3"]
+    np.testing.assert_array_equal(selected[0].counts, regions["Region3"].counts)
+
+
+def test_spectrum(regions: dict[str, ProdigyRegion]) -> None:
+    region = regions["Region2"]
+    spectrum = region.to_data_array()
+    assert spectrum.dims == ("cycle", "scan", "curve", "eV")
+    assert spectrum.shape == (1, 1, 20, 106)
+    counts = np.arange(2 * 5 * 3).reshape(1, 1, 2, 5, 3)
+    params = {
+        "kinetic_energy": 1.0,
+        "scan_delta": 0.1,
+        "values_per_curve": 3,
+        "pass_energy": 2.0,
+    }
+    shifted = ProdigyRegion(
+        name="test",
+        group="",
+        params=params,
+        detector_shift=np.array([-0.05, 0.0, 0.05]),
+        detector_position=np.zeros(3),
+        mcd_head=1,
+        mcd_tail=1,
+        counts=counts,
+        transmission=np.ones(3),
+    )
+    expected = (
+        counts[..., 2:5, 0] + counts[..., 1:4, 1] + counts[..., 0:3, 2]
+    ).astype(float)
+    np.testing.assert_allclose(shifted.spectrum(), expected)
@@ -0,0 +1,124 @@
+#! /usr/bin/env python3
+
+import numpy as np
+import pytest
+import xarray as xr
+from scipy.ndimage import shift as ndimage_shift
+
+from pes.phi_correction import ch_calib, correct_phi, phi_shift_from_pes130
+from pes.shift import _shift_table, clear_shift_cache, shift_array, shift_by
+
+
+@pytest.fixture
+def spectrum() -> xr.DataArray:
+    rng = np.random.default_rng(0)
+    return xr.DataArray(
+        rng.random((7, 30)),
+        coords={"eV": np.linspace(9, 10, 7), "phi": np.linspace(-3, 3, 30)},
+        dims=("eV", "phi"),
+        attrs={"id": 1},
+    )
+
+
+def test_shift_array_agrees_with_ndimage() -> None:
+    values = np.random.default_rng(1).random((4, 25))
+    shifts = np.array([0.0, 1.5, -2.25, 3.7])
+    shifted = shift_array(values, shifts)
+    for i, shift in enumerate(shifts):
+        expected = ndimage_shift(values[i], -shift, order=1, cval=np.nan)
+        inside = np.isfinite(expected)
+        np.testing.assert_allclose(shifted[i][inside], expected[inside])
+
+
+def test_shift_table_is_cached() -> None:
+    clear_shift_cache()
+    values = np.ones((3, 2, 10))
+    shift_array(values, [0.5, 1.5])
+    shift_array(2 * values, [0.5, 1.5])
+    assert _shift_table.cache_info().hits == 1
+
+
+def test_shift_by(spectrum: xr.DataArray) -> None:
+    delta = float(spectrum.phi[1] - spectrum.phi[0])
+    shifts = xr.DataArray(delta * np.arange(7) / 2, dims="eV")
+    shifted = shift_by(spectrum, shifts, "phi")
+    assert shifted.dims == spectrum.dims
+    assert shifted.attrs == spectrum.attrs
+    np.testing.assert_allclose(shifted[2, :-1], spectrum[2, 1:])
+    assert np.isnan(shifted[2, -1])
+    np.testing.assert_allclose(
+        shifted[1, :-1],
+        (spectrum[1, :-1].values + spectrum[1, 1:].values) / 2,
+    )
+
+
+def test_extend_coords(spectrum: xr.DataArray) -> None:
+    delta = float(spectrum.phi[1] - spectrum.phi[0])
+    shifted = shift_by(
+        spectrum,
+        np.linspace(-2.5, 1, 7) * delta,
+        "phi",
+        "eV",
+        extend_coords=True,
+    )
+    assert shifted.sizes["phi"] == 30 + 2 * 3
+    np.testing.assert_allclose(shifted.phi[3:-3], spectrum.phi)
+    row = spectrum[0].values
+    np.testing.assert_allclose(shifted[0, 6:35], (row[:-1] + row[1:]) / 2)
+    assert np.isnan(shifted[0, :5]).all()
+
+
+def test_correct_phi_and_ch_calib(spectrum: xr.DataArray) -> None:
+    corrected = correct_phi(spectrum)
+    assert corrected.dims == spectrum.dims
+    assert not corrected.isnull().all("eV").any()
+    delta = float(spectrum.phi[1] - spectrum.phi[0])
+    cycles = xr.concat(
+        [spectrum.shift(phi=i - 1) for i in (1, 2, 3)],
+        dim=xr.DataArray([1, 2, 3], dims="cycle"),
+    )
+    summed = ch_calib(cycles, delta)
+    assert summed.dims == ("eV", "phi")
+    np.testing.assert_allclose(summed[:, :28], 3 * spectrum[:, :28])
+    separated = ch_calib(cycles, delta, sums=False)
+    assert separated.dims[0] == "cycle"
+    np.testing.assert_allclose(separated.sum("cycle", skipna=False), summed)
+
+
+def test_ch_calib_edges_are_zero_filled(spectrum: xr.DataArray) -> None:
+    delta = float(spectrum.phi[1] - spectrum.phi[0])
+    cycles = xr.concat(
+        [spectrum.shift(phi=i - 1, fill_value=0.0) for i in (1, 2, 3)],
+        dim=xr.DataArray([1, 2, 3], dims="cycle"),
+    )
+    summed = ch_calib(cycles, delta)
+    # cycle i is shifted back by i - 1 pixels, leaving i - 1 zeros at the end
+    expected = spectrum * xr.DataArray([3] * 28 + [2, 1], dims="phi")
+    assert not summed.isnull().any()
+    np.testing.assert_allclose(summed, expected)
+    corrected = correct_phi(spectrum)
+    assert not corrected.isnull().any()
+    correction = phi_shift_from_pes130(spectrum.eV)
+    extended = shift_by(spectrum, correction, extend_coords=True)
+    np.testing.assert_allclose(corrected, extended.fillna(0.0))
+
+
+@pytest.mark.parametrize("n_workers", [1, 3])
+def test_ch_calib_accumulate(spectrum: xr.DataArray, n_workers: int) -> None:
+    delta = float(spectrum.phi[1] - spectrum.phi[0])
+    cycles = xr.concat(
+        [spectrum.shift(phi=i - 1) * i for i in (1, 2, 3, 4)],
+        dim=xr.DataArray([1, 2, 3, 4], dims="cycle"),
+    ).transpose("eV", "cycle", "phi")
+    expected = ch_calib(cycles, 0.7 * delta)
+    accumulated = ch_calib(cycles, 0.7 * delta, accumulate=True, n_workers=n_workers)
+    assert accumulated.dims == expected.dims
+    assert accumulated.attrs == expected.attrs
+    np.testing.assert_allclose(accumulated, expected)
+    # without NaN in the data, the edge columns keep the partial sums in both modes
+    cycles = cycles.fillna(0.0)
+    expected = ch_calib(cycles, 0.7 * delta)
+    accumulated = ch_calib(cycles, 0.7 * delta, accumulate=True, n_workers=n_workers)
+    edges = [0, 1, 2, -3, -2, -1]
+    assert not accumulated[:, edges].isnull().any()
+    np.testing.assert_allclose(accumulated[:, edges], expected[:, edges])
@@ -0,0 +1,58 @@
+#! /usr/bin/env python3
+
+import numpy as np
+import pytest
+
+import pulselaser
+from pulselaser import autocorrelation
+
+DELAY = np.linspace(-300.0, 300.0, 121)
+
+
+def _numerical_autocorrelation(intensity: np.ndarray) -> np.ndarray:
+    correlation = np.correlate(intensity, intensity, mode="same")
+    return correlation / correlation.max()
+
+
+@pytest.mark.parametrize("shape", ["gaussian", "sech2"])
+def test_deconvolution_factor(shape: str) -> None:
+    t = np.linspace(-500, 500, 20001)
+    if shape == "gaussian":
+        intensity = pulselaser.gaussian_pulse(t, 40)
+    else:
+        intensity = pulselaser.sech2(t, 0, 40 / autocorrelation.SECH2_FWHM)
+    ac_width = 40 * autocorrelation.DECONVOLUTION_FACTOR[shape]
+    np.testing.assert_allclose(
+        autocorrelation.AUTOCORRELATION[shape](t, ac_width),
+        _numerical_autocorrelation(intensity),
+        atol=1e-4,
+    )
+
+
+@pytest.mark.parametrize("shape", ["gaussian", "sech2"])
+def test_fit_many_traces(shape: str) -> None:
+    rng = np.random.default_rng(0)
+    widths = rng.uniform(30, 80, 20)
+    func = autocorrelation.AUTOCORRELATION[shape]
+    factor = autocorrelation.DECONVOLUTION_FACTOR[shape]
+    traces = np.array([2 * func(DELAY - 5, w * factor) + 0.1 for w in widths])
+    traces += rng.normal(0, 0.02, traces.shape)
+    result = autocorrelation.fit_autocorrelation(DELAY, traces, shape=shape)
+    assert result.pulse_width_fs.shape == (20,)
+    deviation = (result.pulse_width_fs - widths) / result.pulse_width_err_fs
+    assert np.all(np.abs(deviation) < 4)
+    np.testing.assert_allclose(result.center_fs, 5, atol=1)
+
+
+def test_fit_traces_with_different_delays() -> None:
+    delays = [DELAY, DELAY[::2] + 1.0]
+    traces = [
+        autocorrelation.gaussian_autocorrelation(delay, 50 * np.sqrt(2))
+        for delay in delays
+    ]
+    result = autocorrelation.fit_autocorrelation(delays, traces)
+    np.testing.assert_allclose(result.pulse_width_fs, 50, rtol=1e-6)
+
+
+def test_position_to_delay() -> None:
+    assert np.isclose(autocorrelation.position_to_delay_fs(0.15), 1000.692, atol=1e-3)
@@ -0,0 +1,39 @@
+#! /usr/bin/env python3
+
+import numpy as np
+
+from pulselaser import berek, sellmeier
+
+
+def test_retardance_map_agrees_with_retardance() -> None:
+    wavelengths = np.array([0.4, 0.8, 1.2])
+    tilts = np.array([0.0, 10.0, 30.0, 50.0])
+    r_map = berek.retardance_map(wavelengths[:, np.newaxis], tilts)
+    assert r_map.shape == (3, 4)
+    for i, wavelength in enumerate(wavelengths):
+        n_o, n_e = sellmeier.mgf2(wavelength)
+        for j, tilt in enumerate(tilts):
+            sin2 = np.sin(np.deg2rad(tilt)) ** 2
+            expected = (
+                (2000 / wavelength)
+                * np.sqrt(n_o**2 - sin2)
+                * (np.sqrt((1 - sin2 / n_e**2) / (1 - sin2 / n_o**2)) - 1)
+            )
+            assert np.isclose(r_map[i, j], expected)
+            assert np.isclose(berek.retardance(wavelength, tilt), expected)
+
+
+def test_solve_tilt() -> None:
+    rng = np.random.default_rng(0)
+    wavelengths = rng.uniform(0.25, 1.55, 200)
+    targets = rng.uniform(0.01, 5.0, 200)
+    tilt, indicator = berek.solve_tilt(wavelengths, targets)
+    np.testing.assert_allclose(
+        berek.retardance_map(wavelengths, tilt),
+        targets,
+        rtol=1e-4,
+    )
+    np.testing.assert_allclose(berek.tilt_angle_deg(indicator), tilt)
+    assert np.isnan(berek.solve_tilt(0.1, 0.25)[0])
+    assert np.isnan(berek.solve_tilt(0.8, 1000.0)[0])
+    assert berek.berek_table() is berek.berek_table()
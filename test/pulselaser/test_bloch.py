@@ -1,3 +1,7 @@
+import numpy as np
+import pytest
+from scipy.integrate import solve_ivp
+
 from pulselaser import bloch
 
 
@@ -7,3 +11,110 @@ def test_bloch_gaussian_envelope() -> None:
     assert bloch.gaussian_envelop(t=40.0, fwhm=20.0, intensity=1.0, t0=50.0) == 0.5
     assert bloch.gaussian_envelop(t=50.0, fwhm=20.0, intensity=1.0, t0=50.0) == 1.0
     assert bloch.gaussian_envelop(t=60.0, fwhm=20.0, intensity=1.0, t0=50.0) == 0.5
+
+
+T = np.linspace(-200.0, 1000.0, 13)
+T_SPAN = (-500.0, 2000.0)
+
+
+def _reference(t1: float, omega12_minus_omega: float) -> np.ndarray:
+    sol = solve_ivp(
+        bloch.bloch,
+        t_span=T_SPAN,
+        y0=[0j, 0j],
+        args=(50.0, t1, omega12_minus_omega, 1e-3),
+        rtol=1e-9,
+        atol=1e-13,
+        dense_output=True,
+    )
+    t_fine = np.linspace(*T_SPAN, 5000)
+    r22 = np.real(sol.sol(t_fine)[0])
+    return np.interp(T, t_fine, r22 / r22.max())
+
+
+def test_rho22_is_memoized(monkeypatch: pytest.MonkeyPatch) -> None:
+    bloch.clear_solution_cache()
+    first = bloch.rho22(T, T_SPAN, 50.0, 100.0, 0.0, 2.0)
+    monkeypatch.setattr(bloch, "solve_ivp", None)  # must not be called again
+    second = bloch.rho22(T, T_SPAN, np.float64(50.0), 100, 0.0, 2.0)
+    np.testing.assert_array_equal(first, second)
+
+
+def test_solution_cache_eviction(monkeypatch: pytest.MonkeyPatch) -> None:
+    bloch.clear_solution_cache()
+    monkeypatch.setattr(bloch, "SOLUTION_CACHE_SIZE", 2)
+    bloch.rho22_batch(T, T_SPAN, 50.0, [100.0, 200.0, 300.0], 0.0)
+    assert len(bloch._solution_cache) == 2  # noqa: SLF001
+
+
+@pytest.mark.parametrize("method", ["RK45", "Radau", "BDF", "RK4"])
+def test_rho22_batch(method: str) -> None:
+    bloch.clear_solution_cache()
+    result = bloch.rho22_batch(
+        T,
+        T_SPAN,
+        50.0,
+        [[100.0], [200.0]],
+        [0.0, 0.01],
+        amplitude=2.0,
+        method=method,
+    )
+    assert result.shape == (2, 2, len(T))
+    for i, t1 in enumerate((100.0, 200.0)):
+        for j, delta in enumerate((0.0, 0.01)):
+            np.testing.assert_allclose(
+                result[i, j],
+                2.0 * _reference(t1, delta),
+                atol=5e-3,
+            )
+
+
+def test_cache_is_per_method_and_set() -> None:
+    bloch.clear_solution_cache()
+    rk4 = bloch.rho22_batch(T, T_SPAN, 50.0, 100.0, 0.0, num_t=200, method="RK4")
+    rk45 = bloch.rho22_batch(T, T_SPAN, 50.0, 100.0, 0.0, num_t=200, method="RK45")
+    bloch.clear_solution_cache()
+    fresh = bloch.rho22_batch(T, T_SPAN, 50.0, 100.0, 0.0, num_t=200, method="RK45")
+    np.testing.assert_array_equal(rk45, fresh)
+    assert not np.array_equal(rk4, rk45)
+    # the solution of a set does not depend on the other sets solved with it
+    for method in ("RK4", "RK45"):
+        bloch.clear_solution_cache()
+        batch = bloch.rho22_batch(
+            T,
+            T_SPAN,
+            [10.0, 50.0],
+            [5.0, 100.0],
+            0.0,
+            num_t=200,
+            method=method,
+        )
+        bloch.clear_solution_cache()
+        alone = bloch.rho22_batch(T, T_SPAN, 50.0, 100.0, 0.0, num_t=200, method=method)
+        np.testing.assert_array_equal(batch[1], alone)
+
+
+def test_bloch_system_matches_bloch() -> None:
+    fwhm = np.array([30.0, 50.0])
+    t1 = np.array([100.0, 20.0])
+    delta = np.array([0.0, 0.02])
+    coeff_a = np.array([1e-3, 2e-3])
+    system = bloch.BlochSystem(fwhm, t1, delta, coeff_a)
+    y = np.random.default_rng(0).normal(size=6)
+    for t in (-40.0, 0.0, 15.0):
+        expected = []
+        for i, (r, u, v) in enumerate(y.reshape(-1, 3)):
+            dr22, dr12 = bloch.bloch(
+                t,
+                np.array([r, u + 1j * v]),
+                fwhm[i],
+                t1[i],
+                delta[i],
+                coeff_a[i],
+            )
+            expected.extend([dr22.real, dr12.real, dr12.imag])
+        np.testing.assert_allclose(system(t, y), expected)
+        np.testing.assert_array_equal(
+            bloch.bloch_real(t, y, fwhm, t1, delta, coeff_a),
+            system(t, y),
+        )
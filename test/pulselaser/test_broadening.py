@@ -0,0 +1,26 @@
+#! /usr/bin/env python3
+
+import numpy as np
+
+import pulselaser
+
+
+def test_broadening_table_agrees_with_broadening() -> None:
+    widths = np.array([20.0, 50.0])[:, np.newaxis, np.newaxis]
+    gdds = np.array([100.0, 300.0, 1000.0])[:, np.newaxis]
+    iterations = np.arange(1, 6)
+    table = pulselaser.broadening_table(widths, gdds, iterations)
+    assert table.shape == (2, 3, 5)
+    for i, width in enumerate(widths.ravel()):
+        for j, gdd in enumerate(gdds.ravel()):
+            current = width
+            for k in iterations:
+                current = pulselaser.broadening(current, gdd)
+                assert np.isclose(table[i, j, k - 1], current, rtol=1e-14)
+
+
+def test_broadening_after_n() -> None:
+    assert pulselaser.broadening_after_n(30, 100) == pulselaser.broadening(30, 100)
+    width = pulselaser.broadening_after_n(30, 100, 5000)
+    assert np.isfinite(width)
+    assert width > pulselaser.broadening_after_n(30, 100, 4999)
@@ -0,0 +1,120 @@
+#! /usr/bin/env python3
+
+import numpy as np
+
+import pulselaser
+import pulselaser.sellmeier as sellmeier
+from pulselaser.compressor import (
+    grating_pair_dispersion,
+    optimize_grating_pair,
+    optimize_prism_pair,
+    prism_pair_dispersion,
+)
+from pulselaser.stack import LIGHT_SPEED_MICRON_FS, OpticalStack
+
+
+class TestPrismPair:
+    def test_insertion_is_material_dispersion(self) -> None:
+        _, _, d2n, d3n = sellmeier.sellmeier_dispersion(
+            "sf10",
+            0.8,
+            max_derivative=3,
+        )
+        gdd, tod = prism_pair_dispersion("sf10", 0.8, 0, 5.0, double_pass=False)
+        np.testing.assert_allclose(gdd, 5 * pulselaser.gvd(0.8, d2n))
+        np.testing.assert_allclose(tod, 5 * pulselaser.tod(0.8, d2n, d3n))
+
+    def test_separation_is_path_derivative(self) -> None:
+        # P(lambda) = 2 L cos(2 (n(lambda) - n(lambda_0))), L = 100 mm in micron
+        step = 2e-3
+        wavelength = 0.8 + step * np.arange(-3, 4)
+        delta_n = sellmeier.fused_silica(wavelength) - sellmeier.fused_silica(0.8)
+        path = 2 * 1e5 * np.cos(2 * delta_n)
+        p2 = (path[2] - 2 * path[3] + path[4]) / step**2
+        p3 = (-path[1] + 2 * path[2] - 2 * path[4] + path[5]) / (2 * step**3)
+        c = LIGHT_SPEED_MICRON_FS
+        gdd, tod = prism_pair_dispersion(
+            "fused_silica",
+            0.8,
+            100.0,
+            0,
+            double_pass=False,
+        )
+        np.testing.assert_allclose(gdd, 0.8**3 / (2 * np.pi * c**2) * p2, rtol=1e-3)
+        np.testing.assert_allclose(
+            tod,
+            -(0.8**4) / (4 * np.pi**2 * c**3) * (3 * p2 + 0.8 * p3),
+            rtol=1e-3,
+        )
+
+    def test_separation_is_negative_and_broadcast(self) -> None:
+        dispersion = prism_pair_dispersion(
+            "fused_silica",
+            0.8,
+            np.array([[100.0], [200.0]]),
+            np.zeros(3),
+        )
+        assert dispersion.shape == (2, 2, 3)
+        assert np.all(dispersion[0] < 0)
+        np.testing.assert_allclose(dispersion[:, 1], 2 * dispersion[:, 0])
+
+    def test_optimize_cancels_gdd(self) -> None:
+        beamline = OpticalStack([("fused_silica", 20.0), ("bk7", 10.0)])
+        design = optimize_prism_pair(
+            "fused_silica",
+            0.8,
+            beamline,
+            np.linspace(100, 2000, 1901),
+            np.linspace(0, 20, 201),
+        )
+        assert design.score.shape == (1901, 201)
+        _, gdd, _ = beamline.dispersion(0.8)
+        assert abs(design.residual_gdd) < 0.05 * gdd
+        np.testing.assert_allclose(design.residual_gdd, design.gdd + gdd)
+        expected = prism_pair_dispersion(
+            "fused_silica",
+            0.8,
+            design.parameters["separation_mm"],
+            design.parameters["insertion_mm"],
+        )
+        np.testing.assert_allclose([design.gdd, design.tod], expected)
+
+
+class TestGratingPair:
+    def test_treacy(self) -> None:
+        c = 0.299792458
+        d = 1e3 / 600
+        sin_gamma = np.sin(np.deg2rad(20))
+        cos2 = 1 - (0.8 / d - sin_gamma) ** 2
+        gdd, tod = grating_pair_dispersion(0.8, 10, 20, 600, double_pass=False)
+        np.testing.assert_allclose(
+            gdd,
+            -(0.8**3) * 1e4 / (2 * np.pi * c**2 * d**2) / cos2**1.5,
+        )
+        assert tod > 0
+        np.testing.assert_allclose(
+            tod / gdd,
+            -3 * 0.8 / (2 * np.pi * c) * (1 + 0.8 / d * sin_gamma - sin_gamma**2) / cos2,
+        )
+
+    def test_no_diffraction_is_nan(self) -> None:
+        gdd, tod = grating_pair_dispersion(0.8, 10, -60, 1800)
+        assert np.isnan(gdd)
+        assert np.isnan(tod)
+
+    def test_optimize(self) -> None:
+        beamline = [("fused_silica", 50.0)]
+        design = optimize_grating_pair(
+            0.8,
+            beamline,
+            np.linspace(0.1, 20, 200),
+            np.linspace(0, 60, 61),
+            [300, 600, 1200],
+        )
+        assert design.score.shape == (200, 61, 3)
+        assert abs(design.residual_gdd) < 0.05 * abs(design.gdd)
+        assert set(design.parameters) == {
+            "separation_mm",
+            "incidence_deg",
+            "grooves_per_mm",
+        }
@@ -0,0 +1,70 @@
+#! /usr/bin/env python3
+
+import numpy as np
+import pytest
+
+from pulselaser import nlo, sellmeier
+from pulselaser import phase_matching as pm
+
+
+def _sinc2(
+    crystal: str,
+    lam: np.ndarray,
+    theta_deg: float,
+    pm_type: str,
+    length_mm: float,
+) -> np.ndarray:
+    n_o, n_e = sellmeier.sellmeier_dispersion(
+        [f"{crystal}_o", f"{crystal}_e"],
+        lam,
+        max_derivative=0,
+    )[0]
+    theta = np.deg2rad(theta_deg)
+    n_theta = (np.cos(theta) ** 2 / n_o**2 + np.sin(theta) ** 2 / n_e**2) ** -0.5
+    n = np.where(np.array([c == "e" for c in pm_type])[:, np.newaxis], n_theta, n_o)
+    delta_k = 2 * np.pi * (n[2] / lam[2] - n[0] / lam[0] - n[1] / lam[1])
+    return np.sinc(delta_k * length_mm * 1e3 / 2 / np.pi) ** 2
+
+
+def test_shg_angle_agrees_with_bbo_functions() -> None:
+    wavelengths = np.array([0.7, 0.8, 1.064])
+    theta = pm.phase_matching_angle_deg("beta_bbo", wavelengths)
+    np.testing.assert_allclose(
+        theta,
+        [sellmeier.phase_matching_angle_bbo(x) for x in wavelengths],
+    )
+    assert np.isclose(theta[1], nlo.cut_angle_deg(0.8))
+    assert np.isnan(pm.phase_matching_angle_deg("beta_bbo", 0.4))
+
+
+@pytest.mark.parametrize("pm_type", ["ooe", "eoe"])
+def test_acceptance_is_fwhm(pm_type: str) -> None:
+    length_mm = 2.0
+    result = pm.phase_matching("beta_bbo", 1.064, pm_type=pm_type, length_mm=length_mm)
+    lam = pm.three_wavelengths(1.064)[:, np.newaxis]
+    half_angle = result.angular_acceptance_mrad * 1e-3 / 2
+    for theta in result.theta_deg + np.rad2deg([-half_angle, half_angle]):
+        assert np.isclose(
+            _sinc2("beta_bbo", lam, theta, pm_type, length_mm),
+            0.5,
+            atol=0.01,
+        )
+    half_width = result.spectral_acceptance_nm * 1e-3 / 2
+    for wavelength in (1.064 - half_width, 1.064 + half_width):
+        lam = pm.three_wavelengths(wavelength)[:, np.newaxis]
+        assert np.isclose(
+            _sinc2("beta_bbo", lam, result.theta_deg, pm_type, length_mm),
+            0.5,
+            atol=0.02,  # first order in the wavelength
+        )
+    assert result.temperature_acceptance_k > 0
+
+
+def test_sfg_dfg() -> None:
+    sfg = pm.phase_matching("beta_bbo", [0.8, 0.9], [[1.2], [1.3]], process="SFG")
+    assert sfg.theta_deg.shape == (2, 2)
+    assert np.isclose(sfg.output_micron[0, 0], 0.48)
+    dfg = pm.phase_matching("beta_bbo", 0.48, 0.8, process="DFG")
+    assert np.isclose(dfg.output_micron, 1.2)
+    assert np.isclose(dfg.theta_deg, sfg.theta_deg[0, 0])
+    assert np.isnan(pm.phase_matching("quartz", 0.8).temperature_acceptance_k)
@@ -0,0 +1,47 @@
+#! /usr/bin/env python3
+
+import numpy as np
+
+import pulselaser
+from pulselaser.propagation import fwhm, propagate_pulse
+from pulselaser.stack import OpticalStack
+
+T = np.linspace(-2000, 2000, 8192)
+
+
+def test_fwhm() -> None:
+    widths = np.array([[30.0], [100.0]])
+    profiles = pulselaser.gaussian_pulse(T[np.newaxis], widths)
+    np.testing.assert_allclose(fwhm(T, profiles), widths[:, 0], rtol=1e-3)
+
+
+def test_gaussian_agrees_with_broadening() -> None:
+    field = np.sqrt(pulselaser.gaussian_pulse(T, 30))
+    thickness = np.array([5.0, 10.0, 20.0])
+    intensity, width = propagate_pulse(
+        field,
+        T,
+        0.8,
+        ["fused_silica", "bk7"],
+        thickness_mm=thickness,
+    )
+    assert intensity.shape == (2, 3, len(T))
+    gvd = pulselaser.material_dispersion(["fused_silica", "bk7"], 0.8)[0]
+    expected = [[pulselaser.broadening(30, g * x) for x in thickness] for g in gvd]
+    np.testing.assert_allclose(width, expected, rtol=2e-3)
+
+
+def test_stack_and_energy() -> None:
+    field = np.sqrt(pulselaser.sech2(T, 0, 20))
+    stack = OpticalStack([("fused_silica", 4.0), ("sf10", 2.0)])
+    intensity, width = propagate_pulse(field, T, 0.8, [stack, OpticalStack()])
+    assert np.isclose(width[1], 1.7627 * 20, rtol=1e-3)
+    assert width[0] > width[1]
+    np.testing.assert_allclose(intensity.sum(axis=-1), np.sum(field**2))
+
+
+def test_empty_medium_has_no_dispersion() -> None:
+    field = np.sqrt(pulselaser.sech2(T, 0, 20))
+    intensity, width = propagate_pulse(field, T, 0.8, [])
+    np.testing.assert_allclose(intensity, field**2, atol=1e-12)
+    assert np.isclose(width, 1.7627 * 20, rtol=1e-3)
@@ -1,5 +1,8 @@
 #! /usr/bin/env python3
 
+import numpy as np
+
+import pulselaser
 import pulselaser.sellmeier as sellmeier
 
 
@@ -45,3 +48,84 @@ class TestBetaBBO:
 
     def test_at_400nm(self) -> None:
         assert sellmeier.beta_bbo(0.400) == (1.6929832659808661, 1.5678876665187913)
+
+
+class TestSellmeierRegistry:
+    def test_index_agrees_with_functions(self) -> None:
+        wavelengths = np.linspace(0.4, 1.6, 7)
+        table = sellmeier.sellmeier_dispersion(
+            ["bk7", "caf2", "beta_bbo_o", "beta_bbo_e", "mgf2_e"],
+            wavelengths,
+            max_derivative=0,
+        )
+        assert table.shape == (1, 5, 7)
+        expected = [
+            [sellmeier.bk7(x) for x in wavelengths],
+            [sellmeier.caf2(x) for x in wavelengths],
+            [sellmeier.beta_bbo(x)[0] for x in wavelengths],
+            [sellmeier.beta_bbo(x)[1] for x in wavelengths],
+            [sellmeier.mgf2(x)[1] for x in wavelengths],
+        ]
+        np.testing.assert_allclose(table[0], expected, rtol=1e-14)
+
+    def test_derivatives(self) -> None:
+        wavelengths = np.linspace(0.4, 1.6, 7)
+        h = 1e-4
+        n, dn, d2n = sellmeier.sellmeier_dispersion("fused_silica", wavelengths)
+        n_plus, n_minus = sellmeier.sellmeier_dispersion(
+            "fused_silica",
+            [wavelengths + h, wavelengths - h],
+            max_derivative=0,
+        )[0]
+        np.testing.assert_allclose(dn, (n_plus - n_minus) / (2 * h), rtol=1e-6)
+        np.testing.assert_allclose(
+            d2n,
+            (n_plus - 2 * n + n_minus) / h**2,
+            atol=1e-6,
+        )
+
+    def test_higher_derivatives(self) -> None:
+        wavelengths = np.linspace(0.5, 1.5, 5)
+        h = 1e-3
+        table = sellmeier.sellmeier_dispersion("bk7", wavelengths, max_derivative=4)
+        d2n_plus, d2n_minus = sellmeier.sellmeier_dispersion(
+            "bk7",
+            [wavelengths + h, wavelengths - h],
+        )[2]
+        np.testing.assert_allclose(
+            table[3],
+            (d2n_plus - d2n_minus) / (2 * h),
+            rtol=1e-4,
+        )
+        np.testing.assert_allclose(
+            table[4],
+            (d2n_plus - 2 * table[2] + d2n_minus) / h**2,
+            rtol=1e-3,
+        )
+
+    def test_material_functions_agree_with_registry(self) -> None:
+        table = sellmeier.sellmeier_dispersion(
+            ["bk7", "beta_bbo_o", "quartz_e"],
+            0.8,
+            max_derivative=4,
+        )
+        for order in range(5):
+            assert np.isclose(sellmeier.bk7(0.8, derivative=order), table[order, 0])
+            assert np.isclose(
+                sellmeier.beta_bbo(0.8, derivative=order)[0],
+                table[order, 1],
+            )
+            assert np.isclose(
+                sellmeier.quartz(0.8, derivative=order)[1],
+                table[order, 2],
+            )
+        for order in range(1, 5):
+            assert type(sellmeier.bk7(0.8, derivative=order)) is float
+            assert type(sellmeier.quartz(0.8, derivative=order)[0]) is float
+
+    def test_material_dispersion(self) -> None:
+        """GVD and TOD of fused silica at 800 nm ~36.16 fs^2/mm and ~27.5 fs^3/mm."""
+        gvd, tod, fod = pulselaser.material_dispersion("fused_silica", 0.8)
+        assert np.isclose(gvd, 36.16, atol=0.01)
+        assert np.isclose(tod, 27.50, atol=0.01)
+        assert np.isfinite(fod)
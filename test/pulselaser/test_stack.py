@@ -0,0 +1,52 @@
+#! /usr/bin/env python3
+
+import numpy as np
+import pytest
+
+import pulselaser
+import pulselaser.sellmeier as sellmeier
+from pulselaser.stack import OpticalStack
+
+
+class TestOpticalStack:
+    def test_elements_are_summed(self) -> None:
+        wavelengths = np.linspace(0.7, 0.9, 5)
+        beamline = OpticalStack([("fused_silica", 2.0), ("air", 500.0)])
+        beamline.append("bk7", 3.0).append("fused_silica", 4.0)
+        gd, gdd, tod = beamline.dispersion(wavelengths)
+        _, _, d2n, d3n = sellmeier.sellmeier_dispersion(
+            ["fused_silica", "air", "bk7"],
+            wavelengths,
+            max_derivative=3,
+        )
+        length = np.array([[6.0], [500.0], [3.0]])
+        np.testing.assert_allclose(
+            gdd,
+            np.sum(length * pulselaser.gvd(wavelengths, d2n), axis=0),
+        )
+        np.testing.assert_allclose(
+            tod,
+            np.sum(length * pulselaser.tod(wavelengths, d2n, d3n), axis=0),
+        )
+        assert gd.shape == wavelengths.shape
+
+    def test_group_delay_derivative_is_gdd(self) -> None:
+        """dGD/domega = GDD."""
+        beamline = OpticalStack([("sf10", 10.0)])
+        wavelength, h = 0.8, 1e-4
+        gd_plus, gd_minus = beamline.group_delay([wavelength + h, wavelength - h])
+        omega = 2 * np.pi * 0.299792458 / np.array([wavelength + h, wavelength - h])
+        numerical = (gd_plus - gd_minus) / (omega[0] - omega[1])
+        assert np.isclose(numerical, beamline.gdd(wavelength), rtol=1e-5)
+
+    def test_unknown_material(self) -> None:
+        with pytest.raises(KeyError):
+            OpticalStack([("unobtainium", 1.0)])
+
+    def test_air(self) -> None:
+        """n of air at 800 nm ~1.000275."""
+        assert np.isclose(sellmeier.air(0.8), 1.000275, atol=1e-6)
+        assert np.isclose(
+            sellmeier.air(0.8),
+            sellmeier.sellmeier_dispersion("air", 0.8, max_derivative=0)[0],
+        )
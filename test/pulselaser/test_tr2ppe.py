@@ -0,0 +1,95 @@
+#! /usr/bin/env python3
+
+import numpy as np
+import pytest
+from scipy.integrate import quad
+
+from pulselaser import bloch, tr2ppe
+
+DELAY = np.linspace(-300.0, 1500.0, 181)
+
+
+def test_exponential_decay_is_convolution() -> None:
+    sigma = 60 / (2 * np.sqrt(2 * np.log(2)))
+    t = np.array([-100.0, 0.0, 50.0, 200.0])
+    expected = [
+        quad(
+            lambda s, x=x: np.exp(-s / 80) * np.exp(-((x - s) ** 2) / (2 * sigma**2)),
+            0,
+            2000,
+        )[0]
+        / (np.sqrt(2 * np.pi) * sigma)
+        for x in t
+    ]
+    np.testing.assert_allclose(tr2ppe.exponential_decay(t, 1, 0, 80, 60), expected)
+    assert np.all(np.isfinite(tr2ppe.exponential_decay(DELAY, 1, 0, 1, 60)))
+
+
+def test_fit_map_exponential() -> None:
+    rng = np.random.default_rng(0)
+    taus = np.linspace(50, 300, 6)
+    traces = np.array(
+        [tr2ppe.exponential_decay(DELAY, 1, 10, tau, 60, 0.01) for tau in taus],
+    )
+    traces += rng.normal(0, 0.005, traces.shape)
+    params = {"fwhm": {"value": 60, "vary": False}}
+    serial = tr2ppe.fit_map(DELAY, traces, params=params)
+    parallel = tr2ppe.fit_map(DELAY, traces, params=params, n_workers=2)
+    np.testing.assert_allclose([r["tau"] for r in serial], taus, rtol=0.05)
+    np.testing.assert_allclose(
+        [r["tau"] for r in parallel],
+        [r["tau"] for r in serial],
+    )
+
+
+def test_fit_bloch_trace() -> None:
+    bloch.clear_solution_cache()
+    settings = {"t_span": (-300.0, 1500.0), "num_t": 1000}
+    trace = tr2ppe.bloch_trace(DELAY, 1.0, 0.0, 120.0, 50.0, 40.0, **settings)
+    result = tr2ppe.fit_trace(
+        DELAY,
+        trace,
+        "bloch",
+        {
+            "fwhm": {"value": 50, "vary": False},
+            "probe_fwhm": {"value": 40, "vary": False},
+            "omega12_minus_omega": {"value": 0, "vary": False},
+            "t0": 0,
+            "t1": 150,
+        },
+        settings,
+    )
+    assert np.isclose(result.params["t1"].value, 120.0, rtol=1e-3)
+    assert 0 < len(bloch._solution_cache) <= bloch.SOLUTION_CACHE_SIZE  # noqa: SLF001
+
+
+@pytest.mark.parametrize("probe_fwhm", [40.0, 2000.0])
+def test_bloch_trace_probe_convolution(probe_fwhm: float) -> None:
+    t_span = (-300.0, 1500.0)
+    t_grid, normalized = bloch.solve_rho22(50.0, 120.0, 0.0, 1e-3, t_span, 20)
+    dt = t_grid[1] - t_grid[0]
+    half_width = int(np.ceil(2 * probe_fwhm / dt))
+    kernel = np.exp(
+        -4 * np.log(2) * (np.arange(-half_width, half_width + 1) * dt) ** 2
+        / probe_fwhm**2,
+    )
+    expected = [
+        sum(
+            normalized[j] * kernel[i - j + half_width]
+            for j in range(len(t_grid))
+            if abs(i - j) <= half_width
+        )
+        / kernel.sum()
+        for i in range(len(t_grid))
+    ]
+    trace = tr2ppe.bloch_trace(
+        t_grid,
+        1.0,
+        0.0,
+        120.0,
+        50.0,
+        probe_fwhm,
+        t_span=t_span,
+        num_t=20,
+    )
+    np.testing.assert_allclose(trace, expected, atol=1e-12)
@@ -0,0 +1,41 @@
+#! /usr/bin/env python3
+
+import hashlib
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parents[2]
+SCRIPT = ROOT / "script" / "tune_itx.py"
+DATA_DIR = Path(__file__).parent / "data"
+PES_ITX = ROOT / "test" / "pes" / "data" / "PES_16_Spectrum_3.itx"
+# sha256 of the output of the script before the streaming rewrite for
+# PES_16_Spectrum_3.itx followed by comment.itx
+MERGED_SHA256 = "1a51c87f505f82bf91bd0f988a17020543feb817a59b5a279d30d976fd43267c"
+
+
+def _run(*args: str | Path) -> bytes:
+    return subprocess.run(
+        [sys.executable, SCRIPT, *args],
+        check=True,
+        capture_output=True,
+    ).stdout
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_merge_matches_baseline(tmp_path: Path, jobs: str) -> None:
+    output = tmp_path / "merged.itx"
+    _run("-j", jobs, "-o", output, PES_ITX, DATA_DIR / "comment.itx")
+    merged = output.read_bytes()
+    assert hashlib.sha256(merged).hexdigest() == MERGED_SHA256
+    assert merged.count(b"IGOR\r\n") == 1
+    # the standard output has the trailing newline, as print() did
+    assert _run("-j", jobs, PES_ITX, DATA_DIR / "comment.itx") == merged + b"\n"
+
+
+def test_tune_single_file(tmp_path: Path) -> None:
+    output = tmp_path / "tuned.itx"
+    _run("-o", output, DATA_DIR / "comment.itx")
+    assert output.read_bytes() == (DATA_DIR / "comment_tuned.itx").read_bytes()